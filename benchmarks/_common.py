@@ -0,0 +1,14 @@
+"""Helpers shared by the benchmark scripts."""
+
+import importlib.util
+import os
+
+ADDON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "main.py")
+
+
+def load_addon():
+    spec = importlib.util.spec_from_file_location("turntabler", ADDON_PATH)
+    addon = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(addon)
+    addon.register()
+    return addon
@@ -0,0 +1,73 @@
+"""Minimal stand-in for Blender's ``bpy`` module.
+
+Only the parts of the API used by the add-on's setup/cleanup paths are
+modelled, enough to run them without Blender in CI.  Containers mimic
+Blender's cost model where it matters: ``bpy.data`` name lookups are hashed,
+while collection object lookups by name, ``Object.children`` and
+``users_collection`` walk lists like the C implementation does.
+
+Put the directory holding this package first on ``sys.path`` to use it.
+"""
+
+from . import app, path, props, types, utils  # noqa: F401
+from .types import Context, _Data
+
+data = _Data()
+context = Context(data)
+
+
+class _OpCall:
+    def __init__(self, idname):
+        self.idname = idname
+
+    def __call__(self, *args, **kwargs):
+        cls = utils._OPERATORS.get(self.idname)
+        if cls is None:
+            ops.calls.append((self.idname, args, kwargs))
+            handler = ops.handlers.get(self.idname)
+            if handler is not None:
+                return handler(*args, **kwargs)
+            return {'FINISHED'}
+        op = cls()
+        for name, prop in getattr(cls, '__annotations__', {}).items():
+            if isinstance(prop, props._Prop):
+                setattr(op, name, kwargs.get(name, prop.default_value()))
+        return op.execute(context)
+
+
+class _OpModule:
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return _OpCall(f"{self._name}.{attr}")
+
+
+class _Ops:
+    def __init__(self):
+        self.calls = []
+        self.handlers = {}
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return _OpModule(attr)
+
+
+ops = _Ops()
+
+
+def reset():
+    """Start from an empty file: fresh ``bpy.data`` and context."""
+    global data, context
+    data = _Data()
+    context = Context(data)
+    ops.calls.clear()
+    ops.handlers.clear()
+    types._CURRENT['data'] = data
+    return data
+
+
+types._CURRENT['data'] = data
@@ -0,0 +1,40 @@
+"""``bpy.app`` stand-in: version info, handlers and timers."""
+
+import sys as _sys
+
+version = (5, 0, 0)
+version_string = "5.0.0"
+background = True
+binary_path = _sys.executable
+tempdir = ""
+
+
+from . import handlers  # noqa: E402
+
+
+class _Timers:
+    def __init__(self):
+        self.registered = []
+
+    def register(self, function, first_interval=0, persistent=False):
+        self.registered.append(function)
+
+    def unregister(self, function):
+        if function in self.registered:
+            self.registered.remove(function)
+
+    def is_registered(self, function):
+        return function in self.registered
+
+    def run_all(self, max_rounds=1000):
+        """Drive registered timers until they stop rescheduling themselves."""
+        for _ in range(max_rounds):
+            if not self.registered:
+                return
+            for function in list(self.registered):
+                result = function()
+                if result is None and function in self.registered:
+                    self.registered.remove(function)
+
+
+timers = _Timers()
@@ -0,0 +1,22 @@
+"""``bpy.app.handlers`` stand-in."""
+
+
+def persistent(func):
+    func._bpy_persistent = True
+    return func
+
+
+render_pre = []
+render_post = []
+render_init = []
+render_stats = []
+render_write = []
+render_complete = []
+render_cancel = []
+depsgraph_update_post = []
+undo_post = []
+redo_post = []
+load_post = []
+load_pre = []
+save_pre = []
+frame_change_post = []
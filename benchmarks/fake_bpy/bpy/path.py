@@ -0,0 +1,17 @@
+"""``bpy.path`` stand-in."""
+
+import os
+
+
+def abspath(path, start=None, library=None):
+    if path.startswith("//"):
+        return os.path.join(start or os.getcwd(), path[2:])
+    return path
+
+
+def clean_name(name, replace="_"):
+    return "".join(c if c.isalnum() or c in "-_." else replace for c in name)
+
+
+def basename(path):
+    return os.path.basename(path[2:] if path.startswith("//") else path)
@@ -0,0 +1,160 @@
+"""Property definitions that behave like RNA properties on instances."""
+
+
+class _Prop:
+    kind = None
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def default_value(self):
+        if 'default' in self.kwargs:
+            default = self.kwargs['default']
+            if isinstance(default, (list, tuple)) and self.kind != 'ENUM':
+                return list(default)
+            return default
+        return self._empty()
+
+    def _empty(self):
+        return None
+
+    def _store(self, instance):
+        store = instance.__dict__.get('_rna_values')
+        if store is None:
+            store = {}
+            instance.__dict__['_rna_values'] = store
+        return store
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        store = self._store(instance)
+        key = id(self)
+        if key not in store:
+            store[key] = self.default_value()
+        return store[key]
+
+    def __set__(self, instance, value):
+        self._store(instance)[id(self)] = value
+        update = self.kwargs.get('update')
+        if update is not None:
+            from . import context
+            update(instance, context)
+
+
+class _BoolProp(_Prop):
+    kind = 'BOOLEAN'
+
+    def _empty(self):
+        return False
+
+
+class _IntProp(_Prop):
+    kind = 'INT'
+
+    def _empty(self):
+        return 0
+
+
+class _FloatProp(_Prop):
+    kind = 'FLOAT'
+
+    def _empty(self):
+        return 0.0
+
+
+class _FloatVectorProp(_Prop):
+    kind = 'FLOAT_VECTOR'
+
+    def _empty(self):
+        return [0.0] * self.kwargs.get('size', 3)
+
+
+class _StringProp(_Prop):
+    kind = 'STRING'
+
+    def _empty(self):
+        return ""
+
+
+class _EnumProp(_Prop):
+    kind = 'ENUM'
+
+    def default_value(self):
+        items = self.kwargs.get('items')
+        flag = 'ENUM_FLAG' in self.kwargs.get('options', set())
+        if 'default' in self.kwargs:
+            default = self.kwargs['default']
+            return set(default) if flag else default
+        if flag:
+            return set()
+        if callable(items) or not items:
+            return ''
+        return items[0][0]
+
+
+class _PointerProp(_Prop):
+    kind = 'POINTER'
+
+    def default_value(self):
+        ptype = self.kwargs.get('type')
+        from .types import PropertyGroup
+        if isinstance(ptype, type) and issubclass(ptype, PropertyGroup):
+            return ptype()
+        return None
+
+
+class _PropCollection(list):
+    def __init__(self, item_type):
+        super().__init__()
+        self._item_type = item_type
+
+    def add(self):
+        item = self._item_type()
+        self.append(item)
+        return item
+
+    def remove(self, index):
+        del self[index]
+
+    def clear(self):
+        del self[:]
+
+
+class _CollectionProp(_Prop):
+    kind = 'COLLECTION'
+
+    def default_value(self):
+        return _PropCollection(self.kwargs.get('type'))
+
+
+def BoolProperty(**kwargs):
+    return _BoolProp(**kwargs)
+
+
+def IntProperty(**kwargs):
+    return _IntProp(**kwargs)
+
+
+def FloatProperty(**kwargs):
+    return _FloatProp(**kwargs)
+
+
+def FloatVectorProperty(**kwargs):
+    return _FloatVectorProp(**kwargs)
+
+
+def StringProperty(**kwargs):
+    return _StringProp(**kwargs)
+
+
+def EnumProperty(**kwargs):
+    return _EnumProp(**kwargs)
+
+
+def PointerProperty(**kwargs):
+    return _PointerProp(**kwargs)
+
+
+def CollectionProperty(**kwargs):
+    return _CollectionProp(**kwargs)
@@ -0,0 +1,1192 @@
+"""Data model of the stand-in: IDs, collections, scenes and context."""
+
+import copy
+import os
+
+from .props import _Prop
+
+_CURRENT = {}
+
+
+def _identity():
+    from mathutils import Matrix
+    return Matrix()
+
+
+class _RNAProperty:
+    def __init__(self, identifier, value):
+        self.identifier = identifier
+        self.is_readonly = False
+        if isinstance(value, bool):
+            self.type = 'BOOLEAN'
+        elif isinstance(value, int):
+            self.type = 'INT'
+        elif isinstance(value, float):
+            self.type = 'FLOAT'
+        elif isinstance(value, str):
+            self.type = 'STRING'
+        elif isinstance(value, ID):
+            self.type = 'POINTER'
+        elif isinstance(value, (list, tuple)):
+            self.type = 'FLOAT'
+        else:
+            self.type = 'POINTER'
+
+
+class _RNA:
+    def __init__(self, struct):
+        self._struct = struct
+
+    @property
+    def properties(self):
+        return [_RNAProperty(k, v) for k, v in vars(self._struct).items() if not k.startswith('_')]
+
+
+class bpy_struct:
+    @property
+    def bl_rna(self):
+        return _RNA(self)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, value in cls.__dict__.get('__annotations__', {}).items():
+            if isinstance(value, _Prop):
+                setattr(cls, name, value)
+
+    def _idprops(self):
+        store = self.__dict__.get('_idprops_store')
+        if store is None:
+            store = {}
+            self.__dict__['_idprops_store'] = store
+        return store
+
+    def __getitem__(self, key):
+        return self._idprops()[key]
+
+    def __setitem__(self, key, value):
+        self._idprops()[key] = value
+
+    def __delitem__(self, key):
+        del self._idprops()[key]
+
+    def __contains__(self, key):
+        return key in self._idprops()
+
+    def get(self, key, default=None):
+        return self._idprops().get(key, default)
+
+    def keys(self):
+        return self._idprops().keys()
+
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class Operator(bpy_struct):
+    def __init__(self):
+        self.reports = []
+
+    def report(self, level, message):
+        self.reports.append((set(level), message))
+
+
+class Panel(bpy_struct):
+    pass
+
+
+class UIList(bpy_struct):
+    pass
+
+
+class Menu(bpy_struct):
+    pass
+
+
+class ID(bpy_struct):
+    def __init__(self, name=""):
+        self._name = name
+        self._owner = None
+        self.use_fake_user = False
+        self.users = 0
+        self.animation_data = None
+        self.library = None
+        self.asset_data = None
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if self._owner is not None:
+            self._owner._rename(self, value)
+        else:
+            self._name = value
+
+    @property
+    def name_full(self):
+        return self.name
+
+    @property
+    def id_type(self):
+        return {'NodeTree': 'NODETREE'}.get(type(self).__name__, type(self).__name__.upper())
+
+    @property
+    def session_uid(self):
+        return id(self)
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = AnimData()
+        return self.animation_data
+
+    def animation_data_clear(self):
+        self.animation_data = None
+
+    def _keyframe(self, data_path, frame, index=-1):
+        adt = self.animation_data_create()
+        if adt.action is None:
+            adt.action = _CURRENT['data'].actions.new(f"{self.name}Action")
+        adt.action._insert(data_path, index, frame)
+        return True
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r}>"
+
+
+class AnimData:
+    def __init__(self):
+        self.action = None
+
+
+class Keyframe:
+    def __init__(self, frame):
+        self.co = [frame, 0.0]
+        self.interpolation = 'BEZIER'
+
+
+class _KeyframePoints(list):
+    pass
+
+
+class FCurve:
+    def __init__(self, data_path, index):
+        self.data_path = data_path
+        self.array_index = index
+        self.keyframe_points = _KeyframePoints()
+
+
+class Action(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.fcurves = []
+
+    def _insert(self, data_path, index, frame):
+        indices = range(3) if index < 0 else [index]
+        for i in indices:
+            for fc in self.fcurves:
+                if fc.data_path == data_path and fc.array_index == i:
+                    break
+            else:
+                fc = FCurve(data_path, i)
+                self.fcurves.append(fc)
+            fc.keyframe_points.append(Keyframe(frame))
+
+    def copy(self):
+        new = _CURRENT['data'].actions.new(self.name)
+        for fc in self.fcurves:
+            new_fc = FCurve(fc.data_path, fc.array_index)
+            new_fc.keyframe_points.extend(Keyframe(k.co[0]) for k in fc.keyframe_points)
+            new.fcurves.append(new_fc)
+        return new
+
+
+class MaterialSlot:
+    def __init__(self, material=None):
+        self.material = material
+        self.link = 'DATA'
+
+
+class Material(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.use_nodes = False
+        self.node_tree = None
+        self.diffuse_color = [0.8, 0.8, 0.8, 1.0]
+
+
+class _Foreach(list):
+    def __init__(self, items, attr, width):
+        super().__init__(items)
+        self._attr = attr
+        self._width = width
+
+    def foreach_get(self, attr, seq):
+        i = 0
+        for item in self:
+            value = getattr(item, attr)
+            if isinstance(value, (list, tuple)):
+                for v in value:
+                    seq[i] = v
+                    i += 1
+            else:
+                seq[i] = value
+                i += 1
+
+    def foreach_set(self, attr, seq):
+        width = len(getattr(self[0], attr)) if self and isinstance(getattr(self[0], attr), (list, tuple)) else 1
+        for n, item in enumerate(self):
+            if width == 1:
+                setattr(item, attr, seq[n])
+            else:
+                setattr(item, attr, list(seq[n * width:(n + 1) * width]))
+
+
+class MeshVertex:
+    def __init__(self, co):
+        self.co = list(co)
+
+
+class MeshLoop:
+    def __init__(self, vertex_index):
+        self.vertex_index = vertex_index
+
+
+class _UVLayers(list):
+    active = None
+
+
+class MeshPolygon:
+    def __init__(self, vertices):
+        self.vertices = list(vertices)
+        self.loop_total = len(vertices)
+        self.material_index = 0
+
+
+class _MeshMaterials(list):
+    def append(self, mat):
+        super().append(mat)
+
+
+class Mesh(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.vertices = _Foreach([], 'co', 3)
+        self.polygons = _Foreach([], 'vertices', 0)
+        self.loops = _Foreach([], 'vertex_index', 1)
+        self.uv_layers = _UVLayers()
+        self.materials = _MeshMaterials()
+
+    def from_pydata(self, verts, edges, faces):
+        self.vertices = _Foreach([MeshVertex(v) for v in verts], 'co', 3)
+        self.polygons = _Foreach([MeshPolygon(f) for f in faces], 'vertices', 0)
+        self.loops = _Foreach([MeshLoop(i) for f in faces for i in f], 'vertex_index', 1)
+
+    def update(self):
+        pass
+
+    def copy(self):
+        new = _CURRENT['data'].meshes.new(self.name)
+        new.vertices = _Foreach([MeshVertex(v.co) for v in self.vertices], 'co', 3)
+        new.polygons = _Foreach([MeshPolygon(p.vertices) for p in self.polygons], 'vertices', 0)
+        new.loops = _Foreach([MeshLoop(l.vertex_index) for l in self.loops], 'vertex_index', 1)
+        new.materials.extend(self.materials)
+        return new
+
+
+class Light(ID):
+    def __init__(self, name="", type='POINT'):
+        super().__init__(name)
+        self.type = type
+        self.energy = 10.0
+        self.color = [1.0, 1.0, 1.0]
+        self.size = 1.0
+
+
+class Camera(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.lens = 50.0
+        self.sensor_width = 36.0
+        self.sensor_height = 24.0
+        self.sensor_fit = 'AUTO'
+        self.clip_start = 0.1
+        self.clip_end = 1000.0
+        self.type = 'PERSP'
+        self.shift_x = 0.0
+        self.shift_y = 0.0
+
+    @property
+    def angle(self):
+        import math
+        return 2 * math.atan(self.sensor_width / (2 * self.lens))
+
+
+class _BoundBox(list):
+    pass
+
+
+class _ObjectList(list):
+    # like bpy_prop_collection, names are looked up by walking the list
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return self.get(item) is not None
+        return super().__contains__(item)
+
+    def get(self, name, default=None):
+        for o in self:
+            if o.name == name:
+                return o
+        return default
+
+
+class Object(ID):
+    def __init__(self, name="", object_data=None):
+        super().__init__(name)
+        self.data = object_data
+        if object_data is None:
+            self.type = 'EMPTY'
+        elif isinstance(object_data, Mesh):
+            self.type = 'MESH'
+        elif isinstance(object_data, Light):
+            self.type = 'LIGHT'
+        elif isinstance(object_data, Camera):
+            self.type = 'CAMERA'
+        else:
+            self.type = 'EMPTY'
+        self._parent = None
+        self.matrix_parent_inverse = _identity()
+        self.location = [0.0, 0.0, 0.0]
+        self.rotation_euler = [0.0, 0.0, 0.0]
+        self.scale = [1.0, 1.0, 1.0]
+        self.matrix_world = _identity()
+        self.display_type = 'TEXTURED'
+        self.hide_render = False
+        self.hide_viewport = False
+        self.is_shadow_catcher = False
+        self.instance_type = 'NONE'
+        self.instance_collection = None
+        self.empty_display_type = 'PLAIN_AXES'
+        self.modifiers = _Modifiers()
+        self._selected = False
+        self.material_slots = []
+        if isinstance(object_data, Mesh):
+            self.material_slots = [MaterialSlot(m) for m in object_data.materials]
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, value):
+        self._parent = value
+
+    @property
+    def matrix_basis(self):
+        return self.matrix_world
+
+    @property
+    def children(self):
+        # Blender scans every object in Main to build this list.
+        return tuple(o for o in _CURRENT['data'].objects if o._parent is self)
+
+    @property
+    def children_recursive(self):
+        out = []
+        stack = list(self.children)
+        while stack:
+            child = stack.pop()
+            out.append(child)
+            stack.extend(child.children)
+        return out
+
+    @property
+    def users_scene(self):
+        return tuple(s for s in _CURRENT['data'].scenes if self in s.objects)
+
+    @property
+    def users_collection(self):
+        data = _CURRENT['data']
+        found = [c for c in data.collections if self in c.objects._items]
+        found.extend(s.collection for s in data.scenes if self in s.collection.objects._items)
+        return tuple(found)
+
+    @property
+    def bound_box(self):
+        if isinstance(self.data, Mesh) and self.data.vertices:
+            xs = [v.co[0] for v in self.data.vertices]
+            ys = [v.co[1] for v in self.data.vertices]
+            zs = [v.co[2] for v in self.data.vertices]
+            lo = (min(xs), min(ys), min(zs))
+            hi = (max(xs), max(ys), max(zs))
+        else:
+            lo = (-1.0, -1.0, -1.0)
+            hi = (1.0, 1.0, 1.0)
+        return _BoundBox([
+            (lo[0], lo[1], lo[2]), (lo[0], lo[1], hi[2]), (lo[0], hi[1], hi[2]), (lo[0], hi[1], lo[2]),
+            (hi[0], lo[1], lo[2]), (hi[0], lo[1], hi[2]), (hi[0], hi[1], hi[2]), (hi[0], hi[1], lo[2]),
+        ])
+
+    def keyframe_insert(self, data_path, index=-1, frame=0):
+        return self._keyframe(data_path, frame, index)
+
+    def select_get(self):
+        return self._selected
+
+    def select_set(self, state):
+        self._selected = bool(state)
+
+    def visible_get(self):
+        return True
+
+    def evaluated_get(self, depsgraph):
+        return self
+
+    def copy(self):
+        data = _CURRENT['data']
+        new = data.objects.new(self.name, self.data)
+        new.matrix_world = self.matrix_world.copy()
+        new.location = list(self.location)
+        new.rotation_euler = list(self.rotation_euler)
+        return new
+
+    def calc_matrix_camera(self, depsgraph, x=1, y=1, scale_x=1.0, scale_y=1.0):
+        import math
+        cam = self.data
+        f = 1.0 / math.tan(cam.angle / 2.0)
+        aspect = (x * scale_x) / max(y * scale_y, 1e-9)
+        n, fa = cam.clip_start, cam.clip_end
+        if aspect >= 1.0:
+            sx, sy = f, f * aspect
+        else:
+            sx, sy = f / aspect, f
+        return [
+            [sx, 0.0, 0.0, 0.0],
+            [0.0, sy, 0.0, 0.0],
+            [0.0, 0.0, (fa + n) / (n - fa), 2 * fa * n / (n - fa)],
+            [0.0, 0.0, -1.0, 0.0],
+        ]
+
+
+class Modifier:
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.show_render = True
+        self.show_viewport = True
+        self.ratio = 1.0
+        self.decimate_type = 'COLLAPSE'
+
+
+class _Modifiers(list):
+    def new(self, name, type):
+        mod = Modifier(name, type)
+        self.append(mod)
+        return mod
+
+    def remove(self, mod):
+        list.remove(self, mod)
+
+
+class _CollectionObjects:
+    # like Blender, membership by object is hashed but lookup by name walks the list
+    def __init__(self):
+        self._items = {}
+
+    def link(self, obj):
+        if obj in self._items:
+            raise RuntimeError(f"Object '{obj.name}' already in collection")
+        self._items[obj] = None
+        obj.users += 1
+
+    def unlink(self, obj):
+        del self._items[obj]
+        obj.users -= 1
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return self.get(item) is not None
+        return item in self._items
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, name, default=None):
+        for o in self._items:
+            if o.name == name:
+                return o
+        return default
+
+
+class _CollectionChildren:
+    def __init__(self, owner):
+        self._owner = owner
+        self._items = []
+
+    def link(self, col):
+        self._items.append(col)
+        col.users += 1
+        _CURRENT['data']._layer_tree_dirty = True
+
+    def unlink(self, col):
+        self._items.remove(col)
+        col.users -= 1
+        _CURRENT['data']._layer_tree_dirty = True
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return any(c.name == item for c in self._items)
+        return item in self._items
+
+    def get(self, name, default=None):
+        for c in self._items:
+            if c.name == name:
+                return c
+        return default
+
+
+class Collection(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.objects = _CollectionObjects()
+        self.children = _CollectionChildren(self)
+        self.hide_render = False
+        self.hide_viewport = False
+        self.instance_offset = [0.0, 0.0, 0.0]
+
+    @property
+    def children_recursive(self):
+        out = []
+        stack = list(self.children)
+        while stack:
+            col = stack.pop()
+            out.append(col)
+            stack.extend(col.children)
+        return out
+
+    @property
+    def all_objects(self):
+        seen = {}
+        stack = [self]
+        while stack:
+            col = stack.pop()
+            for o in col.objects:
+                seen.setdefault(o, None)
+            stack.extend(col.children)
+        return _ObjectList(seen)
+
+
+class LayerCollection:
+    def __init__(self, collection):
+        self.collection = collection
+        self.name = collection.name
+        self.exclude = False
+        self.hide_viewport = False
+        self.holdout = False
+        self.indirect_only = False
+        self.children = [LayerCollection(c) for c in collection.children]
+
+
+class ViewLayer:
+    def __init__(self, scene, name="ViewLayer"):
+        self._scene = scene
+        self.name = name
+        self.material_override = None
+        self.use_pass_vector = False
+        self.use_pass_z = False
+        self.use = True
+        self._root = None
+
+    @property
+    def layer_collection(self):
+        data = _CURRENT['data']
+        if self._root is None or data._layer_tree_dirty:
+            old = {}
+            if self._root is not None:
+                stack = [self._root]
+                while stack:
+                    lc = stack.pop()
+                    old[lc.collection] = lc.exclude
+                    stack.extend(lc.children)
+            self._root = LayerCollection(self._scene.collection)
+            stack = [self._root]
+            while stack:
+                lc = stack.pop()
+                if lc.collection in old:
+                    lc.exclude = old[lc.collection]
+                stack.extend(lc.children)
+            data._layer_tree_dirty = False
+        return self._root
+
+    def update(self):
+        pass
+
+
+class _ViewLayers(list):
+    def __init__(self, scene):
+        super().__init__()
+        self._scene = scene
+
+    def new(self, name):
+        layer = ViewLayer(self._scene, name)
+        self.append(layer)
+        return layer
+
+    def remove(self, layer):
+        list.remove(self, layer)
+
+    def get(self, name, default=None):
+        for layer in self:
+            if layer.name == name:
+                return layer
+        return default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.get(key)
+        return list.__getitem__(self, key)
+
+
+class ImageFormatSettings(bpy_struct):
+    def __init__(self):
+        self.file_format = 'PNG'
+        self.media_type = 'IMAGE'
+        self.color_mode = 'RGBA'
+        self.color_depth = '8'
+        self.exr_codec = 'ZIP'
+        self.quality = 90
+
+
+class FFmpegSettings(bpy_struct):
+    def __init__(self):
+        self.format = 'MPEG4'
+        self.codec = 'H264'
+        self.constant_rate_factor = 'MEDIUM'
+
+
+class RenderSettings(bpy_struct):
+    def __init__(self):
+        self.engine = 'BLENDER_EEVEE'
+        self.resolution_x = 1920
+        self.resolution_y = 1080
+        self.resolution_percentage = 100
+        self.pixel_aspect_x = 1.0
+        self.pixel_aspect_y = 1.0
+        self.filepath = "/tmp/"
+        self.image_settings = ImageFormatSettings()
+        self.ffmpeg = FFmpegSettings()
+        self.use_persistent_data = False
+        self.use_border = False
+        self.use_crop_to_border = False
+        self.border_min_x = 0.0
+        self.border_min_y = 0.0
+        self.border_max_x = 1.0
+        self.border_max_y = 1.0
+        self.film_transparent = False
+        self.use_overwrite = True
+        self.use_placeholder = False
+        self.use_file_extension = True
+        self.fps = 24
+        self.fps_base = 1.0
+        self.threads_mode = 'AUTO'
+        self.threads = 1
+        self.use_compositing = True
+        self.use_sequencer = True
+
+    def frame_path(self, frame=0, preview=False, view=""):
+        ext = {'PNG': '.png', 'JPEG': '.jpg', 'OPEN_EXR': '.exr',
+               'OPEN_EXR_MULTILAYER': '.exr', 'FFMPEG': '.mp4'}.get(self.image_settings.file_format, '.png')
+        base = self.filepath
+        if '#' in base:
+            count = base.count('#')
+            start = base.index('#')
+            base = base[:start] + f"{frame:0{count}d}" + base[start + count:]
+            return base + ext
+        return f"{base}{frame:04d}{ext}"
+
+
+class _Shading(bpy_struct):
+    def __init__(self):
+        self.light = 'STUDIO'
+        self.studio_light = 'Default'
+        self.studiolight_rotate_z = 0.0
+        self.color_type = 'MATERIAL'
+        self.type = 'SOLID'
+        self.show_xray = False
+
+
+class _Display(bpy_struct):
+    def __init__(self):
+        self.shading = _Shading()
+        self.render_aa = '8'
+        self.viewport_aa = '8'
+
+
+class _Eevee(bpy_struct):
+    def __init__(self):
+        self.use_gtao = False
+        self.taa_render_samples = 64
+
+
+class _Cycles(bpy_struct):
+    def __init__(self):
+        self.samples = 4096
+        self.use_adaptive_sampling = True
+        self.adaptive_threshold = 0.01
+        self.use_denoising = True
+        self.denoiser = 'OPENIMAGEDENOISE'
+        self.device = 'CPU'
+
+
+class _ViewSettings(bpy_struct):
+    def __init__(self):
+        self.view_transform = 'AgX'
+        self.look = 'None'
+        self.exposure = 0.0
+        self.gamma = 1.0
+
+
+class Scene(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.render = RenderSettings()
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_step = 1
+        self.frame_current = 1
+        self.camera = None
+        self.world = None
+        self.collection = Collection("Scene Collection")
+        self.view_layers = _ViewLayers(self)
+        self.view_layers.new("ViewLayer")
+        self.display = _Display()
+        self.eevee = _Eevee()
+        self.cycles = _Cycles()
+        self.view_settings = _ViewSettings()
+        self.use_nodes = False
+
+    def frame_set(self, frame, subframe=0.0):
+        self.frame_current = frame
+
+    @property
+    def objects(self):
+        return self.collection.all_objects
+
+
+class NodeSocket:
+    def __init__(self, name, default_value=None):
+        self.name = name
+        self.identifier = name
+        self.default_value = default_value
+        self.links = []
+        self._owner = None
+
+    def keyframe_insert(self, data_path, index=-1, frame=0):
+        tree = self._owner
+        return tree._keyframe(f'nodes["x"].inputs[0].{data_path}', frame, index)
+
+
+class _Sockets(list):
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for s in self:
+                if s.name == key:
+                    return s
+            raise KeyError(key)
+        return list.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        for s in self:
+            if s.name == key:
+                return s
+        return default
+
+
+_NODE_SOCKETS = {
+    'ShaderNodeTexCoord': ('TEX_COORD', [], ['Generated', 'Normal', 'UV', 'Object']),
+    'ShaderNodeMapping': ('MAPPING', [('Vector', None), ('Location', [0.0, 0.0, 0.0]),
+                                      ('Rotation', [0.0, 0.0, 0.0]), ('Scale', [1.0, 1.0, 1.0])], ['Vector']),
+    'ShaderNodeTexEnvironment': ('TEX_ENVIRONMENT', [('Vector', None)], ['Color', 'Alpha']),
+    'ShaderNodeBackground': ('BACKGROUND', [('Color', [0.05, 0.05, 0.05, 1.0]), ('Strength', 1.0)], ['Background']),
+    'ShaderNodeOutputWorld': ('OUTPUT_WORLD', [('Surface', None), ('Volume', None)], []),
+}
+
+
+class Node:
+    def __init__(self, tree, bl_idname):
+        self.bl_idname = bl_idname
+        spec = _NODE_SOCKETS.get(bl_idname, (bl_idname.upper(), [], []))
+        self.type = spec[0]
+        self.name = bl_idname
+        self.label = ""
+        self.image = None
+        self.location = [0.0, 0.0]
+        self.inputs = _Sockets(NodeSocket(n, d) for n, d in spec[1])
+        self.outputs = _Sockets(NodeSocket(n) for n in spec[2])
+        for s in list(self.inputs) + list(self.outputs):
+            s._owner = tree
+            s._node = self
+
+
+class _Nodes(list):
+    def __init__(self, tree):
+        super().__init__()
+        self._tree = tree
+
+    def new(self, bl_idname):
+        node = Node(self._tree, bl_idname)
+        existing = {n.name for n in self}
+        base = node.name
+        i = 1
+        while node.name in existing:
+            node.name = f"{base}.{i:03d}"
+            i += 1
+        self.append(node)
+        return node
+
+    def remove(self, node):
+        list.remove(self, node)
+
+    def get(self, name, default=None):
+        for n in self:
+            if n.name == name:
+                return n
+        return default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            node = self.get(key)
+            if node is None:
+                raise KeyError(key)
+            return node
+        return list.__getitem__(self, key)
+
+
+class NodeLink:
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_socket._node
+        self.to_node = to_socket._node
+
+
+class _Links(list):
+    def new(self, a, b):
+        link = NodeLink(a, b)
+        self.append(link)
+        a.links.append(link)
+        b.links.append(link)
+        return link
+
+
+class NodeTree(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.nodes = _Nodes(self)
+        self.links = _Links()
+
+
+class World(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self._use_nodes = False
+        self.node_tree = None
+        self.color = [0.05, 0.05, 0.05]
+
+    @property
+    def use_nodes(self):
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        self._use_nodes = value
+        if value and self.node_tree is None:
+            self.node_tree = NodeTree(f"{self.name} Nodes")
+
+    def copy(self):
+        # like Blender the node tree is duplicated and its action shared
+        new = _CURRENT['data'].worlds.new(self.name)
+        new.color = list(self.color)
+        if self.node_tree is not None:
+            new.use_nodes = True
+            for node in self.node_tree.nodes:
+                copied = new.node_tree.nodes.new(node.bl_idname)
+                copied.name = node.name
+                copied.image = node.image
+                for socket, source in zip(copied.inputs, node.inputs):
+                    socket.default_value = copy.deepcopy(source.default_value)
+            if self.node_tree.animation_data is not None:
+                new.node_tree.animation_data_create().action = self.node_tree.animation_data.action
+        return new
+
+
+class _Pixels(list):
+    def foreach_get(self, seq):
+        for i, v in enumerate(self):
+            seq[i] = v
+
+    def foreach_set(self, seq):
+        self[:] = list(seq)
+
+
+class Image(ID):
+    def __init__(self, name="", width=0, height=0):
+        super().__init__(name)
+        self.filepath = ""
+        self.filepath_raw = ""
+        self.size = [width, height]
+        self.file_format = 'PNG'
+        self.is_float = False
+        self.pixels = _Pixels([0.0] * (width * height * 4))
+        self.colorspace_settings = _ColorSpace()
+        self.is_dirty = False
+        self.alpha_mode = 'STRAIGHT'
+
+    def scale(self, width, height):
+        self.size = [width, height]
+        self.pixels = _Pixels([0.0] * (width * height * 4))
+
+    def save(self, filepath=None, quality=None):
+        path = filepath or self.filepath_raw
+        with open(path, 'wb') as fh:
+            fh.write(b"FAKEIMG")
+
+    def save_render(self, filepath, scene=None, quality=None):
+        with open(filepath, 'wb') as fh:
+            fh.write(b"FAKEIMG")
+
+    def reload(self):
+        pass
+
+
+class _ColorSpace:
+    def __init__(self):
+        self.name = 'sRGB'
+
+
+class _IDCollection:
+    def __init__(self, cls):
+        self._cls = cls
+        self._items = {}
+
+    def _unique(self, name):
+        if name not in self._items:
+            return name
+        i = 1
+        while f"{name}.{i:03d}" in self._items:
+            i += 1
+        return f"{name}.{i:03d}"
+
+    def _add(self, item):
+        item._name = self._unique(item._name)
+        item._owner = self
+        self._items[item._name] = item
+        return item
+
+    def _rename(self, item, name):
+        del self._items[item._name]
+        item._name = self._unique(name)
+        self._items[item._name] = item
+
+    def new(self, name, *args, **kwargs):
+        return self._add(self._cls(name, *args, **kwargs))
+
+    def remove(self, item, do_unlink=True):
+        if self._items.get(item.name) is not item:
+            raise ReferenceError(f"{item!r} not found")
+        del self._items[item.name]
+        item._owner = None
+        if do_unlink:
+            _CURRENT['data']._unlink_everywhere(item)
+
+    def get(self, name, default=None):
+        return self._items.get(name, default)
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return item in self._items
+        return self._items.get(item.name) is item
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self._items.values())[key]
+        return self._items[key]
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def keys(self):
+        return self._items.keys()
+
+
+class _Objects(_IDCollection):
+    def new(self, name, object_data):
+        return self._add(Object(name, object_data))
+
+
+class _Lights(_IDCollection):
+    def new(self, name, type='POINT'):
+        return self._add(Light(name, type))
+
+
+class _Images(_IDCollection):
+    def load(self, filepath, check_existing=False):
+        if check_existing:
+            for img in self:
+                if img.filepath == filepath:
+                    return img
+        if not os.path.exists(filepath):
+            raise RuntimeError(f"Error: Cannot read image file '{filepath}'")
+        img = self._add(Image(os.path.basename(filepath), 16, 8))
+        img.filepath = filepath
+        img.filepath_raw = filepath
+        img.is_float = filepath.lower().endswith(('.exr', '.hdr'))
+        return img
+
+    def new(self, name, width, height, alpha=False, float_buffer=False, is_data=False):
+        img = self._add(Image(name, width, height))
+        img.is_float = float_buffer
+        return img
+
+
+class _Data:
+    def __init__(self):
+        self.objects = _Objects(Object)
+        self.meshes = _IDCollection(Mesh)
+        self.materials = _IDCollection(Material)
+        self.lights = _Lights(Light)
+        self.cameras = _IDCollection(Camera)
+        self.collections = _IDCollection(Collection)
+        self.worlds = _IDCollection(World)
+        self.images = _Images(Image)
+        self.actions = _IDCollection(Action)
+        self.scenes = _IDCollection(Scene)
+        self.node_groups = _IDCollection(NodeTree)
+        self.filepath = ""
+        self.is_saved = False
+        self.is_dirty = False
+        self._layer_tree_dirty = True
+        self.scenes.new("Scene")
+
+    def _unlink_everywhere(self, item):
+        if isinstance(item, Object):
+            for col in self.collections:
+                if item in col.objects._items:
+                    col.objects.unlink(item)
+            for scene in self.scenes:
+                if item in scene.collection.objects._items:
+                    scene.collection.objects.unlink(item)
+                if scene.camera is item:
+                    scene.camera = None
+            for obj in self.objects:
+                if obj._parent is item:
+                    obj._parent = None
+        elif isinstance(item, Collection):
+            for col in list(self.collections) + [s.collection for s in self.scenes]:
+                if item in col.children._items:
+                    col.children.unlink(item)
+        elif isinstance(item, Material):
+            for obj in self.objects:
+                for slot in obj.material_slots:
+                    if slot.material is item:
+                        slot.material = None
+            for scene in self.scenes:
+                for layer in scene.view_layers:
+                    if layer.material_override is item:
+                        layer.material_override = None
+        elif isinstance(item, World):
+            for scene in self.scenes:
+                if scene.world is item:
+                    scene.world = None
+
+    def batch_remove(self, ids):
+        for item in list(ids):
+            for coll in (self.objects, self.meshes, self.materials, self.lights, self.cameras,
+                         self.collections, self.worlds, self.images, self.actions, self.scenes,
+                         self.node_groups):
+                if item in coll:
+                    coll.remove(item)
+                    break
+
+    def orphans_purge(self):
+        return 0
+
+
+class _WindowManager:
+    def __init__(self):
+        self.progress = None
+
+    def progress_begin(self, lo, hi):
+        self.progress = lo
+
+    def progress_update(self, value):
+        self.progress = value
+
+    def progress_end(self):
+        self.progress = None
+
+    def event_timer_add(self, interval, window=None):
+        return object()
+
+    def event_timer_remove(self, timer):
+        pass
+
+    def modal_handler_add(self, op):
+        return True
+
+    windows = ()
+
+
+class _TempOverride:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class Context:
+    def __init__(self, data):
+        self._data = data
+        self.window_manager = _WindowManager()
+        self.window = None
+        self.screen = None
+        self.area = None
+        self.preferences = None
+        self.evaluated_depsgraph = None
+
+    @property
+    def scene(self):
+        return self._data.scenes[0]
+
+    @property
+    def view_layer(self):
+        return self.scene.view_layers[0]
+
+    @property
+    def selected_objects(self):
+        return [o for o in self._data.objects if o._selected]
+
+    @property
+    def active_object(self):
+        sel = self.selected_objects
+        return sel[0] if sel else None
+
+    def evaluated_depsgraph_get(self):
+        return None
+
+    def temp_override(self, **kwargs):
+        return _TempOverride()
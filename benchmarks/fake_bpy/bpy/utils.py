@@ -0,0 +1,26 @@
+"""``bpy.utils`` stand-in: class registration."""
+
+_OPERATORS = {}
+_REGISTERED = []
+
+
+def register_class(cls):
+    if cls in _REGISTERED:
+        raise ValueError(f"register_class(...): already registered as a subclass '{cls.__name__}'")
+    _REGISTERED.append(cls)
+    idname = getattr(cls, 'bl_idname', None)
+    if idname and '.' in idname:
+        _OPERATORS[idname] = cls
+
+
+def unregister_class(cls):
+    _REGISTERED.remove(cls)
+    idname = getattr(cls, 'bl_idname', None)
+    if idname in _OPERATORS:
+        del _OPERATORS[idname]
+
+
+def user_resource(resource_type, path="", create=False):
+    import os
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), 'fake_blender_user', resource_type.lower(), path)
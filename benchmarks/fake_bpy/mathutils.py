@@ -0,0 +1,92 @@
+"""Small pure-python stand-in for ``mathutils``."""
+
+import math
+
+
+class Vector(list):
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        super().__init__(float(v) for v in values)
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+
+    def copy(self):
+        return Vector(self)
+
+    @property
+    def length(self):
+        return math.sqrt(sum(v * v for v in self))
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    def __mul__(self, k):
+        return Vector(a * k for a in self)
+
+
+class Matrix(list):
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+        super().__init__([float(v) for v in row] for row in rows)
+
+    @classmethod
+    def Identity(cls, size=4):
+        return cls([[1.0 if i == j else 0.0 for j in range(size)] for i in range(size)])
+
+    @classmethod
+    def Translation(cls, vec):
+        m = cls.Identity()
+        for i in range(3):
+            m[i][3] = vec[i]
+        return m
+
+    @classmethod
+    def Rotation(cls, angle, size, axis):
+        c, s = math.cos(angle), math.sin(angle)
+        m = cls.Identity(size)
+        if axis == 'Z':
+            m[0][0], m[0][1], m[1][0], m[1][1] = c, -s, s, c
+        elif axis == 'X':
+            m[1][1], m[1][2], m[2][1], m[2][2] = c, -s, s, c
+        elif axis == 'Y':
+            m[0][0], m[0][2], m[2][0], m[2][2] = c, s, -s, c
+        return m
+
+    def copy(self):
+        return Matrix(self)
+
+    def __matmul__(self, other):
+        if other and not isinstance(other[0], (list, tuple)):
+            vec = list(other) + [1.0] * (4 - len(other))
+            out = [sum(self[i][k] * vec[k] for k in range(4)) for i in range(4)]
+            return Vector(out[:len(other)])
+        n = len(self)
+        return Matrix([[sum(self[i][k] * other[k][j] for k in range(n)) for j in range(n)] for i in range(n)])
+
+    def inverted(self):
+        n = len(self)
+        a = [list(row) + [1.0 if i == j else 0.0 for j in range(n)] for i, row in enumerate(self)]
+        for col in range(n):
+            pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+            a[col], a[pivot] = a[pivot], a[col]
+            p = a[col][col]
+            if abs(p) < 1e-12:
+                raise ValueError("matrix does not have an inverse")
+            a[col] = [v / p for v in a[col]]
+            for r in range(n):
+                if r != col:
+                    f = a[r][col]
+                    a[r] = [v - f * w for v, w in zip(a[r], a[col])]
+        return Matrix([row[n:] for row in a])
+
+    def to_translation(self):
+        return Vector([self[0][3], self[1][3], self[2][3]])
+
+    @property
+    def translation(self):
+        return self.to_translation()
@@ -0,0 +1,118 @@
+"""Per-frame render time of 'Rotate Objects' vs 'Orbit Camera' on a heavy mesh.
+
+Run with:
+    blender -b --factory-startup --python benchmarks/orbit_benchmark.py -- --frames 24 --subdivisions 6
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import bpy
+
+# blender -b --python doesn't put the script's folder on sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _common import load_addon  # noqa: E402
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=24)
+    parser.add_argument("--subdivisions", type=int, default=6, help="subdivision levels on the test mesh")
+    parser.add_argument("--samples", type=int, default=8, help="Cycles samples, kept low so scene sync dominates")
+    parser.add_argument("--resolution", default='50', choices=['100', '75', '50', '40', '30'])
+    parser.add_argument("--json", help="write the results to this file")
+    return parser.parse_args(argv)
+
+
+def build_heavy_scene(subdivisions):
+    scene = bpy.context.scene
+    for obj in list(scene.objects):
+        if obj.type == 'MESH':
+            bpy.data.objects.remove(obj, do_unlink=True)
+
+    bpy.ops.mesh.primitive_monkey_add(size=2.0)
+    mesh_obj = bpy.context.active_object
+    modifier = mesh_obj.modifiers.new("Subdivision", 'SUBSURF')
+    modifier.levels = 0
+    modifier.render_levels = subdivisions
+
+    for obj in scene.objects:
+        obj.select_set(obj == mesh_obj)
+    return mesh_obj
+
+
+def time_mode(mode, args, output_dir):
+    scene = bpy.context.scene
+    settings = scene.preview_render_settings
+    settings.turntable_mode = mode
+    settings.render_engine = 'CYCLES'
+    settings.resolution_percentage = args.resolution
+    settings.frame_count = args.frames
+    settings.auto_save_path = False
+    settings.output_path = os.path.join(output_dir, mode.lower())
+    settings.file_format = 'PNG'
+    settings.skip_repeated_frames = False
+    scene.cycles.samples = args.samples
+    scene.cycles.device = 'CPU'
+
+    frame_times = []
+    started = {}
+
+    def on_pre(scene, *_):
+        started['t'] = time.perf_counter()
+
+    def on_post(scene, *_):
+        frame_times.append(time.perf_counter() - started['t'])
+
+    bpy.app.handlers.render_pre.append(on_pre)
+    bpy.app.handlers.render_post.append(on_post)
+    try:
+        total_start = time.perf_counter()
+        bpy.ops.preview_render.start()
+        total = time.perf_counter() - total_start
+    finally:
+        bpy.app.handlers.render_pre.remove(on_pre)
+        bpy.app.handlers.render_post.remove(on_post)
+        bpy.ops.preview_render.cleanup()
+
+    return {
+        'mode': mode,
+        'frames': len(frame_times),
+        'total_seconds': total,
+        'first_frame_seconds': frame_times[0] if frame_times else None,
+        'mean_frame_seconds': statistics.mean(frame_times) if frame_times else None,
+        'median_frame_seconds': statistics.median(frame_times) if frame_times else None,
+    }
+
+
+def main():
+    args = parse_args()
+    load_addon()
+    mesh_obj = build_heavy_scene(args.subdivisions)
+    print(f"Test mesh: {mesh_obj.name} at render subdivision level {args.subdivisions}")
+
+    output_dir = tempfile.mkdtemp(prefix="turntable_orbit_bench_")
+    results = [time_mode(mode, args, output_dir) for mode in ('OBJECT', 'CAMERA')]
+
+    print(f"{'mode':<8} {'frames':>6} {'first':>8} {'mean':>8} {'median':>8} {'total':>8}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['frames']:>6} {r['first_frame_seconds']:>8.3f} "
+              f"{r['mean_frame_seconds']:>8.3f} {r['median_frame_seconds']:>8.3f} {r['total_seconds']:>8.2f}")
+
+    object_mean, camera_mean = results[0]['mean_frame_seconds'], results[1]['mean_frame_seconds']
+    if object_mean and camera_mean:
+        print(f"Orbit camera speedup per frame: {object_mean / camera_mean:.2f}x")
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
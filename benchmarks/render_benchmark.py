@@ -0,0 +1,250 @@
+"""Setup, per-frame, cleanup time and peak memory of preview renders on synthetic scenes.
+
+Every combination of the scene options (object count, polygons per object, material
+slots, HDRI width) and render options (engine, resolution, frame count) is rendered
+once.  Results can be written as JSON and compared against an earlier run:
+
+    blender -b --factory-startup --python benchmarks/render_benchmark.py -- \\
+        --objects 10 200 --engines WORKBENCH CYCLES --json results.json
+
+    blender -b --factory-startup --python benchmarks/render_benchmark.py -- \\
+        --objects 10 200 --engines WORKBENCH CYCLES --baseline results.json
+
+With --baseline the exit status is 1 when any timing got slower than the tolerance.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+
+import bpy
+
+# blender -b --python doesn't put the script's folder on sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _common import load_addon  # noqa: E402
+
+# timings compared against the baseline, and the ones too small to compare reliably
+COMPARED_METRICS = ('setup_seconds', 'mean_frame_seconds', 'cleanup_seconds')
+MIN_COMPARED_SECONDS = 0.05
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--polys", type=int, nargs="+", default=[1000], help="polygons per object")
+    parser.add_argument("--materials", type=int, nargs="+", default=[1], help="material slots per object")
+    parser.add_argument("--hdri", type=int, nargs="+", default=[0], help="HDRI width in pixels, 0 for none")
+    parser.add_argument("--engines", nargs="+", default=['WORKBENCH', 'EEVEE', 'CYCLES'],
+                        choices=['WORKBENCH', 'EEVEE', 'CYCLES'])
+    parser.add_argument("--resolutions", nargs="+", default=['30'], choices=['100', '75', '50', '40', '30'])
+    parser.add_argument("--frames", type=int, nargs="+", default=[4])
+    parser.add_argument("--samples", type=int, default=4, help="Cycles and Eevee samples")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results written earlier with --json")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, 0.25 is 25%%")
+    return parser.parse_args(argv)
+
+
+def engine_id(addon, engine):
+    return {'WORKBENCH': 'BLENDER_WORKBENCH', 'EEVEE': addon.PreviewRenderSettings.get_eevee_id(), 'CYCLES': 'CYCLES'}[engine]
+
+
+def clear_scene():
+    scene = bpy.context.scene
+    for obj in list(scene.objects):
+        if obj.type != 'CAMERA':
+            bpy.data.objects.remove(obj, do_unlink=True)
+    for datablocks in (bpy.data.meshes, bpy.data.materials, bpy.data.images):
+        for block in list(datablocks):
+            if block.users == 0:
+                datablocks.remove(block)
+
+
+def grid_mesh(name, polys, material_count):
+    side = max(1, int(math.sqrt(polys)))
+    verts = [(x / side - 0.5, y / side - 0.5, 0.0) for y in range(side + 1) for x in range(side + 1)]
+    faces = [
+        (y * (side + 1) + x, y * (side + 1) + x + 1, (y + 1) * (side + 1) + x + 1, (y + 1) * (side + 1) + x)
+        for y in range(side) for x in range(side)
+    ]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+
+    for index in range(material_count):
+        material = bpy.data.materials.new(f"{name}_mat{index}")
+        material.diffuse_color = (index / max(1, material_count), 0.5, 0.5, 1.0)
+        mesh.materials.append(material)
+    mesh.polygons.foreach_set("material_index", [i % material_count for i in range(len(mesh.polygons))])
+    mesh.update()
+    return mesh
+
+
+def build_scene(object_count, polys, material_count):
+    clear_scene()
+    scene = bpy.context.scene
+    source = grid_mesh("bench", polys, material_count)
+    columns = max(1, int(math.sqrt(object_count)))
+
+    objects = []
+    for index in range(object_count):
+        obj = bpy.data.objects.new(f"bench_{index:05d}", source.copy())
+        obj.location = (index % columns * 1.2, index // columns * 1.2, 0.0)
+        scene.collection.objects.link(obj)
+        objects.append(obj)
+
+    for obj in scene.objects:
+        obj.select_set(obj in objects)
+    return objects
+
+
+def write_hdri(width, directory):
+    height = max(1, width // 2)
+    image = bpy.data.images.new(f"bench_hdri_{width}", width, height, float_buffer=True)
+    pixels = array('f', [0.5]) * (width * height * 4)
+    image.pixels.foreach_set(pixels)
+    path = os.path.join(directory, f"bench_{width}.exr")
+    image.filepath_raw = path
+    image.file_format = 'OPEN_EXR'
+    image.save()
+    bpy.data.images.remove(image)
+    return path
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 ** 2 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_case(addon, case, hdri_path, args, output_dir):
+    scene = bpy.context.scene
+    settings = scene.preview_render_settings
+    settings.render_engine = engine_id(addon, case['engine'])
+    settings.resolution_percentage = case['resolution']
+    settings.frame_count = case['frames']
+    settings.auto_save_path = False
+    settings.output_path = output_dir
+    settings.file_format = 'PNG'
+    settings.skip_repeated_frames = False
+    settings.lighting_preset = 'STUDIO'
+    if hdri_path:
+        settings.hdri_directory = os.path.dirname(hdri_path)
+        settings.hdri_file = hdri_path
+    else:
+        settings.hdri_directory = ""
+        settings.hdri_file = 'NONE'
+    scene.cycles.samples = args.samples
+    scene.cycles.device = 'CPU'
+    if hasattr(scene.eevee, 'taa_render_samples'):
+        scene.eevee.taa_render_samples = args.samples
+
+    started = time.perf_counter()
+    result = bpy.ops.preview_render.start()
+    total = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bpy.ops.preview_render.cleanup()
+    cleanup = time.perf_counter() - started
+
+    report = {}
+    report_path = os.path.join(output_dir, addon.RenderStats.JSON_NAME)
+    if os.path.isfile(report_path):
+        with open(report_path) as fh:
+            report = json.load(fh)
+
+    return dict(case, **{
+        'result': sorted(result),
+        'total_seconds': total,
+        'setup_seconds': report.get('setup_seconds'),
+        'mean_frame_seconds': report.get('mean_frame_seconds'),
+        'max_frame_seconds': report.get('max_frame_seconds'),
+        'frames_rendered': report.get('frames_rendered'),
+        'cleanup_seconds': cleanup,
+        'peak_memory_mb': report.get('peak_memory_mb'),
+        'peak_rss_mb': peak_rss_mb(),
+    })
+
+
+def case_key(case):
+    return (f"{case['engine']}/{case['resolution']}%/{case['frames']}f/"
+            f"{case['objects']}obj/{case['polys']}poly/{case['materials']}mat/{case['hdri']}hdri")
+
+
+def compare(results, baseline, tolerance):
+    previous = {case_key(case): case for case in baseline}
+    regressions = []
+    for case in results:
+        old = previous.get(case_key(case))
+        if old is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = old.get(metric), case.get(metric)
+            if before is None or after is None or max(before, after) < MIN_COMPARED_SECONDS:
+                continue
+            if after > before * (1.0 + tolerance):
+                regressions.append(f"{case_key(case)} {metric}: {before:.3f}s -> {after:.3f}s")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    addon = load_addon()
+    work_dir = tempfile.mkdtemp(prefix="turntable_render_bench_")
+
+    results = []
+    try:
+        hdri_paths = {width: write_hdri(width, work_dir) if width else None for width in args.hdri}
+        for objects, polys, materials in itertools.product(args.objects, args.polys, args.materials):
+            build_scene(objects, polys, materials)
+            render_cases = itertools.product(args.hdri, args.engines, args.resolutions, args.frames)
+            for hdri, engine, resolution, frames in render_cases:
+                if engine == 'WORKBENCH' and hdri:
+                    continue
+                case = {
+                    'objects': objects, 'polys': polys, 'materials': materials, 'hdri': hdri,
+                    'engine': engine, 'resolution': resolution, 'frames': frames,
+                }
+                output_dir = os.path.join(work_dir, f"case_{len(results):03d}")
+                os.makedirs(output_dir)
+                result = run_case(addon, case, hdri_paths[hdri], args, output_dir)
+                results.append(result)
+                print(f"{case_key(case):<48} setup {result['setup_seconds'] or 0:7.3f}s  "
+                      f"frame {result['mean_frame_seconds'] or 0:7.3f}s  "
+                      f"cleanup {result['cleanup_seconds']:7.3f}s  "
+                      f"peak {result['peak_memory_mb'] or 0:8.1f} MB")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    payload = {
+        'blender_version': bpy.app.version_string,
+        'platform': sys.platform,
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(payload, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline.get('results', []), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
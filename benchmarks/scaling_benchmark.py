@@ -0,0 +1,245 @@
+"""How preview setup, cleanup and the HDRI scan scale with the size of the scene.
+
+Each size builds a scene of that many selected objects spread over collections
+(and an HDRI folder of that many files), times every path, then fits the
+exponent k of time ~ size^k.  The exit status is 1 when any path grows faster
+than --max-exponent, so a quadratic loop fails the run.
+
+Without Blender the stand-in in benchmarks/fake_bpy is used, which is enough
+for CI. The add-on needs numpy, which Blender ships but a plain Python doesn't:
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/scaling_benchmark.py --sizes 1000 3000 10000 30000
+
+Inside Blender the real API is timed, rendering a single small frame per start:
+    blender -b --factory-startup --python benchmarks/scaling_benchmark.py -- --sizes 1000 3000 10000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# inside Blender the real bpy is already imported and wins over the stand-in
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "fake_bpy"))
+import bpy  # noqa: E402
+
+# blender -b --python doesn't put the script's folder on sys.path
+sys.path.insert(0, BENCHMARK_DIR)
+from _common import load_addon  # noqa: E402
+
+try:
+    import numpy  # noqa: E402,F401
+except ImportError:
+    sys.exit("The add-on needs numpy, outside Blender install it with: pip install -r benchmarks/requirements.txt")
+
+OBJECTS_PER_COLLECTION = 50
+
+# (label, turntable mode, use preview scene)
+MODES = (
+    ('object', 'OBJECT', False),
+    ('camera', 'CAMERA', False),
+    ('preview_scene', 'OBJECT', True),
+)
+
+
+class SetupAborted(Exception):
+    pass
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 3000, 10000, 30000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size, the fastest is kept")
+    parser.add_argument("--max-exponent", type=float, default=1.3,
+                        help="fail when a path grows faster than size to this power")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+    if len(args.sizes) < 2:
+        parser.error("--sizes needs at least two sizes to fit a slope")
+    return args
+
+
+def clear_scene():
+    scene = bpy.context.scene
+    bpy.data.batch_remove([obj for obj in bpy.data.objects if obj.type != 'CAMERA'])
+    bpy.data.batch_remove(list(bpy.data.collections))
+    for mesh in list(bpy.data.meshes):
+        if mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    return scene
+
+
+def build_scene(size):
+    scene = clear_scene()
+    if scene.camera is None:
+        camera = bpy.data.objects.new("Bench_Camera", bpy.data.cameras.new("Bench_Camera"))
+        scene.collection.objects.link(camera)
+        scene.camera = camera
+    scene.camera.location = (0.0, -10.0, 2.0)
+
+    mesh = bpy.data.meshes.new("bench")
+    mesh.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], [], [(0, 1, 2, 3)])
+
+    collection = None
+    for index in range(size):
+        if index % OBJECTS_PER_COLLECTION == 0:
+            collection = bpy.data.collections.new(f"bench_{index // OBJECTS_PER_COLLECTION:05d}")
+            scene.collection.children.link(collection)
+        obj = bpy.data.objects.new(f"bench_{index:06d}", mesh)
+        obj.location = (index % 100, index // 100, 0.0)
+        collection.objects.link(obj)
+
+    for obj in scene.objects:
+        obj.select_set(obj.type == 'MESH')
+
+
+def configure(settings, output_dir, mode, use_preview_scene):
+    settings.turntable_mode = mode
+    settings.use_preview_scene = use_preview_scene
+    settings.render_engine = 'CYCLES'
+    settings.lighting_preset = 'STUDIO'
+    settings.resolution_percentage = '30'
+    settings.frame_count = 1
+    settings.auto_save_path = False
+    settings.output_path = output_dir
+    settings.file_format = 'PNG'
+    settings.parallel_render = False
+    settings.hdri_directory = ""
+    settings.hdri_file = 'NONE'
+    bpy.context.scene.cycles.samples = 1
+
+
+def time_mode(addon, mode, use_preview_scene, output_dir):
+    operator = addon.PREVIEWRENDER_OT_start
+    configure(bpy.context.scene.preview_render_settings, output_dir, mode, use_preview_scene)
+    timings = {}
+
+    # a failing last setup step times the setup alone and the error path's restore
+    original_stats_task = operator.stats_task
+    original_cleanup = operator.cleanup_and_restore
+
+    def abort(*args, **kwargs):
+        raise SetupAborted("benchmark")
+
+    def timed_cleanup(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original_cleanup(*args, **kwargs)
+        finally:
+            timings['cleanup_and_restore'] = time.perf_counter() - started
+
+    operator.stats_task = abort
+    operator.cleanup_and_restore = timed_cleanup
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()):
+            bpy.ops.preview_render.start()
+        timings['setup'] = time.perf_counter() - started - timings['cleanup_and_restore']
+    finally:
+        operator.stats_task = original_stats_task
+        operator.cleanup_and_restore = original_cleanup
+
+    bpy.ops.preview_render.start()
+    started = time.perf_counter()
+    bpy.ops.preview_render.cleanup()
+    timings['cleanup'] = time.perf_counter() - started
+    return timings
+
+
+def time_hdri_scan(addon, size, work_dir):
+    hdri_dir = os.path.join(work_dir, f"hdri_{size}")
+    os.makedirs(hdri_dir)
+    for index in range(size):
+        open(os.path.join(hdri_dir, f"studio_{index:06d}.hdr"), 'wb').close()
+
+    scene = bpy.context.scene
+    settings = scene.preview_render_settings
+    settings.hdri_directory = hdri_dir
+    addon.HDRI_INDEX.clear()
+    started = time.perf_counter()
+    items = addon.get_hdri_files(settings, bpy.context)
+    elapsed = time.perf_counter() - started
+    settings.hdri_directory = ""
+    shutil.rmtree(hdri_dir)
+
+    assert len(items) == size, f"expected {size} HDRIs, found {len(items)}"
+    return elapsed
+
+
+def measure(addon, size, repeat, work_dir):
+    build_scene(size)
+    best = {}
+    for _ in range(repeat):
+        timings = {}
+        for label, mode, use_preview_scene in MODES:
+            output_dir = os.path.join(work_dir, f"{label}_{size}")
+            for name, seconds in time_mode(addon, mode, use_preview_scene, output_dir).items():
+                timings[f"{label}_{name}"] = seconds
+        timings['hdri_scan'] = time_hdri_scan(addon, size, work_dir)
+        for name, seconds in timings.items():
+            best[name] = min(seconds, best.get(name, math.inf))
+    return best
+
+
+def fit_exponent(sizes, seconds):
+    # least squares slope of log(time) over log(size)
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(s, 1e-9)) for s in seconds]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return numerator / denominator
+
+
+def main():
+    args = parse_args()
+    addon = load_addon()
+    sizes = sorted(set(args.sizes))
+    work_dir = tempfile.mkdtemp(prefix="turntable_scaling_bench_")
+
+    results = {}
+    try:
+        for size in sizes:
+            results[size] = measure(addon, size, args.repeat, work_dir)
+            print(f"{size:>7} objects  " + "  ".join(
+                f"{name} {seconds * 1000:.1f}ms" for name, seconds in results[size].items()))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    exponents = {
+        name: fit_exponent(sizes, [results[size][name] for size in sizes])
+        for name in results[sizes[0]]
+    }
+    too_steep = {name: k for name, k in exponents.items() if k > args.max_exponent}
+
+    print(f"\n{'path':<34} {'exponent':>8}")
+    for name, k in exponents.items():
+        flag = "  SUPER-LINEAR" if name in too_steep else ""
+        print(f"{name:<34} {k:>8.2f}{flag}")
+
+    if args.json:
+        payload = {
+            'blender_version': getattr(bpy.app, 'version_string', None),
+            'sizes': sizes,
+            'seconds': {name: [results[size][name] for size in sizes] for name in exponents},
+            'exponents': exponents,
+            'max_exponent': args.max_exponent,
+        }
+        with open(args.json, 'w') as fh:
+            json.dump(payload, fh, indent=2)
+
+    if too_steep:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
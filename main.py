@@ -12,7 +12,6 @@ bl_info = {
 
 import bpy
 import os
-import glob
 import tempfile
 from bpy.props import (
     EnumProperty,
@@ -21,33 +20,219 @@ from bpy.props import (
     BoolProperty,
     StringProperty,
     PointerProperty,
+    CollectionProperty,
 )
 import math
+import array
+import argparse
+import collections
+import copy
+import fnmatch
+import itertools
+import glob
+import sys
+import numpy as np
+import hashlib
+import csv
+import json
+import queue
+import re
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import traceback
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from bpy.app.handlers import persistent
+from mathutils import Matrix
 
 default_output_path = os.path.join(tempfile.gettempdir(), 'blender_turntables')
 
-PREVIEW_BACKUP = {}
+PARALLEL_JOB = None
+
+# Callables run once the in-process render finishes, each gets a `cancelled` flag
+POST_RENDER_TASKS = []
+
+# Manifest of the in-process render, updated from the render_write handler
+ACTIVE_MANIFEST = None
+
+# Timing of the running or last render, fed by the render handlers or the parallel workers' output
+ACTIVE_STATS = None
+
+# Video encoder of the in-process render, fed each frame from the render_write handler
+ACTIVE_STREAM = None
+
+# Preview whose changes are in the scene, it restores them once its render is done
+# (renders block in the background, there it waits for cleanup like before)
+ACTIVE_JOB = None
+
+# Renders started while another one runs, each starts once the one before is restored
+RENDER_QUEUE = []
+
+HDRI_EXTENSIONS = ('.hdr', '.exr')
+
+# Cache of scanned HDRI directories, keyed by (directory, recursive).  The
+# enum items list is kept here so Blender always gets the same list object
+# back and doesn't lose the strings it points at between redraws.
+HDRI_INDEX = {}
+
+NO_HDRI_ITEMS = [('NONE', 'No HDRIs Found', '', 0)]
+
+# Downsampled copies of HDRIs, named after the source path, its mtime and size
+HDRI_PROXY_DIR = os.path.join(default_output_path, 'hdri_cache')
+
+# Proxy path per (source, mtime, size, width), so sources that are already small
+# enough aren't loaded again just to find that out
+HDRI_PROXIES = {}
+
+# Decimated draft meshes, one .blend each, named after a hash of the source mesh data and the ratio
+MESH_PROXY_DIR = os.path.join(default_output_path, 'mesh_cache')
+
+# Meshes smaller than this render as they are in draft geometry
+DRAFT_MIN_TRIANGLES = 1000
+
+# Object types whose bound_box covers what they render, for the turntable border
+BOUNDED_OBJECT_TYPES = {
+    'MESH', 'CURVE', 'CURVES', 'SURFACE', 'META', 'FONT', 'VOLUME', 'POINTCLOUD', 'GPENCIL', 'GREASEPENCIL',
+}
+
+# Projected points per chunk when bounding the turntable on screen
+BORDER_CHUNK_POINTS = 1 << 20
+
+# Local bounding sphere (center, radius) per mesh, or per object when modifiers change its geometry.
+# Dropped when the depsgraph reports a geometry update, or on undo and file load
+MESH_BOUNDS = {}
+
+# Extra distance for the auto-framed camera so the silhouette doesn't touch the frame edge
+AUTO_FRAME_PADDING = 1.05
+
+# Node names of the world set up for an HDRI, used to recognise it on the next run
+HDRI_MAPPING_NODE = "Preview_Mapping"
+HDRI_ENVIRONMENT_NODE = "Preview_Environment"
+
+
+def scan_hdri_directory(hdri_dir, recursive=False):
+    hdri_paths = []
+
+    if recursive:
+        for root, dirs, files in os.walk(hdri_dir):
+            for file_name in files:
+                if file_name.lower().endswith(HDRI_EXTENSIONS):
+                    hdri_paths.append(os.path.join(root, file_name))
+    else:
+        with os.scandir(hdri_dir) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(HDRI_EXTENSIONS) and entry.is_file():
+                    hdri_paths.append(entry.path)
+
+    hdri_paths.sort(key=lambda p: os.path.relpath(p, hdri_dir).lower())
+    return hdri_paths
+
+
+def get_hdri_index(hdri_dir, recursive=False, force=False):
+    # only the top-level folder mtime is checked so a redraw is a single stat,
+    # changes inside subfolders need an explicit rescan
+    try:
+        mtime = os.stat(hdri_dir).st_mtime_ns
+    except OSError:
+        HDRI_INDEX.pop((hdri_dir, recursive), None)
+        return None
+
+    key = (hdri_dir, recursive)
+    index = HDRI_INDEX.get(key)
+    if index is not None and index['mtime'] == mtime and not force:
+        return index
+
+    hdri_paths = scan_hdri_directory(hdri_dir, recursive)
+    items = []
+    for idx, hdri_path in enumerate(hdri_paths):
+        hdri_name = os.path.relpath(hdri_path, hdri_dir) if recursive else os.path.basename(hdri_path)
+        items.append((hdri_path, hdri_name, "", idx))
+
+    index = {
+        'mtime': mtime,
+        'paths': hdri_paths,
+        'items': items or NO_HDRI_ITEMS,
+    }
+    HDRI_INDEX[key] = index
+    return index
+
+
+def atomic_write(path, writer):
+    # other Blender processes may be reading the cache, so never expose a half-written file.
+    # writer saves to the temporary path it's given, which then replaces the file in one go
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        writer(temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+
+
+def get_hdri_proxy(hdri_path, max_width):
+    stat = os.stat(hdri_path)
+    key = (hdri_path, stat.st_mtime_ns, stat.st_size, max_width)
+    if key in HDRI_PROXIES:
+        return HDRI_PROXIES[key]
+
+    source_id = hashlib.sha1(os.path.abspath(hdri_path).encode()).hexdigest()[:16]
+    version_id = hashlib.sha1(f"{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:8]
+    prefix = f"{source_id}_{max_width}_"
+    proxy_path = os.path.join(HDRI_PROXY_DIR, f"{prefix}{version_id}.exr")
+
+    if not os.path.isfile(proxy_path):
+        image = bpy.data.images.load(hdri_path)
+        try:
+            width, height = image.size
+            if width <= max_width:
+                HDRI_PROXIES[key] = hdri_path
+                return hdri_path
+
+            image.scale(max_width, max(1, round(height * max_width / width)))
+            image.file_format = 'OPEN_EXR'
+
+            def save(temp_path):
+                image.filepath_raw = temp_path
+                image.save()
+
+            atomic_write(proxy_path, save)
+        finally:
+            bpy.data.images.remove(image)
+
+        for file_name in os.listdir(HDRI_PROXY_DIR):
+            stale_path = os.path.join(HDRI_PROXY_DIR, file_name)
+            if file_name.startswith(prefix) and stale_path != proxy_path:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+
+    HDRI_PROXIES[key] = proxy_path
+    return proxy_path
+
 
 def get_hdri_files(self, context):
-    scn = context.scene
-    settings = scn.preview_render_settings
+    settings = context.scene.preview_render_settings
 
     hdri_dir = bpy.path.abspath(settings.hdri_directory)
-    items = []
+    if not hdri_dir or not os.path.isdir(hdri_dir):
+        return NO_HDRI_ITEMS
 
-    if os.path.isdir(hdri_dir):
-        hdri_paths = glob.glob(os.path.join(hdri_dir, '*.hdr')) + glob.glob(os.path.join(hdri_dir, '*.exr'))
-        for idx, hdri_path in enumerate(hdri_paths):
-            hdri_name = os.path.basename(hdri_path)
-            items.append((hdri_path, hdri_name, "", idx))
-    else:
-        items.append(('NONE', 'No HDRIs Found', '', 0))
+    index = get_hdri_index(hdri_dir, settings.hdri_recursive)
+    if index is None:
+        return NO_HDRI_ITEMS
+
+    return index['items']
 
-    if not items:
-        items.append(('NONE', 'No HDRIs Found', '', 0))
 
-    return items
 
+class PreviewRenderCreatedID(bpy.types.PropertyGroup):
+    id_type: StringProperty()
 
 
 class PreviewRenderSettings(bpy.types.PropertyGroup):
@@ -81,6 +266,15 @@ class PreviewRenderSettings(bpy.types.PropertyGroup):
         default='100',
     )
 
+    time_budget: FloatProperty(
+        name="Time Budget (min)",
+        default=0.0,
+        min=0.0,
+        max=100000.0,
+        description="Minutes the whole render may take. A few small calibration frames are timed and the "
+                    "highest samples, denoising and resolution that fit are used. 0 keeps the scene's own"
+    )
+
     frame_count: IntProperty(
         name="Frame Count",
         default=200,
@@ -89,6 +283,76 @@ class PreviewRenderSettings(bpy.types.PropertyGroup):
         description="Number of frames to render"
     )
 
+    sparse_keyframes: IntProperty(
+        name="Keyframe Interval",
+        default=1,
+        min=1,
+        max=16,
+        description="Render every this many frames and make the ones between from the keyframes' depth, "
+                    "rendering only the pixels that can't be made that way. 1 renders every frame"
+    )
+
+    sparse_tolerance: FloatProperty(
+        name="Tolerance",
+        default=0.05,
+        min=0.0,
+        max=1.0,
+        description="How far the keyframes either side of a frame may disagree on a pixel before it is rendered"
+    )
+
+    progressive: BoolProperty(
+        name="Draft First",
+        default=False,
+        description="Render a quick draft of the whole turntable first and the full render after it in background "
+                    "workers. Editing the output settings meanwhile restarts the full render on the same setup"
+    )
+
+    progressive_draft: EnumProperty(
+        name="Draft",
+        items=[
+            ('WORKBENCH', "Workbench", "Solid shading at the full resolution"),
+            ('LOW_RES', "Low Resolution", "The render engine at 30% with its lowest samples"),
+        ],
+        default='WORKBENCH',
+    )
+
+    progressive_frame_step: IntProperty(
+        name="Every Nth Frame",
+        default=1,
+        min=1,
+        max=8,
+        description="Draft only every this many frames, the draft video holds each until the next"
+    )
+
+    turntable_mode: EnumProperty(
+        name="Turntable Mode",
+        items=[
+            ('OBJECT', "Rotate Objects", "Parent the selection to an empty and spin it"),
+            ('CAMERA', "Orbit Camera", "Keep the selection still and orbit a camera around it, "
+                                       "so Cycles can keep its scene data between frames"),
+        ],
+        default='OBJECT',
+    )
+
+    use_preview_scene: BoolProperty(
+        name="Use Preview Scene",
+        default=False,
+        description="Render from a temporary scene that links the selection unchanged, "
+                    "leaving the current scene untouched"
+    )
+
+    batch_mode: EnumProperty(
+        name="Batch",
+        items=[
+            ('NONE', "Off", "Render the whole selection as one turntable"),
+            ('OBJECT', "Per Object", "A turntable for every selected object, children go with their parent"),
+            ('COLLECTION', "Per Collection", "A turntable for every top level collection in the selection"),
+        ],
+        default='NONE',
+        description="Render one turntable per asset with a shared setup, each into its own folder "
+                    "with the camera fitted to it"
+    )
+
     rotation_degrees: FloatProperty(
         name="Object Rotation Degrees",
         default=720.0,
@@ -103,6 +367,18 @@ class PreviewRenderSettings(bpy.types.PropertyGroup):
         max=3600.0,
     )
 
+    seamless_loop: BoolProperty(
+        name="Seamless Loop",
+        default=False,
+        description="End the rotation one frame past the last frame so the sequence loops without repeating the first frame"
+    )
+
+    skip_repeated_frames: BoolProperty(
+        name="Skip Repeated Frames",
+        default=True,
+        description="Render only one revolution when the rotations repeat within the frame range and reuse those frames for the rest"
+    )
+
     auto_save_path: BoolProperty(
         name="Auto-Save to Project Folder",
         default=True,
@@ -120,6 +396,36 @@ class PreviewRenderSettings(bpy.types.PropertyGroup):
         default=False,
     )
 
+    draft_geometry: BoolProperty(
+        name="Draft Geometry",
+        default=False,
+        description="Render decimated copies of the selected meshes, cached on disk. "
+                    "The objects themselves are left alone"
+    )
+
+    draft_mode: EnumProperty(
+        name="Draft Reduction",
+        items=[
+            ('RATIO', 'Ratio', 'Keep this fraction of every mesh'),
+            ('BUDGET', 'Triangle Budget', 'Reduce the whole selection to about this many triangles'),
+        ],
+        default='RATIO',
+    )
+
+    draft_ratio: FloatProperty(
+        name="Ratio",
+        default=0.1,
+        min=0.001,
+        max=1.0,
+        subtype='FACTOR',
+    )
+
+    draft_triangle_budget: IntProperty(
+        name="Triangles",
+        default=500000,
+        min=1000,
+    )
+
     custom_resolution: BoolProperty(
         name="Custom Resolution",
         default=False,
@@ -139,6 +445,27 @@ class PreviewRenderSettings(bpy.types.PropertyGroup):
         max=8192,
     )
 
+    auto_border: BoolProperty(
+        name="Crop to Turntable",
+        default=False,
+        description="Render only the part of the frame the selection passes through over the whole rotation"
+    )
+
+    crop_to_border: BoolProperty(
+        name="Crop Image",
+        default=False,
+        description="Save just that region instead of the full frame with the rest left empty"
+    )
+
+    border_margin: FloatProperty(
+        name="Border Margin",
+        default=0.02,
+        min=0.0,
+        max=0.5,
+        subtype='FACTOR',
+        description="Space added around the region, as a fraction of the frame"
+    )
+
     file_format: EnumProperty(
         name="File Format",
         items=[
@@ -149,11 +476,114 @@ class PreviewRenderSettings(bpy.types.PropertyGroup):
         default='PNG',
     )
 
+    video_targets: EnumProperty(
+        name="Stream Video",
+        items=[
+            ('REVIEW_MP4', 'Review MP4', 'H.264 at high quality'),
+            ('WEB_MP4', 'Web MP4', 'H.264 at 2 Mbit/s, plays while it downloads'),
+            ('WEB_WEBM', 'Web WebM', 'VP9 at 1 Mbit/s'),
+        ],
+        options={'ENUM_FLAG'},
+        default=set(),
+        description="Also encode these videos while the frames render, each frame is piped to ffmpeg "
+                    "as soon as it's saved. Needs ffmpeg"
+    )
+
+    transparent_background: BoolProperty(
+        name="Transparent Background",
+        default=False,
+        description="Render RGBA frames without the world behind the objects, backdrops can be put in afterwards"
+    )
+
+    shadow_catcher: BoolProperty(
+        name="Shadow Catcher",
+        default=False,
+        description="Keep the shadows under the objects in the transparent frames (Cycles)"
+    )
+
+    backdrops: StringProperty(
+        name="Backdrops",
+        default="",
+        description="Comma separated colours put behind the transparent frames once they are rendered, "
+                    "#ffffff for a solid one, #ffffff>#a0a0a0 for a gradient from top to bottom"
+    )
+
+    use_render_cache: BoolProperty(
+        name="Reuse Identical Renders",
+        default=True,
+        description="Skip rendering when an identical job already finished in Preview_Renders"
+    )
+
+    cache_max_size_gb: FloatProperty(
+        name="Max Disk Usage (GB)",
+        default=0.0,
+        min=0.0,
+        description="Delete the oldest catalogued renders above this size, 0 keeps everything"
+    )
+
+    cache_max_age_days: IntProperty(
+        name="Max Age (Days)",
+        default=0,
+        min=0,
+        description="Delete catalogued renders older than this, 0 keeps everything"
+    )
+
+    show_catalog: BoolProperty(
+        name="Show Render Catalog",
+        default=False,
+    )
+
+    parallel_render: BoolProperty(
+        name="Parallel Render",
+        default=False,
+        description="Split the frame range across several background Blender processes"
+    )
+
+    parallel_workers: IntProperty(
+        name="Workers",
+        default=4,
+        min=1,
+        max=256,
+        description="Number of background Blender processes to render with"
+    )
+
+    parallel_threads: IntProperty(
+        name="Threads per Worker",
+        default=0,
+        min=0,
+        max=1024,
+        description="Render threads for each worker, 0 splits the available cores evenly"
+    )
+
     use_active_camera: BoolProperty(
         name="Use Active Camera",
         default=True,
     )
 
+    auto_frame_camera: BoolProperty(
+        name="Auto-Frame Camera",
+        default=False,
+        description="Render from a new camera placed so the selection stays in frame over the whole rotation"
+    )
+
+    auto_frame_lens: FloatProperty(
+        name="Lens",
+        default=50.0,
+        min=1.0,
+        max=5000.0,
+        subtype='DISTANCE_CAMERA',
+        unit='CAMERA',
+        description="Focal length of the auto-framed camera"
+    )
+
+    auto_frame_elevation_degrees: FloatProperty(
+        name="Camera Elevation Degrees",
+        default=15.0,
+        min=-89.0,
+        max=89.0,
+        description="How far above the objects the auto-framed camera looks down from"
+    )
+
     camera_object: PointerProperty(
         name="Camera",
         type=bpy.types.Object,
@@ -180,17 +610,69 @@ class PreviewRenderSettings(bpy.types.PropertyGroup):
         default='NONE',
     )
 
+    variant_hdris: StringProperty(
+        name="HDRI Variants",
+        default="",
+        description="Comma separated name patterns, e.g. studio_*, *.exr. "
+                    "Every HDRI in the HDRI directory that matches is rendered as a variant"
+    )
+
+    variant_lighting: EnumProperty(
+        name="Lighting Variants",
+        items=[
+            ('NONE', 'None', ''),
+            ('STUDIO', 'Studio', ''),
+            ('SUNSET', 'Sunset', ''),
+        ],
+        options={'ENUM_FLAG'},
+        default=set(),
+        description="Render a variant with each of these lighting presets"
+    )
+
+    variant_material_override: BoolProperty(
+        name="With and Without Override",
+        default=False,
+        description="Render every variant with and without the override material"
+    )
+
+    variant_comparison: BoolProperty(
+        name="Comparison Video",
+        default=False,
+        description="Put the variants of each render side by side in one video, needs ffmpeg"
+    )
+
     hdri_directory: StringProperty(
         name="HDRI Directory",
         default="",
         subtype='DIR_PATH',
     )
 
+    hdri_recursive: BoolProperty(
+        name="Include Subfolders",
+        default=False,
+        description="Also list HDRIs found in subfolders of the HDRI directory"
+    )
+
     hdri_file: EnumProperty(
         name="HDRI File",
         items=get_hdri_files,
     )
 
+    hdri_proxy_resolution: EnumProperty(
+        name="HDRI Resolution",
+        items=[
+            ('FULL', "Full", "Use the HDRI file as it is"),
+            ('1024', "1K", "Render with a 1024 pixel wide copy of the HDRI"),
+            ('2048', "2K", "Render with a 2048 pixel wide copy of the HDRI"),
+            ('4096', "4K", "Render with a 4096 pixel wide copy of the HDRI"),
+        ],
+        default='2048',
+        description="Downsampled copies are generated once and cached on disk"
+    )
+
+    # datablocks created for the current preview, removed again by cleanup
+    created_ids: CollectionProperty(type=PreviewRenderCreatedID)
+
 
 class PREVIEWRENDER_PT_panel(bpy.types.Panel):
     bl_label = "Preview Render"
@@ -232,44 +714,195 @@ class PREVIEWRENDER_PT_panel(bpy.types.Panel):
             layout.separator()
 
         layout.prop(settings, "resolution_percentage")
+        layout.prop(settings, "time_budget")
         layout.prop(settings, "custom_resolution")
         if settings.custom_resolution:
             layout.prop(settings, "resolution_x")
             layout.prop(settings, "resolution_y")
+        layout.prop(settings, "auto_border")
+        if settings.auto_border:
+            row = layout.row(align=True)
+            row.prop(settings, "crop_to_border")
+            row.prop(settings, "border_margin")
+        layout.prop(settings, "draft_geometry")
+        if settings.draft_geometry:
+            row = layout.row(align=True)
+            row.prop(settings, "draft_mode", text="")
+            if settings.draft_mode == 'RATIO':
+                row.prop(settings, "draft_ratio")
+            else:
+                row.prop(settings, "draft_triangle_budget")
         layout.prop(settings, "frame_count")
+        row = layout.row(align=True)
+        row.prop(settings, "sparse_keyframes")
+        if settings.sparse_keyframes > 1:
+            row.prop(settings, "sparse_tolerance")
+        layout.prop(settings, "progressive")
+        if settings.progressive:
+            row = layout.row(align=True)
+            row.prop(settings, "progressive_draft", text="")
+            row.prop(settings, "progressive_frame_step")
+        layout.prop(settings, "turntable_mode")
+        layout.prop(settings, "use_preview_scene")
+        layout.prop(settings, "batch_mode")
         layout.prop(settings, "rotation_degrees")
+        layout.prop(settings, "seamless_loop")
+        layout.prop(settings, "skip_repeated_frames")
         
         if settings.render_engine != 'BLENDER_WORKBENCH':
             layout.prop(settings, "hdri_rotation_degrees")
             layout.label(text="HDRI Settings:")
-            layout.prop(settings, "hdri_directory")
+            row = layout.row(align=True)
+            row.prop(settings, "hdri_directory")
+            row.operator("preview_render.rescan_hdris", text="", icon='FILE_REFRESH')
+            layout.prop(settings, "hdri_recursive")
             layout.prop(settings, "hdri_file")
+            layout.prop(settings, "hdri_proxy_resolution")
 
         layout.separator()
         layout.label(text="Output:")
         layout.prop(settings, "auto_save_path")
-        
+
         if not settings.auto_save_path:
             layout.prop(settings, "output_path")
+        else:
+            layout.prop(settings, "use_render_cache")
             
         layout.prop(settings, "file_format")
+        if settings.file_format != 'FFMPEG':
+            layout.prop(settings, "video_targets")
+        if settings.file_format == 'PNG':
+            layout.prop(settings, "transparent_background")
+            if settings.transparent_background:
+                if settings.render_engine == 'CYCLES':
+                    layout.prop(settings, "shadow_catcher")
+                row = layout.row(align=True)
+                row.prop(settings, "backdrops")
+                row.operator("preview_render.composite_backdrops", text="", icon='IMAGE_BACKGROUND')
+        layout.prop(settings, "parallel_render")
+        if settings.parallel_render:
+            row = layout.row(align=True)
+            row.prop(settings, "parallel_workers")
+            row.prop(settings, "parallel_threads")
+
+        if PARALLEL_JOB is not None:
+            self.draw_parallel_status(layout, PARALLEL_JOB)
+        if ACTIVE_JOB is not None and len(ACTIVE_JOB.steps) > 1:
+            self.draw_batch_status(layout, ACTIVE_JOB)
+        if ACTIVE_JOB is not None and ACTIVE_JOB.draft_dir:
+            row = layout.row(align=True)
+            row.label(text="Draft ready", icon='CHECKMARK')
+            op = row.operator("preview_render.open_render", text="", icon='FILE_FOLDER')
+            op.directory = ACTIVE_JOB.draft_dir
+        if RENDER_QUEUE:
+            self.draw_queue(layout)
+        if ACTIVE_STATS is not None:
+            self.draw_render_stats(layout, ACTIVE_STATS)
         
         layout.separator()
         layout.prop(settings, "wireframe_toggle")
-        layout.prop(settings, "use_active_camera")
-        if not settings.use_active_camera:
-            layout.prop(settings, "camera_object")
+        layout.prop(settings, "auto_frame_camera")
+        if settings.auto_frame_camera:
+            row = layout.row(align=True)
+            row.prop(settings, "auto_frame_lens")
+            row.prop(settings, "auto_frame_elevation_degrees")
+        else:
+            layout.prop(settings, "use_active_camera")
+            if not settings.use_active_camera:
+                layout.prop(settings, "camera_object")
         layout.prop(settings, "material_override")
         if settings.material_override:
             layout.prop(settings, "override_material")
         
         if settings.render_engine != 'BLENDER_WORKBENCH':
             layout.prop(settings, "lighting_preset")
-        
+
+        layout.separator()
+        layout.label(text="Variants:")
+        if settings.render_engine != 'BLENDER_WORKBENCH':
+            layout.prop(settings, "variant_hdris")
+            layout.prop(settings, "variant_lighting")
+        layout.prop(settings, "variant_material_override")
+        layout.prop(settings, "variant_comparison")
+
         layout.separator()
-        layout.operator("preview_render.start", text="Render", icon='RENDER_ANIMATION')
+        render_text = "Queue Render" if render_busy() else "Render"
+        layout.operator("preview_render.start", text=render_text, icon='RENDER_ANIMATION')
+        layout.operator("preview_render.resume", text="Resume Interrupted Render", icon='RECOVER_LAST')
         layout.operator("preview_render.cleanup", text="Cleanup Preview Objects", icon='TRASH')
 
+        if settings.auto_save_path:
+            self.draw_catalog(layout, settings)
+
+    def draw_catalog(self, layout, settings):
+        box = layout.box()
+        icon = 'TRIA_DOWN' if settings.show_catalog else 'TRIA_RIGHT'
+        box.prop(settings, "show_catalog", icon=icon, emboss=False)
+        if not settings.show_catalog:
+            return
+
+        catalog = RenderCatalog.load(get_preview_renders_dir())
+        entries = catalog.sorted_entries()
+        if not entries:
+            box.label(text="No catalogued renders")
+
+        for job_hash, entry in entries[:10]:
+            row = box.row(align=True)
+            label = f"{os.path.basename(entry['directory'])}  {entry['frame_count']}f  {entry['size'] / 1024 ** 2:.0f} MB"
+            row.label(text=label, icon='CHECKMARK' if entry['finished'] else 'TIME')
+            op = row.operator("preview_render.open_render", text="", icon='FILE_FOLDER')
+            op.directory = entry['directory']
+
+        col = box.column(align=True)
+        col.prop(settings, "cache_max_size_gb")
+        col.prop(settings, "cache_max_age_days")
+        box.operator("preview_render.evict_renders", icon='TRASH')
+
+    def draw_render_stats(self, layout, stats):
+        box = layout.box()
+        for message in stats.errors:
+            box.label(text=message, icon='ERROR')
+        done = stats.frames_done()
+        if stats.finished:
+            times = stats.frame_times()
+            mean = sum(times) / len(times) if times else 0.0
+            box.label(text=f"Last render: {done} frames, {mean:.2f}s per frame", icon='TIME')
+            budget = stats.info.get('time_budget')
+            if budget:
+                box.label(text=f"Time budget planned {budget['predicted_frame_seconds']:.2f}s per frame")
+            return
+
+        rate = stats.frames_per_minute()
+        eta = stats.eta_seconds()
+        box.label(text=f"{done}/{stats.frame_total} frames", icon='TIME')
+        if rate is not None:
+            box.label(text=f"{rate:.1f} frames/min, ETA {int(eta // 60)}:{int(eta % 60):02d}")
+
+    def draw_parallel_status(self, layout, job):
+        box = layout.box()
+        box.label(text=job.status_text(), icon='RENDER_ANIMATION')
+        if job.is_running():
+            box.progress(factor=job.progress(), text=f"{job.frames_done}/{job.frame_total} frames")
+            box.operator("preview_render.cancel_parallel", text="Cancel", icon='CANCEL')
+        for message in job.errors:
+            box.label(text=message, icon='ERROR')
+
+
+    def draw_batch_status(self, layout, job):
+        box = layout.box()
+        box.label(text=job.status_text(), icon='RENDERLAYERS')
+        for name in job.failed:
+            box.label(text=f"{name} failed", icon='ERROR')
+        for message in job.messages:
+            box.label(text=message, icon='INFO')
+
+    def draw_queue(self, layout):
+        box = layout.box()
+        row = box.row()
+        row.label(text=f"{len(RENDER_QUEUE)} queued", icon='SORTTIME')
+        row.operator("preview_render.clear_queue", text="", icon='X')
+        for request in RENDER_QUEUE:
+            box.label(text=request.label())
 
 class SceneStateBackup:
     def __init__(self, scene):
@@ -280,12 +913,23 @@ class SceneStateBackup:
         self.resolution_y = scene.render.resolution_y
         self.frame_start = scene.frame_start
         self.frame_end = scene.frame_end
+        self.frame_step = scene.frame_step
         self.filepath = scene.render.filepath
         self.file_format = scene.render.image_settings.file_format
         
         self.media_type = getattr(scene.render.image_settings, 'media_type', None)
         
         self.camera = scene.camera
+        self.use_overwrite = scene.render.use_overwrite
+        self.use_persistent_data = scene.render.use_persistent_data
+        self.use_border = scene.render.use_border
+        self.use_crop_to_border = scene.render.use_crop_to_border
+        self.film_transparent = scene.render.film_transparent
+        self.color_mode = scene.render.image_settings.color_mode
+        self.border = (scene.render.border_min_x, scene.render.border_min_y,
+                       scene.render.border_max_x, scene.render.border_max_y)
+        self.material_overrides = {layer.name: layer.material_override for layer in scene.view_layers}
+        self.quality = {path: resolve_path(scene, path) for path in BUDGET_SETTINGS}
         self.ffmpeg_format = None
         if hasattr(scene.render, 'ffmpeg'):
              self.ffmpeg_format = scene.render.ffmpeg.format
@@ -297,6 +941,7 @@ class SceneStateBackup:
         self.scene.render.resolution_y = self.resolution_y
         self.scene.frame_start = self.frame_start
         self.scene.frame_end = self.frame_end
+        self.scene.frame_step = self.frame_step
         self.scene.render.filepath = self.filepath
         
         if self.media_type:
@@ -304,208 +949,3535 @@ class SceneStateBackup:
         
         self.scene.render.image_settings.file_format = self.file_format
         self.scene.camera = self.camera
+        self.scene.render.use_overwrite = self.use_overwrite
+        self.scene.render.use_persistent_data = self.use_persistent_data
+        self.scene.render.use_border = self.use_border
+        self.scene.render.use_crop_to_border = self.use_crop_to_border
+        self.scene.render.film_transparent = self.film_transparent
+        self.scene.render.image_settings.color_mode = self.color_mode
+        (self.scene.render.border_min_x, self.scene.render.border_min_y,
+         self.scene.render.border_max_x, self.scene.render.border_max_y) = self.border
+        for layer in self.scene.view_layers:
+            if layer.name in self.material_overrides:
+                layer.material_override = self.material_overrides[layer.name]
+        for path, value in self.quality.items():
+            if value is not None:
+                set_path(self.scene, path, value)
         if self.ffmpeg_format:
             self.scene.render.ffmpeg.format = self.ffmpeg_format
 
 
-class PREVIEWRENDER_OT_start(bpy.types.Operator):
-    bl_idname = "preview_render.start"
-    bl_label = "Start Preview Render"
-    bl_description = "Start automated preview render with current settings"
+# Settings that only decide where or how the job runs, not what ends up in the frames
+NON_OUTPUT_SETTINGS = {
+    'auto_save_path',
+    'output_path',
+    'parallel_render',
+    'parallel_workers',
+    'parallel_threads',
+    'hdri_directory',
+    'hdri_recursive',
+    'use_render_cache',
+    'cache_max_size_gb',
+    'cache_max_age_days',
+    'show_catalog',
+    'created_ids',
+    # a variant renders with its own hdri_file, lighting_preset and material_override
+    'variant_hdris',
+    'variant_lighting',
+    'variant_material_override',
+    'variant_comparison',
+    # composited after the render, a new backdrop doesn't need new frames
+    'backdrops',
+}
 
-    def execute(self, context):
-        global PREVIEW_BACKUP
-        settings = context.scene.preview_render_settings
-        scene = context.scene
-        
-        selected_object_names = [obj.name for obj in context.selected_objects]
+# Scene properties every render sets itself or that don't reach the frames, left out of the job hash
+SCENE_HASH_EXCLUDED = {
+    'render': {'filepath', 'engine', 'resolution_percentage', 'use_border', 'use_crop_to_border',
+               'border_min_x', 'border_min_y', 'border_max_x', 'border_max_y', 'film_transparent',
+               'use_persistent_data', 'use_overwrite'},
+    'render.image_settings': {'file_format', 'media_type', 'color_mode'},
+    'render.ffmpeg': {'format'},
+}
 
-        if not selected_object_names:
-            self.report({'WARNING'}, "No objects selected.")
-            return {'CANCELLED'}
+# Parsed catalog.json files, keyed by path and reused until the file changes
+CATALOG_CACHE = {}
 
-        self.cleanup_existing_preview_objects(context)
+IMAGE_TRAILERS = {
+    '.png': b'IEND\xaeB`\x82',
+    '.jpg': b'\xff\xd9',
+    '.jpeg': b'\xff\xd9',
+}
 
-        selected_objects = []
-        for name in selected_object_names:
-            if name in bpy.data.objects:
-                selected_objects.append(bpy.data.objects[name])
-        
-        if not selected_objects:
-             self.report({'ERROR'}, "Selection lost during cleanup.")
-             return {'CANCELLED'}
 
-        scene_backup = SceneStateBackup(scene)
-        
-        orig_parents = {}
-        orig_materials = {}
-        orig_display_types = {}
-        
-        for obj in selected_objects:
-            orig_parents[obj.name] = obj.parent
-            orig_display_types[obj.name] = obj.display_type
-            if obj.type == 'MESH':
-                orig_materials[obj.name] = [slot.material for slot in obj.material_slots]
+def settings_snapshot(settings):
+    snapshot = {}
+    for name in PreviewRenderSettings.__annotations__:
+        if name in NON_OUTPUT_SETTINGS:
+            continue
+        value = getattr(settings, name)
+        if isinstance(value, bpy.types.ID):
+            value = value.name_full
+        elif isinstance(value, set):
+            value = sorted(value)
+        snapshot[name] = value
+    return snapshot
 
-        original_visibility = {}
-        view_layer = context.view_layer
 
-        try:
-            render_filepath = ""
-            if settings.auto_save_path:
-                if bpy.data.is_saved:
-                    base_path = os.path.dirname(bpy.data.filepath)
-                else:
-                    base_path = tempfile.gettempdir()
-                    self.report({'WARNING'}, "File not saved. Saving to temporary directory.")
+def plain_value(value):
+    if isinstance(value, bpy.types.ID):
+        return value.name_full
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, set):
+        # enum flags, in an order that doesn't change between sessions
+        return sorted(plain_value(v) for v in value)
+    try:
+        return [plain_value(v) for v in value]
+    except TypeError:
+        return str(value)
 
-                preview_dir = os.path.join(base_path, "Preview_Renders")
-                if not os.path.exists(preview_dir):
-                    os.makedirs(preview_dir)
 
-                existing_folders = [d for d in os.listdir(preview_dir) if d.startswith("render_")]
-                
-                max_version = 0
-                for folder in existing_folders:
-                    try:
-                        version = int(folder.split("_")[-1])
-                        if version > max_version:
-                            max_version = version
-                    except ValueError:
-                        pass
-                
-                new_version = max_version + 1
-                new_folder_name = f"render_{new_version:03d}"
-                output_dir = os.path.join(preview_dir, new_folder_name)
-                os.makedirs(output_dir, exist_ok=True)
-                
-                if settings.file_format == 'FFMPEG':
-                    render_filepath = os.path.join(output_dir, "preview.mp4")
-                else:
-                    render_filepath = os.path.join(output_dir, "frame_")
-            else:
-                output_dir = bpy.path.abspath(settings.output_path)
-                if not os.path.isdir(output_dir):
-                    os.makedirs(output_dir)
-                render_filepath = os.path.join(output_dir, "")
+def rna_values(struct):
+    values = {}
+    for prop in struct.bl_rna.properties:
+        if prop.identifier == 'rna_type' or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier, None)
+        if prop.type == 'POINTER' and not isinstance(value, bpy.types.ID):
+            continue
+        values[prop.identifier] = plain_value(value)
+    return values
 
-            scene.render.filepath = render_filepath
 
-            empty = bpy.data.objects.new("Preview_Empty", None)
-            empty.location = (0, 0, 0)
+def mesh_fingerprint(mesh):
+    digest = hashlib.sha1()
 
-            collection_name = "Preview_Collection"
-            preview_collection = bpy.data.collections.new(collection_name)
-            scene.collection.children.link(preview_collection)
+    co = array.array('f', [0.0]) * (len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get('co', co)
+    digest.update(co.tobytes())
 
-            preview_collection.objects.link(empty)
+    loops = array.array('i', [0]) * len(mesh.loops)
+    mesh.loops.foreach_get('vertex_index', loops)
+    digest.update(loops.tobytes())
 
-            for obj in selected_objects:
-                obj.parent = empty
-                if obj.name not in preview_collection.objects:
-                    preview_collection.objects.link(obj)
+    material_indices = array.array('i', [0]) * len(mesh.polygons)
+    mesh.polygons.foreach_get('material_index', material_indices)
+    digest.update(material_indices.tobytes())
 
-            for layer_col in view_layer.layer_collection.children:
-                original_visibility[layer_col.name] = layer_col.exclude
-                if layer_col.collection == preview_collection:
-                    layer_col.exclude = False 
-                else:
-                    layer_col.exclude = True
+    uv_layer = mesh.uv_layers.active
+    if uv_layer is not None:
+        uvs = array.array('f', [0.0]) * (len(uv_layer.data) * 2)
+        uv_layer.data.foreach_get('uv', uvs)
+        digest.update(uvs.tobytes())
 
-            empty.rotation_euler = (0, 0, 0)
-            empty.keyframe_insert(data_path="rotation_euler", frame=1)
-            empty.rotation_euler = (0, 0, math.radians(settings.rotation_degrees))
-            empty.keyframe_insert(data_path="rotation_euler", frame=settings.frame_count)
+    return digest.hexdigest()
 
-            if empty.animation_data and empty.animation_data.action:
-                self.set_linear_interpolation(empty.animation_data.action)
 
-            scene.render.engine = settings.render_engine
-            scene.render.resolution_percentage = int(settings.resolution_percentage)
-            if settings.custom_resolution:
-                scene.render.resolution_x = settings.resolution_x
-                scene.render.resolution_y = settings.resolution_y
-            scene.frame_start = 1
-            scene.frame_end = settings.frame_count
+def node_tree_fingerprint(node_tree, seen=None):
+    seen = set() if seen is None else seen
+    if node_tree.name_full in seen:
+        return node_tree.name_full
+    seen.add(node_tree.name_full)
 
-            if settings.file_format == 'FFMPEG':
-                if hasattr(scene.render.image_settings, 'media_type'):
-                    scene.render.image_settings.media_type = 'VIDEO'
-                try:
-                    scene.render.image_settings.file_format = 'FFMPEG'
-                except (TypeError, ValueError):
-                    pass
-                scene.render.ffmpeg.format = 'MPEG4'
-            else:
-                if hasattr(scene.render.image_settings, 'media_type'):
-                    scene.render.image_settings.media_type = 'IMAGE'
-                scene.render.image_settings.file_format = settings.file_format
+    nodes = []
+    for node in node_tree.nodes:
+        inputs = [
+            (socket.identifier, plain_value(getattr(socket, 'default_value', None)))
+            for socket in node.inputs
+        ]
+        entry = [node.bl_idname, node.name, inputs]
+        image = getattr(node, 'image', None)
+        if image is not None:
+            # the file on disk too, a repainted texture keeps its path
+            path = bpy.path.abspath(image.filepath, library=image.library)
+            entry.append((image.filepath, image.is_dirty, file_fingerprint(path)))
+        group = getattr(node, 'node_tree', None)
+        if group is not None:
+            entry.append(node_tree_fingerprint(group, seen))
+        nodes.append(entry)
 
-            if not settings.use_active_camera and settings.camera_object:
-                scene.camera = settings.camera_object
+    links = sorted(
+        (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+        for link in node_tree.links
+    )
+    return [sorted(nodes, key=lambda n: n[1]), links]
 
-            if settings.material_override and settings.override_material:
-                for obj in selected_objects:
-                    if obj.type == 'MESH':
-                        for slot in obj.material_slots:
-                            slot.material = settings.override_material
 
-            if settings.wireframe_toggle:
-                for obj in selected_objects:
-                    obj.display_type = 'WIRE'
+def material_fingerprint(material):
+    if material is None:
+        return None
+    fingerprint = [material.name_full, plain_value(material.diffuse_color)]
+    if material.node_tree is not None:
+        fingerprint.append(node_tree_fingerprint(material.node_tree))
+    return fingerprint
 
-            eevee_ids = {'BLENDER_EEVEE', 'BLENDER_EEVEE_NEXT'}
-            if settings.render_engine in eevee_ids or settings.render_engine == 'CYCLES':
-                self.setup_hdri_world(context, settings)
-                self.animate_hdri_rotation(context, settings)
-                
-                if settings.render_engine in eevee_ids and hasattr(scene, 'eevee'):
-                     if hasattr(scene.eevee, 'use_gtao'):
-                        scene.eevee.use_gtao = True
 
-            if settings.render_engine != 'BLENDER_WORKBENCH':
-                self.apply_lighting_preset(context, settings.lighting_preset, preview_collection, selected_objects)
+def file_fingerprint(path):
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return (path, stat.st_size, stat.st_mtime_ns)
 
-            self.report({'INFO'}, f"Starting render to: {render_filepath}")
-            bpy.ops.render.render('INVOKE_DEFAULT', animation=True)
-            
-        except Exception as e:
-            self.report({'ERROR'}, f"Render setup failed: {e}")
-            import traceback
-            traceback.print_exc()
-            self.cleanup_and_restore(context, scene_backup, orig_parents, 
-                                   orig_materials, orig_display_types, selected_objects, original_visibility)
-            return {'CANCELLED'}
 
-        PREVIEW_BACKUP = {
-            'parents': orig_parents,
-            'materials': orig_materials,
-            'display_types': orig_display_types,
-            'scene_backup': scene_backup,
-            'visibility': original_visibility
+def object_fingerprint(obj, content=False):
+    fingerprint = {
+        'name': obj.name_full,
+        'type': obj.type,
+        'data': obj.data.name_full if obj.data else None,
+        'parent': obj.parent.name_full if obj.parent else None,
+        'matrix': [round(v, 5) for row in obj.matrix_basis for v in row],
+        'materials': [slot.material.name_full if slot.material else None for slot in obj.material_slots],
+        'modifiers': [(mod.name, mod.type, mod.show_render) for mod in obj.modifiers],
+    }
+    if content:
+        # what the render actually depends on, not just which datablocks are used
+        if obj.type == 'MESH':
+            fingerprint['mesh'] = mesh_fingerprint(obj.data)
+        fingerprint['materials'] = [material_fingerprint(slot.material) for slot in obj.material_slots]
+        fingerprint['modifiers'] = [rna_values(mod) for mod in obj.modifiers]
+    return fingerprint
+
+
+def selection_fingerprints(objects):
+    return sorted((object_fingerprint(obj, content=True) for obj in objects), key=lambda f: f['name'])
+
+
+def scene_fingerprint(scene):
+    # the render state the add-on leaves to the scene, taken before the setup changes any of it
+    state = {}
+    for path in PREVIEW_SCENE_SETTINGS:
+        owner = resolve_path(scene, path)
+        if owner is not None:
+            excluded = SCENE_HASH_EXCLUDED.get(path, ())
+            state[path] = {name: value for name, value in rna_values(owner).items() if name not in excluded}
+    world = scene.world
+    if world is not None:
+        state['world'] = [plain_value(world.color),
+                          node_tree_fingerprint(world.node_tree) if world.node_tree is not None else None]
+    return state
+
+
+def compute_job_hash(settings, objects, camera, fingerprints=None, scene_state=None):
+    # variants of one selection pass its fingerprints in, they are the slow part
+    if scene_state is not None and settings.hdri_file not in ("", 'NONE'):
+        # the HDRI gets a world of its own, the scene's doesn't show
+        scene_state = dict(scene_state, world=None)
+    payload = {
+        'settings': settings_snapshot(settings),
+        'objects': fingerprints if fingerprints is not None else selection_fingerprints(objects),
+        'camera': object_fingerprint(camera) if camera else None,
+        'camera_data': (camera.data.lens, camera.data.sensor_width) if camera else None,
+        'hdri': file_fingerprint(settings.hdri_file),
+        'scene': scene_state,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def folder_size(directory):
+    total = 0
+    for root, dirs, files in os.walk(directory):
+        for file_name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, file_name))
+            except OSError:
+                pass
+    return total
+
+
+def is_complete_image(path):
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+    if size == 0:
+        return False
+
+    trailer = IMAGE_TRAILERS.get(os.path.splitext(path)[1].lower())
+    if trailer is None:
+        return True
+    with open(path, 'rb') as fh:
+        fh.seek(max(0, size - len(trailer)))
+        return fh.read() == trailer
+
+
+def get_preview_renders_dir():
+    if bpy.data.is_saved:
+        base_path = os.path.dirname(bpy.data.filepath)
+    else:
+        base_path = tempfile.gettempdir()
+    return os.path.join(base_path, "Preview_Renders")
+
+
+def list_render_folders(preview_dir):
+    if not os.path.isdir(preview_dir):
+        return []
+
+    folders = []
+    for folder in os.listdir(preview_dir):
+        if not folder.startswith("render_"):
+            continue
+        try:
+            version = int(folder.split("_")[-1])
+        except ValueError:
+            continue
+        folders.append((version, os.path.join(preview_dir, folder)))
+
+    folders.sort()
+    return folders
+
+
+class RenderManifest:
+    FILE_NAME = "manifest.json"
+
+    def __init__(self, directory, data):
+        self.directory = directory
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, directory, job_hash, settings, objects, render_filepath, frame_start, frame_end, video=False,
+               extra=None):
+        data = {
+            'version': 1,
+            'job_hash': job_hash,
+            'objects': [obj.name for obj in objects],
+            'settings': settings_snapshot(settings),
+            'render_filepath': render_filepath,
+            'frame_start': frame_start,
+            'frame_end': frame_end,
+            'video': video,
+            'completed': [],
+            'finished': False,
+            'created': time.time(),
+        }
+        if extra:
+            # batch item and variant, so a resume renders them the same way
+            data.update(extra)
+        manifest = cls(directory, data)
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, directory):
+        try:
+            with open(os.path.join(directory, cls.FILE_NAME)) as fh:
+                return cls(directory, json.load(fh))
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, self.FILE_NAME)
+
+    @property
+    def job_hash(self):
+        return self.data.get('job_hash')
+
+    @property
+    def objects(self):
+        return self.data.get('objects', [])
+
+    @property
+    def finished(self):
+        return self.data.get('finished', False)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump(self.data, fh, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def mark_complete(self, frame):
+        with self._lock:
+            completed = set(self.data['completed'])
+            completed.add(frame)
+            self.data['completed'] = sorted(completed)
+            self.save()
+
+    def mark_saved_path(self, path):
+        match = re.search(r'(\d+)\.\w+$', path)
+        if match:
+            self.mark_complete(int(match.group(1)))
+
+    def missing_frames(self):
+        completed = set(self.data['completed'])
+        return [f for f in range(self.data['frame_start'], self.data['frame_end'] + 1) if f not in completed]
+
+    def prune(self, frame_paths):
+        # anything not recorded as written, or not a whole file, gets rendered again
+        completed = set(self.data['completed'])
+        for frame, path in frame_paths.items():
+            if frame in completed and is_complete_image(path):
+                continue
+            completed.discard(frame)
+            if os.path.lexists(path):
+                os.remove(path)
+        self.data['completed'] = sorted(completed)
+        self.data['finished'] = False
+        self.save()
+
+    def finish(self):
+        self.data['finished'] = True
+        self.save()
+
+
+MEMORY_UNITS = {'K': 1.0 / 1024, 'M': 1.0, 'G': 1024.0}
+
+
+class RenderStats:
+    JSON_NAME = "render_report.json"
+    CSV_NAME = "render_report.csv"
+    CSV_FIELDS = ('frame', 'seconds', 'sync_seconds', 'peak_memory_mb')
+
+    FRAME_RE = re.compile(r"\bFra:(\d+)")
+    PEAK_RE = re.compile(r"Peak:?\s*([\d.]+)([KMG])")
+    # the first stats line past scene sync talks about samples
+    SYNC_DONE_RE = re.compile(r"\bSample \d|Rendering")
+
+    def __init__(self, directory, frame_total, setup_seconds=None, info=None):
+        self.directory = directory
+        self.frame_total = frame_total
+        self.setup_seconds = setup_seconds
+        self.info = info or {}
+        self.frames = {}
+        self.started = time.time()
+        self.finished = False
+        # what went wrong in the post render tasks, shown with the stats
+        self.errors = []
+        self._frame_started = {}
+        self._current_frame = None
+        self._lock = threading.Lock()
+
+    def _record(self, frame):
+        record = self.frames.get(frame)
+        if record is None:
+            record = {'frame': frame, 'seconds': None, 'sync_seconds': None, 'peak_memory_mb': None}
+            self.frames[frame] = record
+        return record
+
+    def frame_started(self, frame):
+        with self._lock:
+            self._frame_started[frame] = time.perf_counter()
+            self._current_frame = frame
+            self._record(frame)
+
+    def add_stats(self, text):
+        match = self.FRAME_RE.search(text)
+        frame = int(match.group(1)) if match else self._current_frame
+        if frame is None:
+            return None
+
+        now = time.perf_counter()
+        with self._lock:
+            started = self._frame_started.setdefault(frame, now)
+            record = self._record(frame)
+            for peak in self.PEAK_RE.finditer(text):
+                peak_mb = float(peak.group(1)) * MEMORY_UNITS[peak.group(2)]
+                record['peak_memory_mb'] = max(record['peak_memory_mb'] or 0.0, peak_mb)
+            if record['sync_seconds'] is None and self.SYNC_DONE_RE.search(text):
+                record['sync_seconds'] = now - started
+        return frame
+
+    def frame_finished(self, frame):
+        now = time.perf_counter()
+        with self._lock:
+            started = self._frame_started.get(frame)
+            if started is not None:
+                self._record(frame)['seconds'] = now - started
+
+    def frame_times(self):
+        return [r['seconds'] for r in self.frames.values() if r['seconds'] is not None]
+
+    def frames_done(self):
+        return len(self.frame_times())
+
+    def frames_per_minute(self):
+        # wall clock rather than summed frame times, so parallel workers count properly
+        done = self.frames_done()
+        elapsed = time.time() - self.started
+        if not done or elapsed <= 0:
+            return None
+        return done / elapsed * 60.0
+
+    def eta_seconds(self):
+        rate = self.frames_per_minute()
+        if not rate:
+            return None
+        return max(0, self.frame_total - self.frames_done()) / rate * 60.0
+
+    def report(self, cancelled=False):
+        times = self.frame_times()
+        peaks = [r['peak_memory_mb'] for r in self.frames.values() if r['peak_memory_mb'] is not None]
+        report = dict(self.info)
+        report.update({
+            'created': self.started,
+            'cancelled': cancelled,
+            'setup_seconds': self.setup_seconds,
+            'total_seconds': time.time() - self.started,
+            'frame_total': self.frame_total,
+            'frames_rendered': len(times),
+            'mean_frame_seconds': sum(times) / len(times) if times else None,
+            'max_frame_seconds': max(times) if times else None,
+            'peak_memory_mb': max(peaks) if peaks else None,
+            'errors': list(self.errors),
+            'frames': [self.frames[f] for f in sorted(self.frames)],
+        })
+        return report
+
+    def write(self, cancelled=False):
+        self.finished = True
+        report = self.report(cancelled)
+
+        json_path = os.path.join(self.directory, self.JSON_NAME)
+        with open(json_path + ".tmp", 'w') as fh:
+            json.dump(report, fh, indent=1)
+        os.replace(json_path + ".tmp", json_path)
+
+        with open(os.path.join(self.directory, self.CSV_NAME), 'w', newline='') as fh:
+            writer = csv.DictWriter(fh, fieldnames=self.CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(report['frames'])
+
+
+class RenderCatalog:
+    FILE_NAME = "catalog.json"
+
+    def __init__(self, preview_dir, data=None):
+        self.preview_dir = preview_dir
+        self.data = data or {'version': 1, 'next_version': None, 'renders': {}}
+
+    @classmethod
+    def load(cls, preview_dir):
+        path = os.path.join(preview_dir, cls.FILE_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return cls(preview_dir)
+
+        cached = CATALOG_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cls(preview_dir, cached[1])
+
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return cls(preview_dir)
+
+        CATALOG_CACHE[path] = (mtime, data)
+        return cls(preview_dir, data)
+
+    @property
+    def path(self):
+        return os.path.join(self.preview_dir, self.FILE_NAME)
+
+    @property
+    def renders(self):
+        return self.data['renders']
+
+    def save(self):
+        os.makedirs(self.preview_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump(self.data, fh, indent=1)
+        os.replace(tmp_path, self.path)
+        CATALOG_CACHE[self.path] = (os.stat(self.path).st_mtime_ns, self.data)
+
+    def next_version(self):
+        version = self.data.get('next_version')
+        if version is None:
+            # first run against this folder, fall back to scanning it once
+            existing_folders = list_render_folders(self.preview_dir)
+            version = existing_folders[-1][0] + 1 if existing_folders else 1
+        while os.path.exists(os.path.join(self.preview_dir, f"render_{version:03d}")):
+            version += 1
+        return version
+
+    def lookup(self, job_hash):
+        entry = self.renders.get(job_hash)
+        if entry is None or not entry.get('finished'):
+            return None
+        manifest = RenderManifest.load(entry['directory'])
+        if manifest is None or not manifest.finished:
+            return None
+        return entry
+
+    def add(self, job_hash, directory, version, settings, objects):
+        self.renders[job_hash] = {
+            'directory': directory,
+            'version': version,
+            'created': time.time(),
+            'finished': False,
+            'size': 0,
+            'objects': [obj.name for obj in objects],
+            'render_engine': settings.render_engine,
+            'frame_count': settings.frame_count,
+            'file_format': settings.file_format,
+        }
+        self.data['next_version'] = version + 1
+        self.save()
+
+    def mark_finished(self, job_hash):
+        entry = self.renders.get(job_hash)
+        if entry is None:
+            return
+        entry['finished'] = True
+        entry['size'] = folder_size(entry['directory'])
+        self.save()
+
+    def remove(self, job_hash):
+        entry = self.renders.pop(job_hash, None)
+        if entry is None:
+            return
+        shutil.rmtree(entry['directory'], ignore_errors=True)
+        self.save()
+
+    def sorted_entries(self):
+        return sorted(self.renders.items(), key=lambda item: item[1]['created'], reverse=True)
+
+    def evict(self, max_bytes=0, max_age_days=0, keep=()):
+        evicted = []
+        now = time.time()
+        total = 0
+        for job_hash, entry in self.sorted_entries():
+            if not os.path.isdir(entry['directory']):
+                evicted.append(job_hash)
+                continue
+            if job_hash in keep:
+                total += entry['size']
+                continue
+            too_old = max_age_days and now - entry['created'] > max_age_days * 86400
+            over_budget = max_bytes and total + entry['size'] > max_bytes
+            if too_old or over_budget:
+                shutil.rmtree(entry['directory'], ignore_errors=True)
+                evicted.append(job_hash)
+            else:
+                total += entry['size']
+
+        for job_hash in evicted:
+            del self.renders[job_hash]
+        if evicted:
+            self.save()
+        return evicted
+
+
+def evict_catalog(settings, keep=()):
+    catalog = RenderCatalog.load(get_preview_renders_dir())
+    return catalog.evict(
+        max_bytes=int(settings.cache_max_size_gb * 1024 ** 3),
+        max_age_days=settings.cache_max_age_days,
+        keep=keep,
+    )
+
+
+def find_resumable_render(settings):
+    if settings.auto_save_path:
+        candidates = [path for _, path in reversed(list_render_folders(get_preview_renders_dir()))]
+    else:
+        candidates = [bpy.path.abspath(settings.output_path)]
+
+    for directory in candidates:
+        manifest = RenderManifest.load(directory)
+        if manifest is not None and not manifest.finished and not manifest.data.get('video'):
+            return directory
+    return None
+
+
+PREVIEW_SCENE_NAME = "Preview_Scene"
+PREVIEW_SCENE_SETTINGS = (
+    "render", "render.image_settings", "render.ffmpeg", "cycles", "eevee",
+    "display", "display.shading", "view_settings", "display_settings", "unit_settings",
+)
+
+# Every datablock the add-on creates carries this custom property and is listed in
+# the scene's registry, so cleanup never has to scan the whole file
+TEMP_ID_TAG = "preview_render_temp"
+ID_TYPE_COLLECTIONS = {
+    'OBJECT': "objects",
+    'LIGHT': "lights",
+    'CAMERA': "cameras",
+    'ACTION': "actions",
+    'WORLD': "worlds",
+    'SCENE': "scenes",
+    'COLLECTION': "collections",
+    'IMAGE': "images",
+    'MESH': "meshes",
+    'MATERIAL': "materials",
+}
+
+
+def copy_rna_properties(source, target):
+    for prop in source.bl_rna.properties:
+        if prop.is_readonly or prop.type in {'POINTER', 'COLLECTION'}:
+            continue
+        try:
+            setattr(target, prop.identifier, getattr(source, prop.identifier))
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+
+def resolve_path(struct, path):
+    for attr in path.split("."):
+        struct = getattr(struct, attr, None)
+        if struct is None:
+            return None
+    return struct
+
+
+def track_created_id(settings, id_data):
+    id_data[TEMP_ID_TAG] = True
+    entry = settings.created_ids.add()
+    entry.id_type = id_data.id_type
+    entry.name = id_data.name
+    return id_data
+
+
+def find_created_ids(settings):
+    found = []
+    for entry in settings.created_ids:
+        id_data = getattr(bpy.data, ID_TYPE_COLLECTIONS[entry.id_type]).get(entry.name)
+        # the tag keeps a user datablock that took over the name safe
+        if id_data is not None and id_data.get(TEMP_ID_TAG):
+            found.append(id_data)
+    return found
+
+
+def remove_created_ids(scene):
+    settings = scene.preview_render_settings
+    found = find_created_ids(settings)
+    temp_collections = [id_data for id_data in found if id_data.id_type == 'COLLECTION']
+    if temp_collections:
+        # objects only linked to our collections would be lost along with them. one pass over the
+        # user's collections, users_collection walks every collection for each object
+        kept = set()
+        for collection in bpy.data.collections:
+            if not collection.get(TEMP_ID_TAG):
+                kept.update(collection.objects)
+        for other_scene in bpy.data.scenes:
+            if not other_scene.get(TEMP_ID_TAG):
+                kept.update(other_scene.collection.objects)
+
+        for collection in temp_collections:
+            for obj in collection.objects:
+                if not obj.get(TEMP_ID_TAG) and obj not in kept:
+                    scene.collection.objects.link(obj)
+                    kept.add(obj)
+
+    settings.created_ids.clear()
+    if found:
+        bpy.data.batch_remove(found)
+
+
+VARIANT_SETTINGS = ('hdri_file', 'lighting_preset', 'material_override')
+
+
+def variant_settings(settings):
+    # every combination of the varied parts as (name, settings), the name only has the parts that vary
+    lit = settings.render_engine != 'BLENDER_WORKBENCH'
+    hdris = [settings.hdri_file]
+    patterns = [pattern.strip().lower() for pattern in settings.variant_hdris.split(",") if pattern.strip()]
+    if patterns and lit:
+        index = get_hdri_index(bpy.path.abspath(settings.hdri_directory), settings.hdri_recursive)
+        hdris = [
+            path for path in (index['paths'] if index else [])
+            if any(fnmatch.fnmatch(os.path.basename(path).lower(), pattern) for pattern in patterns)
+        ]
+        if not hdris:
+            raise RuntimeError(f"No HDRIs in the HDRI directory match {settings.variant_hdris}")
+    presets = [preset for preset in ('NONE', 'STUDIO', 'SUNSET') if lit and preset in settings.variant_lighting]
+    presets = presets or [settings.lighting_preset]
+    if settings.variant_material_override and settings.override_material:
+        overrides = [False, True]
+    else:
+        overrides = [settings.material_override]
+
+    variants = []
+    for hdri, preset, override in itertools.product(hdris, presets, overrides):
+        parts = []
+        if len(hdris) > 1:
+            parts.append(os.path.splitext(os.path.basename(hdri))[0])
+        if len(presets) > 1:
+            parts.append(preset.lower())
+        if len(overrides) > 1:
+            parts.append("override" if override else "materials")
+        variant = copy.copy(settings)
+        for name, value in zip(VARIANT_SETTINGS, (hdri, preset, override)):
+            setattr(variant, name, value)
+        variants.append(("_".join(parts), variant))
+    return variants
+
+
+def resumed_variant(settings, manifest):
+    # the manifest has the settings the variant rendered with
+    variant = copy.copy(settings)
+    for name in VARIANT_SETTINGS:
+        setattr(variant, name, manifest.data['settings'][name])
+    return variant
+
+
+def variant_source(directory):
+    # what a finished variant left in its folder, its video or its frames
+    video = os.path.join(directory, "preview.mp4")
+    if os.path.isfile(video):
+        return video
+    names = sorted(os.listdir(directory))
+    videos = [name for name in names if name.lower().endswith(".mp4")]
+    if videos:
+        return os.path.join(directory, videos[0])
+    frames = [
+        os.path.join(directory, name) for name in names
+        if os.path.splitext(name)[1].lower() in ('.png', '.jpg', '.jpeg', '.exr', '.tif', '.tiff')
+    ]
+    if not frames:
+        raise RuntimeError(f"No frames or video in {directory}")
+    return frames
+
+
+def draft_settings(settings):
+    # the quick first pass of a progressive job, the same turntable with a cheaper engine or resolution
+    draft = copy.copy(settings)
+    if settings.progressive_draft == 'WORKBENCH':
+        draft.render_engine = 'BLENDER_WORKBENCH'
+    else:
+        draft.resolution_percentage = '30'
+    draft.file_format = 'PNG'
+    draft.video_targets = set()
+    draft.skip_repeated_frames = False
+    draft.sparse_keyframes = 1
+    draft.time_budget = 0.0
+    draft.parallel_render = False
+    draft.backdrops = ""
+    draft.variant_comparison = False
+    return draft
+
+
+def final_settings(settings):
+    # the full render of a progressive job goes to background workers, so the draft can be looked at meanwhile
+    if bpy.app.background or settings.sparse_keyframes > 1 or (settings.file_format == 'FFMPEG' and not find_ffmpeg()):
+        return settings
+    final = copy.copy(settings)
+    if not final.parallel_render:
+        final.parallel_render = True
+        final.parallel_workers = 1
+    return final
+
+
+def rotation_end_frame(settings):
+    if settings.seamless_loop:
+        return settings.frame_count + 1
+    return settings.frame_count
+
+
+def turntable_angles(settings):
+    # rotation at every rendered frame, it's linear from 0 at frame 1 to the full turn at rotation_end_frame
+    end_frame = rotation_end_frame(settings)
+    if end_frame <= 1:
+        return np.zeros(1)
+    return np.radians(settings.rotation_degrees) * np.arange(settings.frame_count) / (end_frame - 1)
+
+
+def bound_box_corners(objects):
+    # world space bounding box corners of the selection as an (n * 8, 3) array,
+    # None when something visible has no box that covers it
+    bounded = []
+    for obj in objects:
+        if obj.type == 'EMPTY' and obj.instance_type == 'COLLECTION' and obj.instance_collection:
+            return None
+        if obj.type in BOUNDED_OBJECT_TYPES:
+            bounded.append(obj)
+    if not bounded:
+        return None
+
+    boxes = np.array([obj.bound_box for obj in bounded], dtype=float)
+    matrices = np.array([obj.matrix_world for obj in bounded], dtype=float)
+    corners = np.einsum('nij,nkj->nki', matrices[:, :3, :3], boxes) + matrices[:, None, :3, 3]
+    return corners.reshape(-1, 3)
+
+
+def turntable_border(scene, camera, corners, pivot, angles, margin):
+    render = scene.render
+    projection = np.array(camera.calc_matrix_camera(
+        bpy.context.evaluated_depsgraph_get(),
+        x=render.resolution_x, y=render.resolution_y,
+        scale_x=render.pixel_aspect_x, scale_y=render.pixel_aspect_y,
+    ), dtype=float)
+    to_clip = projection @ np.array(camera.matrix_world.inverted(), dtype=float)
+
+    offsets = corners[:, :2] - pivot[:2]
+    heights = corners[:, 2]
+    low = np.full(2, np.inf)
+    high = np.full(2, -np.inf)
+    # angles go in chunks so many corners over many frames don't need one huge array
+    step = max(1, BORDER_CHUNK_POINTS // len(corners))
+    for start in range(0, len(angles), step):
+        cos = np.cos(angles[start:start + step])[:, None]
+        sin = np.sin(angles[start:start + step])[:, None]
+        # every corner at every angle, spun around the pivot's z axis like the turntable does
+        x = pivot[0] + cos * offsets[:, 0] - sin * offsets[:, 1]
+        y = pivot[1] + sin * offsets[:, 0] + cos * offsets[:, 1]
+        clip_x, clip_y, clip_w = (
+            to_clip[row, 0] * x + to_clip[row, 1] * y + to_clip[row, 2] * heights + to_clip[row, 3]
+            for row in (0, 1, 3)
+        )
+        if np.any(clip_w <= 1e-6):
+            # part of the sweep passes behind the camera, so the projection has no bounds
+            return None
+        low = np.minimum(low, [(clip_x / clip_w).min(), (clip_y / clip_w).min()])
+        high = np.maximum(high, [(clip_x / clip_w).max(), (clip_y / clip_w).max()])
+
+    low = np.clip((low + 1.0) / 2.0 - margin, 0.0, 1.0)
+    high = np.clip((high + 1.0) / 2.0 + margin, 0.0, 1.0)
+    if np.any(high <= low):
+        return None
+    return float(low[0]), float(low[1]), float(high[0]), float(high[1])
+
+
+def apply_turntable_border(scene, settings, camera, corners, pivot):
+    if corners is None or camera is None:
+        return False
+    border = turntable_border(scene, camera, corners, pivot, turntable_angles(settings), settings.border_margin)
+    if border is None:
+        return False
+
+    render = scene.render
+    render.border_min_x, render.border_min_y, render.border_max_x, render.border_max_y = border
+    render.use_border = True
+    render.use_crop_to_border = settings.crop_to_border
+    return True
+
+
+def mesh_bounding_sphere(obj, depsgraph):
+    # with modifiers the evaluated mesh is what renders, and it belongs to this object alone
+    key = ('OBJECT', obj.session_uid) if obj.modifiers else ('MESH', obj.data.session_uid)
+    sphere = MESH_BOUNDS.get(key)
+    if sphere is not None:
+        return sphere
+
+    mesh = obj.evaluated_get(depsgraph).data if obj.modifiers else obj.data
+    count = len(mesh.vertices)
+    if count == 0:
+        return None
+    coords = np.empty(count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', coords)
+
+    # strided views per axis, reducing an (n, 3) array along its short axis is several times slower
+    axes = (coords[0::3], coords[1::3], coords[2::3])
+    center = [(float(values.min()) + float(values.max())) / 2.0 for values in axes]
+    distance_sq = np.square(axes[0] - center[0])
+    for values, middle in zip(axes[1:], center[1:]):
+        distance_sq += np.square(values - middle)
+    sphere = MESH_BOUNDS[key] = (np.array(center), float(np.sqrt(distance_sq.max())))
+    return sphere
+
+
+def selection_bounding_spheres(objects):
+    # world space (x, y, z, radius) per object that renders something
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    spheres = []
+    for obj in objects:
+        if obj.type == 'MESH':
+            sphere = mesh_bounding_sphere(obj, depsgraph)
+        elif obj.type in BOUNDED_OBJECT_TYPES:
+            corners = np.array(obj.bound_box, dtype=float)
+            center = (corners.min(axis=0) + corners.max(axis=0)) / 2.0
+            sphere = (center, float(np.linalg.norm(corners - center, axis=1).max()))
+        else:
+            continue
+        if sphere is None:
+            continue
+
+        matrix = np.array(obj.matrix_world, dtype=float)
+        center = matrix[:3, :3] @ sphere[0] + matrix[:3, 3]
+        scale = np.linalg.norm(matrix[:3, :3], axis=0).max()
+        spheres.append((*center, sphere[1] * scale))
+    return np.array(spheres, dtype=float).reshape(-1, 4)
+
+
+def turntable_bounding_sphere(spheres, pivot):
+    # spinning around the pivot's z axis keeps every sphere inside one upright cylinder,
+    # the sphere around that cylinder holds the selection at any angle
+    reach = np.hypot(spheres[:, 0] - pivot[0], spheres[:, 1] - pivot[1]) + spheres[:, 3]
+    bottom = float((spheres[:, 2] - spheres[:, 3]).min())
+    top = float((spheres[:, 2] + spheres[:, 3]).max())
+    center = (float(pivot[0]), float(pivot[1]), (bottom + top) / 2.0)
+    return center, math.hypot(float(reach.max()), (top - bottom) / 2.0)
+
+
+def fit_turntable_camera(scene, settings, camera_data, spheres, pivot):
+    center, radius = turntable_bounding_sphere(spheres, pivot)
+
+    # the sensor spans the longer side of the frame, the shorter one decides how far back to go
+    render = scene.render
+    width = render.resolution_x * render.pixel_aspect_x
+    height = render.resolution_y * render.pixel_aspect_y
+    half_angle = math.atan(camera_data.sensor_width / (2.0 * camera_data.lens))
+    half_angle = math.atan(math.tan(half_angle) * min(width, height) / max(width, height))
+    distance = radius / math.sin(half_angle) * AUTO_FRAME_PADDING
+    camera_data.clip_start = max(0.001, (distance - radius) * 0.5)
+    camera_data.clip_end = (distance + radius) * 2.0
+
+    # looking along +Y from the front, tilted down by the elevation
+    elevation = math.radians(settings.auto_frame_elevation_degrees)
+    location = (center[0], center[1] - distance * math.cos(elevation), center[2] + distance * math.sin(elevation))
+    return Matrix.Translation(location) @ Matrix.Rotation(math.pi / 2.0 - elevation, 4, 'X')
+
+
+# Quality steps a time budget climbs, lowest first. Cycles has (samples, adaptive noise threshold, denoiser),
+# past a thousand samples it's clean enough and the denoiser would only soften detail
+CYCLES_BUDGET_RUNGS = (
+    (16, 0.1, 'OPENIMAGEDENOISE'),
+    (32, 0.05, 'OPENIMAGEDENOISE'),
+    (64, 0.03, 'OPENIMAGEDENOISE'),
+    (128, 0.02, 'OPENIMAGEDENOISE'),
+    (256, 0.01, 'OPENIMAGEDENOISE'),
+    (512, 0.01, 'OPENIMAGEDENOISE'),
+    (1024, 0.005, 'OPENIMAGEDENOISE'),
+    (2048, 0.005, None),
+    (4096, 0.002, None),
+)
+EEVEE_BUDGET_RUNGS = (8, 16, 32, 64, 128, 256)
+WORKBENCH_BUDGET_RUNGS = ('5', '8', '11', '16', '32')
+
+# Everything a budget rung sets, SceneStateBackup puts these back
+BUDGET_SETTINGS = (
+    'cycles.samples', 'cycles.use_adaptive_sampling', 'cycles.adaptive_threshold',
+    'cycles.use_denoising', 'cycles.denoiser', 'eevee.taa_render_samples', 'display.render_aa',
+)
+
+# Resolution is only given up when not even this rung fits at the higher one
+BUDGET_MIN_RUNG = 2
+
+# Share of the budget that's planned with, the model is fitted on small frames
+BUDGET_MARGIN = 0.9
+
+
+def set_path(struct, path, value):
+    owner, name = path.rsplit(".", 1)
+    owner = resolve_path(struct, owner)
+    if owner is not None and hasattr(owner, name):
+        setattr(owner, name, value)
+
+
+def budget_rungs(engine):
+    # (samples, {scene property path: value}) for every rung of the engine, lowest first
+    if engine == 'CYCLES':
+        rungs = []
+        for samples, threshold, denoiser in CYCLES_BUDGET_RUNGS:
+            values = {
+                'cycles.samples': samples,
+                'cycles.use_adaptive_sampling': True,
+                'cycles.adaptive_threshold': threshold,
+                'cycles.use_denoising': denoiser is not None,
+            }
+            if denoiser:
+                values['cycles.denoiser'] = denoiser
+            rungs.append((samples, values))
+        return rungs
+    if engine == 'BLENDER_WORKBENCH':
+        return [(int(aa), {'display.render_aa': aa}) for aa in WORKBENCH_BUDGET_RUNGS]
+    return [(samples, {'eevee.taa_render_samples': samples}) for samples in EEVEE_BUDGET_RUNGS]
+
+
+def fit_render_cost(points):
+    # seconds a frame ~ a + b * pixels + c * pixels * samples, least squares over (pixels, samples, seconds).
+    # every subset of the terms is tried and the best fit without a negative one kept
+    features = np.array([[1.0, pixels, pixels * samples] for pixels, samples, seconds in points])
+    seconds = np.array([point[2] for point in points])
+    scale = features.max(axis=0)
+    features = features / scale
+    best_error, best = np.inf, None
+    for mask in itertools.product((True, False), repeat=3):
+        columns = np.flatnonzero(mask)
+        if not len(columns):
+            continue
+        solution = np.linalg.lstsq(features[:, columns], seconds, rcond=None)[0]
+        if np.any(solution < 0):
+            continue
+        coefficients = np.zeros(3)
+        coefficients[columns] = solution
+        error = np.sum((features @ coefficients - seconds) ** 2)
+        if error < best_error:
+            best_error, best = error, coefficients
+    return best / scale
+
+
+def predict_render_cost(coefficients, pixels, samples):
+    return float(coefficients @ [1.0, pixels, pixels * samples])
+
+
+def choose_budget_rung(coefficients, rungs, pixels_at, percentages, frames, seconds):
+    # (percentage, rung index): the highest rung that fits at the highest resolution where a decent one does,
+    # else wherever anything does, else the lowest of everything
+    fitting = {}
+    for percentage in percentages:
+        pixels = pixels_at(percentage)
+        fits = [index for index, (samples, values) in enumerate(rungs)
+                if predict_render_cost(coefficients, pixels, samples) * frames <= seconds]
+        if fits:
+            fitting[percentage] = fits[-1]
+    for percentage in percentages:
+        if fitting.get(percentage, -1) >= min(BUDGET_MIN_RUNG, len(rungs) - 1):
+            return percentage, fitting[percentage]
+    if fitting:
+        return next(iter(fitting.items()))
+    return percentages[-1], 0
+
+
+def cluster_vertices(coords, triangles, target):
+    # vertex clustering: vertices snap to the mean of their grid cell and triangles that collapse are dropped.
+    # a surface fills about resolution^2 cells, a few passes correct the guess
+    low = coords.min(axis=0)
+    span = float((coords.max(axis=0) - low).max()) or 1.0
+    resolution = max(1, int(math.sqrt(target)))
+    for attempt in range(4):
+        cells = np.minimum(np.floor((coords - low) * (resolution / span)).astype(np.int64), resolution)
+        keys = (cells[:, 0] * (resolution + 1) + cells[:, 1]) * (resolution + 1) + cells[:, 2]
+        unique, inverse = np.unique(keys, return_inverse=True)
+        if attempt == 3 or abs(len(unique) - target) <= target * 0.1:
+            break
+        resolution = min(1 << 20, max(1, int(resolution * math.sqrt(target / len(unique)))))
+
+    inverse = inverse.reshape(-1)
+    counts = np.bincount(inverse)
+    centers = np.stack([np.bincount(inverse, weights=coords[:, axis]) for axis in range(3)], axis=1) / counts[:, None]
+    corners = inverse[triangles]
+    keep = (corners[:, 0] != corners[:, 1]) & (corners[:, 1] != corners[:, 2]) & (corners[:, 0] != corners[:, 2])
+    return centers, corners[keep], keep
+
+
+def decimate_mesh(source, ratio, name):
+    source.calc_loop_triangles()
+    coords = np.empty(len(source.vertices) * 3, dtype=np.float32)
+    source.vertices.foreach_get('co', coords)
+    triangle_count = len(source.loop_triangles)
+    triangles = np.empty(triangle_count * 3, dtype=np.int32)
+    source.loop_triangles.foreach_get('vertices', triangles)
+    loops = np.empty(triangle_count * 3, dtype=np.int32)
+    source.loop_triangles.foreach_get('loops', loops)
+    material_indices = np.empty(triangle_count, dtype=np.int32)
+    source.loop_triangles.foreach_get('material_index', material_indices)
+
+    coords = coords.reshape(-1, 3)
+    centers, corners, keep = cluster_vertices(coords, triangles.reshape(-1, 3), max(4, int(len(coords) * ratio)))
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(centers))
+    mesh.vertices.foreach_set('co', centers.astype(np.float32).ravel())
+    kept = len(corners)
+    mesh.loops.add(kept * 3)
+    mesh.loops.foreach_set('vertex_index', corners.astype(np.int32).ravel())
+    mesh.polygons.add(kept)
+    mesh.polygons.foreach_set('loop_start', np.arange(0, kept * 3, 3, dtype=np.int32))
+    mesh.polygons.foreach_set('material_index', material_indices[keep])
+    mesh.polygons.foreach_set('use_smooth', np.ones(kept, dtype=bool))
+
+    # every kept triangle is an original one, so its corners keep their UVs
+    uv_layer = source.uv_layers.active
+    if uv_layer is not None:
+        uvs = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get('uv', uvs)
+        uvs = uvs.reshape(-1, 2)[loops.reshape(-1, 3)[keep].ravel()]
+        mesh.uv_layers.new(name=uv_layer.name).data.foreach_set('uv', uvs.ravel())
+
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def draft_mesh(obj, depsgraph, ratio):
+    # decimated copy of what the object renders, modifiers included
+    evaluated = obj.evaluated_get(depsgraph)
+    source = evaluated.to_mesh()
+    try:
+        key = hashlib.sha1(f"{mesh_fingerprint(source)}:{ratio:.6f}".encode()).hexdigest()
+        proxy_path = os.path.join(MESH_PROXY_DIR, f"{key}.blend")
+        if os.path.isfile(proxy_path):
+            try:
+                with bpy.data.libraries.load(proxy_path, link=False) as (data_from, data_to):
+                    data_to.meshes = list(data_from.meshes[:1])
+                if data_to.meshes and data_to.meshes[0] is not None:
+                    return data_to.meshes[0]
+            except (OSError, RuntimeError):
+                pass
+        mesh = decimate_mesh(source, ratio, f"Preview_Draft_{obj.name}")
+    finally:
+        evaluated.to_mesh_clear()
+
+    # written before it gets materials, so the cache file holds the mesh alone
+    atomic_write(proxy_path, lambda temp_path: bpy.data.libraries.write(temp_path, {mesh}, compress=True))
+    return mesh
+
+
+def turntable_period(span, rotations):
+    period = 1
+    for degrees in rotations:
+        # revolutions per frame as an exact fraction, to millidegree precision
+        step = Fraction(round(degrees * 1000), 360000 * span)
+        period = math.lcm(period, step.denominator)
+    return period
+
+
+def link_repeated_frames(frame_map):
+    for src, dst in frame_map:
+        if os.path.lexists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+
+def write_concat_list(list_path, frame_paths, fps):
+    with open(list_path, 'w') as fh:
+        for path in frame_paths:
+            escaped = path.replace("'", "'\\''")
+            fh.write(f"file '{escaped}'\nduration {1.0 / fps:.6f}\n")
+
+
+def encode_image_sequence(frame_paths, video_path, fps):
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+
+    list_path = video_path + ".txt"
+    write_concat_list(list_path, frame_paths, fps)
+
+    cmd = [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-r", f"{fps:g}",
+        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p",
+        video_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, errors='replace')
+    os.remove(list_path)
+    if result.returncode != 0:
+        raise RuntimeError(f"Video encode failed: {result.stderr.strip()[-200:]}")
+
+
+def encode_comparison_video(sources, video_path, fps):
+    # sources are videos or lists of frame paths, stacked left to right, in rows past four
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+
+    cmd = [ffmpeg, "-y", "-loglevel", "error"]
+    list_paths = []
+    for index, source in enumerate(sources):
+        if isinstance(source, str):
+            cmd += ["-i", source]
+        else:
+            list_path = f"{video_path}.{index}.txt"
+            write_concat_list(list_path, source, fps)
+            list_paths.append(list_path)
+            cmd += ["-f", "concat", "-safe", "0", "-i", list_path]
+
+    count = len(sources)
+    inputs = "".join(f"[{index}:v]" for index in range(count))
+    if count <= 4:
+        stack = f"{inputs}hstack=inputs={count}"
+    else:
+        columns = math.ceil(math.sqrt(count))
+        layout = "|".join(
+            f"{'+'.join(['w0'] * (index % columns)) or '0'}_{'+'.join(['h0'] * (index // columns)) or '0'}"
+            for index in range(count)
+        )
+        stack = f"{inputs}xstack=inputs={count}:layout={layout}:fill=black"
+    cmd += [
+        "-filter_complex", f"{stack},pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        "-r", f"{fps:g}",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p",
+        video_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, errors='replace')
+    for list_path in list_paths:
+        os.remove(list_path)
+    if result.returncode != 0:
+        raise RuntimeError(f"Comparison encode failed: {result.stderr.strip()[-200:]}")
+
+
+# file name and ffmpeg output options per streamed video
+VIDEO_TARGETS = {
+    'REVIEW_MP4': ("preview.mp4", ["-c:v", "libx264", "-preset", "medium", "-crf", "18", "-pix_fmt", "yuv420p"]),
+    'WEB_MP4': ("preview_web.mp4", [
+        "-c:v", "libx264", "-preset", "fast", "-b:v", "2M", "-maxrate", "2M", "-bufsize", "4M",
+        "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+    ]),
+    'WEB_WEBM': ("preview.webm", [
+        "-c:v", "libvpx-vp9", "-b:v", "1M", "-deadline", "realtime", "-cpu-used", "8", "-row-mt", "1",
+        "-pix_fmt", "yuv420p",
+    ]),
+}
+
+
+class FrameStream:
+    # one ffmpeg reads the frames from a pipe and writes every target, so each frame is decoded once
+    def __init__(self, frame_paths, outputs, fps):
+        # (frame, path) in video order, repeated frames are in it more than once
+        self.frame_paths = frame_paths
+        self.outputs = outputs
+        self.fps = fps
+        self.position = 0
+        self.saved = set()
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._process = None
+        self._thread = None
+        self._log = None
+
+    def start(self, ffmpeg):
+        cmd = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "image2pipe", "-framerate", f"{self.fps:g}", "-i", "-",
+        ]
+        for path, args in self.outputs:
+            cmd += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", *args, path]
+        self._log = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._log)
+        self._thread = threading.Thread(target=self.feed, daemon=True)
+        self._thread.start()
+
+    def frame_saved(self, frame):
+        # parallel workers save out of order, a frame waits until the ones before it are in
+        with self._lock:
+            self.saved.add(frame)
+            while self.position < len(self.frame_paths) and self.frame_paths[self.position][0] in self.saved:
+                self._queue.put(self.frame_paths[self.position][1])
+                self.position += 1
+
+    def path_saved(self, path):
+        match = re.search(r'(\d+)\.\w+$', path)
+        if match:
+            self.frame_saved(int(match.group(1)))
+
+    def feed(self):
+        # reading and piping happen here so the render never waits on the encoder
+        while True:
+            path = self._queue.get()
+            if path is None:
+                break
+            try:
+                with open(path, 'rb') as fh:
+                    self._process.stdin.write(fh.read())
+            except OSError as e:
+                self.error = str(e)
+                break
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._process.wait()
+        self._log.seek(0)
+        log = self._log.read().decode(errors='replace').strip()
+        self._log.close()
+        return log
+
+    def finish(self):
+        log = self.stop()
+        if self._process.returncode != 0:
+            raise RuntimeError(f"Streamed video encode failed: {(log or self.error or '')[-200:]}")
+        if self.error:
+            raise RuntimeError(f"Streamed video encode failed: {self.error}")
+        if self.position < len(self.frame_paths):
+            raise RuntimeError(f"Only {self.position} of {len(self.frame_paths)} frames reached the video")
+
+    def abort(self):
+        if self._process.poll() is None:
+            self._process.kill()
+        self.stop()
+        for path, args in self.outputs:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def parse_backdrops(text):
+    # (folder name, colours) per backdrop, one colour is solid, two a gradient from top to bottom
+    backdrops = []
+    for spec in text.split(","):
+        parts = [part.strip().lstrip("#").lower() for part in spec.split(">")]
+        if not any(parts):
+            continue
+        if len(parts) > 2:
+            raise ValueError(f"A backdrop has one or two colours: {spec.strip()}")
+        colors = []
+        for part in parts:
+            try:
+                if len(part) != 6:
+                    raise ValueError
+                colors.append(tuple(int(part[i:i + 2], 16) / 255.0 for i in (0, 2, 4)))
+            except ValueError:
+                raise ValueError(f"Not a #rrggbb colour: {part}") from None
+        backdrops.append(("_".join(parts), colors))
+    return backdrops
+
+
+def srgb_to_linear(values):
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(values):
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055)
+
+
+def backdrop_pixels(colors, width, height):
+    # linear RGB rows from top to bottom, the gradient is blended in sRGB like a CSS one
+    top = np.array(colors[0], dtype=np.float32)
+    bottom = np.array(colors[-1], dtype=np.float32)
+    blend = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None, None]
+    column = srgb_to_linear(top * (1.0 - blend) + bottom * blend).astype(np.float32)
+    return np.broadcast_to(column, (height, width, 3))
+
+
+def write_png(path, pixels):
+    # 8 bit RGB without row filters, zlib does the work and lets go of the GIL while it does
+    height, width, channels = pixels.shape
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    rows[:, 1:] = pixels.reshape(height, -1)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    with open(path, 'wb') as fh:
+        fh.write(b"\x89PNG\r\n\x1a\n")
+        fh.write(chunk(b"IHDR", header))
+        fh.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        fh.write(chunk(b"IEND", b""))
+
+
+def composite_frame(rgba, layers, paths):
+    # straight alpha sRGB with the rows bottom to top, as Blender holds them, blended in linear light
+    rgba = rgba[::-1]
+    alpha = rgba[..., 3:4]
+    color = srgb_to_linear(rgba[..., :3]) * alpha
+    for layer, path in zip(layers, paths):
+        pixels = linear_to_srgb(color + layer * (1.0 - alpha))
+        write_png(path, (pixels * 255.0 + 0.5).astype(np.uint8))
+
+
+def composite_backdrops(frame_paths, backdrops, output_dir, workers=0):
+    # frames are read through Blender on this thread and blended and written by the pool,
+    # only a couple of frames per worker are held at once
+    workers = workers or os.cpu_count() or 1
+    for name, colors in backdrops:
+        os.makedirs(os.path.join(output_dir, name), exist_ok=True)
+
+    layers = {}
+    pending = collections.deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for frame_path in frame_paths:
+            image = bpy.data.images.load(frame_path)
+            try:
+                width, height = image.size
+                rgba = np.empty(width * height * 4, dtype=np.float32)
+                image.pixels.foreach_get(rgba)
+            finally:
+                bpy.data.images.remove(image)
+
+            if (width, height) not in layers:
+                layers[(width, height)] = [backdrop_pixels(colors, width, height) for name, colors in backdrops]
+            file_name = os.path.splitext(os.path.basename(frame_path))[0] + ".png"
+            paths = [os.path.join(output_dir, name, file_name) for name, colors in backdrops]
+            pending.append(pool.submit(composite_frame, rgba.reshape(height, width, 4), layers[(width, height)], paths))
+            while len(pending) >= workers * 2:
+                pending.popleft().result()
+        for future in pending:
+            future.result()
+
+
+def rendered_frames(directory):
+    # the frames of a finished render, the backdrops go into a subfolder so they aren't picked up
+    return sorted(glob.glob(os.path.join(glob.escape(directory), "*.png")))
+
+
+# A synthesized frame with fewer doubtful pixels than this keeps its guesses instead of rendering them
+SPARSE_MIN_FALLBACK_PIXELS = 16
+
+# Relative depth difference under which two warped keyframes show the same surface
+SPARSE_DEPTH_TOLERANCE = 0.02
+
+EXR_PIXEL_TYPES = {0: np.dtype('<u4'), 1: np.dtype('<f2'), 2: np.dtype('<f4')}
+# Scanlines per chunk of the compressions read_exr understands: none, ZIPS and ZIP
+EXR_CHUNK_LINES = {0: 1, 2: 1, 3: 16}
+
+
+def unzip_exr_chunk(data):
+    # zlib, then the byte deltas and the split into even and odd bytes OpenEXR does before it undone
+    values = np.frombuffer(zlib.decompress(data), dtype=np.uint8).copy()
+    values[1:] -= 128
+    values = np.cumsum(values, dtype=np.uint8)
+    half = (len(values) + 1) // 2
+    out = np.empty_like(values)
+    out[0::2] = values[:half]
+    out[1::2] = values[half:]
+    return out
+
+
+def read_exr(path, names):
+    # float32 arrays of the named channels of a scanline EXR, rows bottom to top like Blender's pixels.
+    # a name matches a channel ending in it, so "Combined.R" finds the view layer's
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    if data[:4] != b"\x76\x2f\x31\x01":
+        raise RuntimeError(f"Not an EXR: {path}")
+    if struct.unpack_from("<I", data, 4)[0] & 0x1200:
+        raise RuntimeError(f"Tiled and multi-part EXRs aren't supported: {path}")
+
+    header = {}
+    position = 8
+    while data[position] != 0:
+        name_end = data.index(b"\0", position)
+        type_end = data.index(b"\0", name_end + 1)
+        size, = struct.unpack_from("<i", data, type_end + 1)
+        header[data[position:name_end].decode()] = data[type_end + 5:type_end + 5 + size]
+        position = type_end + 5 + size
+    position += 1
+
+    channels = []
+    chlist = header['channels']
+    offset = 0
+    while chlist[offset] != 0:
+        name_end = chlist.index(b"\0", offset)
+        pixel_type, = struct.unpack_from("<i", chlist, name_end + 1)
+        channels.append((chlist[offset:name_end].decode(), EXR_PIXEL_TYPES[pixel_type]))
+        # type, linear flag, three reserved bytes and the sampling
+        offset = name_end + 17
+    compression = header['compression'][0]
+    if compression not in EXR_CHUNK_LINES:
+        raise RuntimeError(f"EXR compression {compression} isn't supported: {path}")
+
+    x_min, y_min, x_max, y_max = struct.unpack("<4i", header['dataWindow'])
+    left, top, right, bottom = struct.unpack("<4i", header['displayWindow'])
+    width = x_max - x_min + 1
+    height = y_max - y_min + 1
+    line_bytes = width * sum(dtype.itemsize for name, dtype in channels)
+    lines = EXR_CHUNK_LINES[compression]
+    rows = np.empty((height, line_bytes), dtype=np.uint8)
+    for chunk_offset in struct.unpack_from(f"<{-(-height // lines)}Q", data, position):
+        y, size = struct.unpack_from("<ii", data, chunk_offset)
+        count = min(lines, y_max - y + 1)
+        chunk = data[chunk_offset + 8:chunk_offset + 8 + size]
+        # chunks that wouldn't get smaller are stored as they are
+        if size < count * line_bytes:
+            chunk = unzip_exr_chunk(chunk)
+        rows[y - y_min:y - y_min + count] = np.frombuffer(chunk, dtype=np.uint8).reshape(count, line_bytes)
+
+    # scanlines hold each channel's row in turn, in the order of the header
+    result = {}
+    start = 0
+    for channel, dtype in channels:
+        end = start + width * dtype.itemsize
+        for name in names:
+            if name not in result and (channel == name or channel.endswith("." + name)):
+                pixels = np.zeros((bottom - top + 1, right - left + 1), dtype=np.float32)
+                pixels[y_min - top:y_max - top + 1, x_min - left:x_max - left + 1] = rows[:, start:end].copy().view(dtype)
+                result[name] = pixels[::-1]
+        start = end
+    missing = [name for name in names if name not in result]
+    if missing:
+        raise RuntimeError(f"No {', '.join(missing)} in {path}")
+    return result
+
+
+def hdri_angles(scene, settings):
+    # how far the HDRI has turned against the camera at every frame. the mapping node turns the direction
+    # it looks up, so what's seen turns the other way. an orbiting camera's turn is already added to the
+    # mapping by animate_hdri_rotation, so it comes out the same in both modes
+    world = scene.world
+    end_frame = rotation_end_frame(settings)
+    if (settings.render_engine == 'BLENDER_WORKBENCH' or end_frame <= 1 or world is None or world.node_tree is None
+            or not any(node.type == 'MAPPING' for node in world.node_tree.nodes)):
+        return np.zeros(settings.frame_count)
+    return np.radians(-settings.hdri_rotation_degrees) * np.arange(settings.frame_count) / (end_frame - 1)
+
+
+def fill_cracks(color, depth, covered):
+    # a surface turning towards the camera spreads over more pixels than it came from, which leaves
+    # one pixel gaps. those between two covered neighbours get their average
+    for axis in (1, 0):
+        inner, low, high = ([slice(None)] * 2 for _ in range(3))
+        inner[axis], low[axis], high[axis] = slice(1, -1), slice(None, -2), slice(2, None)
+        inner, low, high = tuple(inner), tuple(low), tuple(high)
+        gaps = ~covered[inner] & covered[low] & covered[high]
+        color[inner][gaps] = (color[low][gaps] + color[high][gaps]) * 0.5
+        depth[inner][gaps] = np.maximum(depth[low][gaps], depth[high][gaps])
+        covered[inner] |= gaps
+    return color, depth, covered
+
+
+def fill_holes(color, known, passes=8):
+    # pixels nothing landed on take the mean of their known neighbours, a few pixels deep, so the ones
+    # too few to render aren't left black
+    known = known.copy()
+    for _ in range(passes):
+        if known.all():
+            break
+        padded = np.pad(color * known[..., None], ((1, 1), (1, 1), (0, 0)))
+        counts = np.pad(known, 1).astype(np.float32)
+        total = padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+        count = counts[:-2, 1:-1] + counts[2:, 1:-1] + counts[1:-1, :-2] + counts[1:-1, 2:]
+        fill = ~known & (count > 0)
+        color[fill] = total[fill] / count[fill][:, None]
+        known |= fill
+    return color
+
+
+def warp_keyframe(color, depth, camera, projection, pivot, angle, hdri_angle, clip_end):
+    # where every pixel of a keyframe lands once the turntable has turned angle further and the HDRI
+    # hdri_angle, found from the depth pass. gives colours, depths and which pixels anything landed on
+    height, width = depth.shape
+    inverse = np.linalg.inv(projection).astype(np.float32)
+    ndc_x = ((np.arange(width, dtype=np.float32) + 0.5) * (2.0 / width) - 1.0)[None, :]
+    ndc_y = ((np.arange(height, dtype=np.float32) + 0.5) * (2.0 / height) - 1.0)[:, None]
+
+    def unproject(ndc_z):
+        point = [inverse[row, 0] * ndc_x + inverse[row, 1] * ndc_y + inverse[row, 2] * ndc_z + inverse[row, 3]
+                 for row in range(4)]
+        return [point[axis] / point[3] for axis in range(3)]
+
+    # the view space ray under each pixel, from the near to the far plane
+    near = unproject(-1.0)
+    ray = [far - start for far, start in zip(unproject(1.0), near)]
+    # pixels outside the render border have no depth, the world's is past clip_end
+    surface = (depth > 0) & (depth < clip_end)
+    background = (depth > 0) & ~(depth < clip_end)
+    with np.errstate(invalid='ignore', over='ignore', divide='ignore'):
+        # the depth pass is the distance along the view axis
+        t = np.where(surface, (-depth - near[2]) / ray[2], 0.0)
+    view = [start + t * direction for start, direction in zip(near, ray)]
+
+    rotation = camera[:3, :3]
+    points = [sum(rotation[row, axis] * view[axis] for axis in range(3)) + camera[row, 3] for row in range(3)]
+    directions = [sum(rotation[row, axis] * ray[axis] for axis in range(3)) for row in range(3)]
+
+    # the turntable spins around the pivot's z axis, the HDRI around the world's
+    cos, sin = math.cos(angle), math.sin(angle)
+    x, y = points[0] - pivot[0], points[1] - pivot[1]
+    points[0], points[1] = pivot[0] + cos * x - sin * y, pivot[1] + sin * x + cos * y
+    cos, sin = math.cos(hdri_angle), math.sin(hdri_angle)
+    directions[0], directions[1] = cos * directions[0] - sin * directions[1], sin * directions[0] + cos * directions[1]
+
+    # directions project without the translation, the background sits at infinity
+    moved = [np.where(surface, point, direction) for point, direction in zip(points, directions)]
+    w = surface.astype(np.float32)
+    to_view = np.linalg.inv(camera)
+    to_clip = projection @ to_view
+    clip_x, clip_y, clip_w = (
+        to_clip[row, 0] * moved[0] + to_clip[row, 1] * moved[1] + to_clip[row, 2] * moved[2] + to_clip[row, 3] * w
+        for row in (0, 1, 3)
+    )
+    new_depth = -(to_view[2, 0] * moved[0] + to_view[2, 1] * moved[1] + to_view[2, 2] * moved[2] + to_view[2, 3])
+    new_depth = np.where(surface, new_depth, np.inf).astype(np.float32)
+
+    valid = (surface | background) & (clip_w > 1e-6)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        column = np.rint((clip_x / clip_w + 1.0) * 0.5 * width - 0.5)
+        row = np.rint((clip_y / clip_w + 1.0) * 0.5 * height - 0.5)
+    valid &= (column >= 0) & (column < width) & (row >= 0) & (row < height)
+
+    # where several pixels land on one, the nearest is kept
+    source = np.flatnonzero(valid)
+    target = (row.ravel()[source] * width + column.ravel()[source]).astype(np.int64)
+    order = np.lexsort((new_depth.ravel()[source], target))
+    source, target = source[order], target[order]
+    first = np.ones(len(target), dtype=bool)
+    first[1:] = target[1:] != target[:-1]
+    source, target = source[first], target[first]
+
+    out_color = np.zeros((height * width, 4), dtype=np.float32)
+    out_color[target] = color.reshape(-1, 4)[source]
+    out_depth = np.full(height * width, np.inf, dtype=np.float32)
+    out_depth[target] = new_depth.ravel()[source]
+    covered = np.zeros(height * width, dtype=bool)
+    covered[target] = True
+    return fill_cracks(out_color.reshape(height, width, 4), out_depth.reshape(height, width),
+                       covered.reshape(height, width))
+
+
+def blend_keyframes(a, b, weight, tolerance):
+    # one frame from the keyframes either side warped to it, and the pixels neither could vouch for
+    color_a, depth_a, covered_a = a
+    color_b, depth_b, covered_b = b
+    both = covered_a & covered_b
+    with np.errstate(invalid='ignore'):
+        # one keyframe saw something in front of what the other did
+        nearer_a = both & (depth_a < depth_b * (1.0 - SPARSE_DEPTH_TOLERANCE))
+        nearer_b = both & (depth_b < depth_a * (1.0 - SPARSE_DEPTH_TOLERANCE))
+    same = both & ~nearer_a & ~nearer_b
+    agree = same & (np.abs(color_a - color_b).max(axis=-1) <= tolerance)
+    only_a = (covered_a & ~covered_b) | nearer_a
+    only_b = (covered_b & ~covered_a) | nearer_b
+
+    color = color_a * (1.0 - weight) + color_b * weight
+    color[only_a] = color_a[only_a]
+    color[only_b] = color_b[only_b]
+    return fill_holes(color, covered_a | covered_b), ~(agree | only_a | only_b)
+
+
+class SparseRender:
+    # a turntable rendered every interval frames with the frames between made from the keyframes either side.
+    # the turntable's motion is known exactly, so the depth pass is all it takes to move their pixels
+    def __init__(self, scene, settings, camera, pivot, keys_dir):
+        render = scene.render
+        self.scene = scene
+        self.settings = settings
+        self.interval = settings.sparse_keyframes
+        self.tolerance = settings.sparse_tolerance
+        self.keys_dir = keys_dir
+        self.camera = np.array(camera.matrix_world, dtype=np.float32)
+        self.projection = np.array(camera.calc_matrix_camera(
+            bpy.context.evaluated_depsgraph_get(),
+            x=render.resolution_x, y=render.resolution_y,
+            scale_x=render.pixel_aspect_x, scale_y=render.pixel_aspect_y,
+        ), dtype=np.float32)
+        self.clip_end = camera.data.clip_end
+        self.pivot = np.array(pivot, dtype=np.float32)
+        self.angles = turntable_angles(settings)
+        self.hdri_angles = hdri_angles(scene, settings)
+
+        self.frame_start = scene.frame_start
+        self.frame_end = scene.frame_end
+        self.output_paths = {f: render.frame_path(frame=f) for f in range(self.frame_start, self.frame_end + 1)}
+        self.keys = list(range(self.frame_start, self.frame_end + 1, self.interval))
+        self.border = (render.border_min_x, render.border_min_y, render.border_max_x, render.border_max_y) \
+            if render.use_border else None
+        self.crop = render.use_border and render.use_crop_to_border
+        # what the keyframes and fallbacks change, put back to save the frames and for the next step
+        image_settings = render.image_settings
+        self.state = [(owner, name, getattr(owner, name)) for owner, names in (
+            (scene, ('frame_start', 'frame_end', 'frame_step')),
+            (render, ('filepath', 'use_border', 'use_crop_to_border',
+                      'border_min_x', 'border_min_y', 'border_max_x', 'border_max_y')),
+            (image_settings, ('media_type', 'file_format', 'color_mode', 'color_depth')),
+        ) for name in names if hasattr(owner, name)]
+
+        self.key_paths = {}
+        self.size = None
+        self.window = None
+        self.image = None
+        self.stream = None
+        # the step's other post render tasks, they run once every frame is final
+        self.tasks = []
+        self.pending = 0
+
+    def restore(self):
+        for owner, name, value in self.state:
+            setattr(owner, name, value)
+
+    def use_key_format(self, name):
+        # multilayer EXR with depth, never cropped so the pixels line up with the full frame
+        scene = self.scene
+        render = scene.render
+        image_settings = render.image_settings
+        os.makedirs(self.keys_dir, exist_ok=True)
+        if hasattr(image_settings, 'media_type'):
+            image_settings.media_type = 'MULTI_LAYER_IMAGE'
+        image_settings.file_format = 'OPEN_EXR_MULTILAYER'
+        image_settings.color_mode = 'RGBA'
+        image_settings.color_depth = '32'
+        image_settings.exr_codec = 'ZIP'
+        render.use_crop_to_border = False
+        render.filepath = os.path.join(self.keys_dir, name)
+        for layer in scene.view_layers:
+            layer.use_pass_z = True
+
+    def use_keyframes(self):
+        self.use_key_format("key_")
+        self.scene.frame_step = self.interval
+        self.key_paths = {f: self.scene.render.frame_path(frame=f) for f in self.keys}
+
+    def use_fallback(self, step):
+        # the one frame, only inside the box around its doubtful pixels
+        scene = self.scene
+        render = scene.render
+        self.use_key_format("fallback_")
+        width, height = self.size
+        x0, y0, x1, y1 = step.box
+        render.use_border = True
+        render.border_min_x, render.border_min_y = x0 / width, y0 / height
+        render.border_max_x, render.border_max_y = x1 / width, y1 / height
+        scene.frame_start = scene.frame_end = step.frame
+        scene.frame_step = 1
+        return render.frame_path(frame=step.frame)
+
+    def read_color(self, path):
+        channels = read_exr(path, ('Combined.R', 'Combined.G', 'Combined.B', 'Combined.A'))
+        return np.stack([channels[f'Combined.{c}'] for c in "RGBA"], axis=-1)
+
+    def read_keyframe(self, frame):
+        path = self.key_paths[frame]
+        color = self.read_color(path)
+        depth = read_exr(path, ('Depth.Z',))['Depth.Z']
+        if self.window is None:
+            height, width = depth.shape
+            self.size = (width, height)
+            # the pixels Blender renders, border edges are truncated like it does
+            x0, y0, x1, y1 = self.border or (0.0, 0.0, 1.0, 1.0)
+            self.window = (int(x0 * width), int(y0 * height), int(x1 * width), int(y1 * height))
+        return frame, color, depth
+
+    def pending_path(self, frame):
+        return os.path.join(self.keys_dir, f"pending_{frame:05d}.npz")
+
+    def save_frame(self, frame, color):
+        # through Blender, so the frame gets the scene's format and view transform
+        x0, y0, x1, y1 = self.window
+        if self.crop:
+            color = color[y0:y1, x0:x1]
+        else:
+            inside = color[y0:y1, x0:x1].copy()
+            color = np.zeros_like(color)
+            color[y0:y1, x0:x1] = inside
+        height, width = color.shape[:2]
+        if self.image is None or tuple(self.image.size) != (width, height):
+            if self.image is not None:
+                bpy.data.images.remove(self.image)
+            self.image = track_created_id(self.settings, bpy.data.images.new(
+                "Preview_Sparse_Frame", width, height, alpha=True, float_buffer=True))
+        self.image.pixels.foreach_set(np.ascontiguousarray(color, dtype=np.float32).ravel())
+        self.image.save_render(self.output_paths[frame], scene=self.scene)
+
+    def synthesize(self, a, b, frame):
+        warped = []
+        for key in (a, b):
+            if key is not None:
+                key_frame, color, depth = key
+                index, key_index = frame - self.frame_start, key_frame - self.frame_start
+                warped.append(warp_keyframe(
+                    color, depth, self.camera, self.projection, self.pivot,
+                    self.angles[index] - self.angles[key_index],
+                    self.hdri_angles[index] - self.hdri_angles[key_index], self.clip_end,
+                ))
+        if len(warped) == 1:
+            # past the last keyframe there is only the one before
+            color, depth, covered = warped[0]
+            return fill_holes(color, covered), ~covered
+        return blend_keyframes(warped[0], warped[1], (frame - a[0]) / (b[0] - a[0]), self.tolerance)
+
+    def doubtful_box(self, doubtful):
+        x0, y0, x1, y1 = self.window
+        inside = doubtful[y0:y1, x0:x1]
+        if np.count_nonzero(inside) < SPARSE_MIN_FALLBACK_PIXELS:
+            return None
+        rows = np.flatnonzero(inside.any(axis=1))
+        columns = np.flatnonzero(inside.any(axis=0))
+        # a pixel of margin, the border is rounded to whole pixels
+        return (max(x0, x0 + int(columns[0]) - 1), max(y0, y0 + int(rows[0]) - 1),
+                min(x1, x0 + int(columns[-1]) + 2), min(y1, y0 + int(rows[-1]) + 2))
+
+    def fill(self):
+        # every frame from the keyframes, gives (frame, box) for the ones with pixels left to render
+        self.restore()
+        workers = max(1, min(self.interval - 1, os.cpu_count() or 1))
+        fallbacks = []
+        previous = None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for frame in self.keys + [None]:
+                current = None if frame is None else self.read_keyframe(frame)
+                if previous is not None:
+                    last = self.frame_end if current is None else frame - 1
+                    frames = list(range(previous[0] + 1, last + 1))
+                    # a few frames at a time, each holds a couple of full size arrays
+                    for start in range(0, len(frames), workers):
+                        batch = frames[start:start + workers]
+                        futures = [pool.submit(self.synthesize, previous, current, f) for f in batch]
+                        for f, future in zip(batch, futures):
+                            color, doubtful = future.result()
+                            box = self.doubtful_box(doubtful)
+                            if box is None:
+                                self.save_frame(f, color)
+                            else:
+                                np.savez(self.pending_path(f), color=color, doubtful=doubtful)
+                                fallbacks.append((f, box))
+                if current is not None:
+                    self.save_frame(frame, current[1])
+                previous = current
+        self.pending = len(fallbacks)
+        return fallbacks
+
+    def fallback_done(self, step, path=None):
+        # the doubtful pixels from the fallback render, or the guesses when it didn't happen
+        try:
+            with np.load(self.pending_path(step.frame)) as pending:
+                color = pending['color']
+                doubtful = pending['doubtful']
+            if path is not None:
+                rendered = self.read_color(path)
+                if rendered.shape != color.shape:
+                    raise RuntimeError(f"Fallback render of frame {step.frame} came out a different size")
+                x0, y0, x1, y1 = step.box
+                mask = np.zeros_like(doubtful)
+                mask[y0:y1, x0:x1] = doubtful[y0:y1, x0:x1]
+                color[mask] = rendered[mask]
+            self.restore()
+            self.save_frame(step.frame, color)
+        finally:
+            self.pending -= 1
+            if not self.pending:
+                self.finish()
+
+    def finish(self):
+        self.restore()
+        if self.stream is not None:
+            for frame in range(self.frame_start, self.frame_end + 1):
+                self.stream.frame_saved(frame)
+        errors = run_post_render_tasks(self.tasks)
+        self.cleanup()
+        if errors:
+            raise RuntimeError("; ".join(errors))
+
+    def cancel(self):
+        self.restore()
+        run_post_render_tasks(self.tasks, cancelled=True)
+        self.cleanup()
+
+    def cleanup(self):
+        self.tasks = []
+        if self.image is not None:
+            bpy.data.images.remove(self.image)
+            self.image = None
+        shutil.rmtree(self.keys_dir, ignore_errors=True)
+
+
+def run_post_render_tasks(tasks, cancelled=False):
+    errors = []
+    for task in tasks:
+        try:
+            task(cancelled)
+        except Exception as e:
+            traceback.print_exc()
+            errors.append(str(e))
+    return errors
+
+
+def record_post_render_errors(stats, errors):
+    if stats is None or not errors:
+        return
+    stats.errors.extend(errors)
+    if stats.finished:
+        # the report went out with the last tasks, before anything after it failed
+        stats.write()
+
+
+@persistent
+def on_render_complete(scene, *args):
+    tasks = POST_RENDER_TASKS[:]
+    POST_RENDER_TASKS.clear()
+    errors = run_post_render_tasks(tasks)
+    record_post_render_errors(ACTIVE_STATS, errors)
+    if errors and ACTIVE_JOB is not None and ACTIVE_JOB.index >= 0:
+        label = ACTIVE_JOB.steps[ACTIVE_JOB.index].label()
+        ACTIVE_JOB.errors.extend(f"{label}: {message}" if label else message for message in errors)
+    # background renders block in the operator, it carries on from there
+    if render_busy():
+        schedule_next_render()
+
+
+@persistent
+def on_render_cancel(scene, *args):
+    tasks = POST_RENDER_TASKS[:]
+    POST_RENDER_TASKS.clear()
+    run_post_render_tasks(tasks, cancelled=True)
+    if render_busy():
+        ACTIVE_JOB.cancelled = True
+        schedule_next_render()
+
+
+@persistent
+def on_render_pre(scene, *args):
+    if ACTIVE_STATS is not None:
+        ACTIVE_STATS.frame_started(scene.frame_current)
+
+
+@persistent
+def on_render_post(scene, *args):
+    if ACTIVE_STATS is not None:
+        ACTIVE_STATS.frame_finished(scene.frame_current)
+
+
+@persistent
+def on_render_stats(stats, *args):
+    # Blender only sends these during background renders, so memory and sync time
+    # are missing from renders started in the UI
+    if ACTIVE_STATS is not None and isinstance(stats, str):
+        ACTIVE_STATS.add_stats(stats)
+
+
+@persistent
+def on_render_write(scene, *args):
+    if ACTIVE_MANIFEST is not None:
+        ACTIVE_MANIFEST.mark_complete(scene.frame_current)
+    if ACTIVE_STREAM is not None:
+        ACTIVE_STREAM.frame_saved(scene.frame_current)
+
+
+@persistent
+def on_load_post(*args):
+    global ACTIVE_MANIFEST, ACTIVE_STATS, ACTIVE_JOB, ACTIVE_STREAM
+    if ACTIVE_STREAM is not None:
+        # its render is gone with the old file
+        ACTIVE_STREAM.abort()
+        ACTIVE_STREAM = None
+    POST_RENDER_TASKS.clear()
+    MESH_BOUNDS.clear()
+    RENDER_QUEUE.clear()
+    ACTIVE_MANIFEST = None
+    ACTIVE_STATS = None
+    ACTIVE_JOB = None
+
+
+@persistent
+def on_depsgraph_update_post(scene, depsgraph):
+    if not MESH_BOUNDS:
+        return
+    for update in depsgraph.updates:
+        if update.is_updated_geometry:
+            session_uid = update.id.original.session_uid
+            MESH_BOUNDS.pop(('MESH', session_uid), None)
+            MESH_BOUNDS.pop(('OBJECT', session_uid), None)
+
+
+@persistent
+def on_undo_redo(*args):
+    # undo can bring back older geometry without a depsgraph update for it
+    MESH_BOUNDS.clear()
+
+
+def split_frame_range(frame_start, frame_end, chunk_count):
+    total = frame_end - frame_start + 1
+    chunk_count = max(1, min(chunk_count, total))
+    size, extra = divmod(total, chunk_count)
+
+    chunks = []
+    start = frame_start
+    for idx in range(chunk_count):
+        end = start + size - 1 + (1 if idx < extra else 0)
+        chunks.append((start, end))
+        start = end + 1
+    return chunks
+
+
+def find_ffmpeg():
+    return shutil.which("ffmpeg")
+
+
+def tag_panel_redraw():
+    wm = bpy.context.window_manager
+    if not wm:
+        return
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+class ParallelRenderJob:
+    def __init__(self, blend_path, chunks, threads, post_render_tasks=(), on_frame_saved=None, scene_name=None,
+                 stats=None):
+        self.blend_path = blend_path
+        self.scene_name = scene_name
+        self.stats = stats
+        self.chunks = chunks
+        self.threads = threads
+        self.post_render_tasks = list(post_render_tasks)
+        self.on_frame_saved = on_frame_saved
+
+        self.frame_total = sum(end - start + 1 for start, end in chunks)
+        self.frames_done = 0
+        self.errors = []
+        self.state = 'PENDING'
+
+        self._lock = threading.Lock()
+        self._processes = []
+        self._cancelled = False
+        self._thread = None
+
+    def start(self):
+        self.state = 'RENDERING'
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def is_running(self):
+        return self.state in {'PENDING', 'RENDERING', 'FINISHING'}
+
+    def progress(self):
+        if not self.frame_total:
+            return 0.0
+        return min(1.0, self.frames_done / self.frame_total)
+
+    def status_text(self):
+        if self.state == 'RENDERING':
+            return f"Rendering with {len(self.chunks)} workers"
+        if self.state == 'FINISHING':
+            return "Finishing output"
+        if self.state == 'FINISHED':
+            return f"Parallel render finished: {self.frames_done} frames"
+        if self.state == 'CANCELLED':
+            return "Parallel render cancelled"
+        if self.state == 'FAILED':
+            return "Parallel render failed"
+        return "Parallel render pending"
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=len(self.chunks)) as pool:
+            results = list(pool.map(self.render_chunk, self.chunks))
+
+        shutil.rmtree(os.path.dirname(self.blend_path), ignore_errors=True)
+
+        if self._cancelled:
+            self.state = 'CANCELLED'
+        elif not all(results):
+            self.state = 'FAILED'
+        else:
+            # post-render tasks touch bpy so they run from the timer on the main thread
+            self.state = 'FINISHING'
+
+    def finish(self):
+        cancelled = self.state != 'FINISHING'
+        errors = run_post_render_tasks(self.post_render_tasks, cancelled)
+        self.errors.extend(errors)
+        if not cancelled:
+            record_post_render_errors(self.stats, errors)
+        self.post_render_tasks = []
+        if not cancelled:
+            self.state = 'FAILED' if self.errors else 'FINISHED'
+
+    def render_chunk(self, chunk):
+        frame_start, frame_end = chunk
+        cmd = [bpy.app.binary_path, "-b", self.blend_path]
+        if self.scene_name:
+            cmd += ["-S", self.scene_name]
+        cmd += [
+            "-t", str(self.threads),
+            "-s", str(frame_start), "-e", str(frame_end),
+            "-a",
+        ]
+
+        with self._lock:
+            if self._cancelled:
+                return False
+            try:
+                process = subprocess.Popen(
+                    cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                    text=True, errors='replace',
+                )
+            except OSError as e:
+                self.errors.append(f"Frames {frame_start}-{frame_end} could not start: {e}")
+                return False
+            self._processes.append(process)
+
+        last_error = ""
+        frame = None
+        for line in process.stdout:
+            if line.startswith("Saved:"):
+                with self._lock:
+                    self.frames_done += 1
+                if self.on_frame_saved is not None:
+                    self.on_frame_saved(line.split("'")[1] if "'" in line else line[6:].strip())
+                if self.stats is not None and frame is not None:
+                    self.stats.frame_finished(frame)
+            elif line.startswith("Fra:"):
+                if self.stats is not None:
+                    frame = self.stats.add_stats(line)
+            elif "Error" in line:
+                last_error = line.strip()
+
+        process.wait()
+        if process.returncode != 0 and not self._cancelled:
+            message = f"Frames {frame_start}-{frame_end} failed (exit {process.returncode})"
+            if last_error:
+                message += f": {last_error}"
+            with self._lock:
+                self.errors.append(message)
+            return False
+        return not self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            for process in self._processes:
+                if process.poll() is None:
+                    process.kill()
+
+
+def poll_render_stats():
+    tag_panel_redraw()
+    if ACTIVE_STATS is None or ACTIVE_STATS.finished:
+        return None
+    return 1.0
+
+
+def poll_parallel_render():
+    tag_panel_redraw()
+    if PARALLEL_JOB is None:
+        return None
+    if PARALLEL_JOB.state in {'FINISHING', 'FAILED', 'CANCELLED'} and PARALLEL_JOB.post_render_tasks:
+        PARALLEL_JOB.finish()
+    if not PARALLEL_JOB.is_running():
+        if render_busy():
+            if PARALLEL_JOB.state == 'CANCELLED':
+                if ACTIVE_JOB.restarting:
+                    discard_restarted_render(ACTIVE_JOB)
+                else:
+                    ACTIVE_JOB.cancelled = True
+            schedule_next_render()
+        return None
+    restart_final_stage()
+    return 0.5
+
+
+# Settings a progressive job's full render takes on by starting over on the same setup,
+# the rest went into building the scene
+FINAL_STAGE_SETTINGS = {
+    'resolution_percentage', 'custom_resolution', 'resolution_x', 'resolution_y', 'time_budget',
+    'file_format', 'video_targets', 'auto_border', 'crop_to_border', 'border_margin', 'skip_repeated_frames',
+}
+
+# Only the draft uses these
+DRAFT_SETTINGS = {'progressive', 'progressive_draft', 'progressive_frame_step'}
+
+
+def restart_final_stage():
+    job = ACTIVE_JOB
+    if not render_busy() or not job.progressive or job.restarting or PARALLEL_JOB.state != 'RENDERING':
+        return
+    step = job.steps[job.index]
+    if not isinstance(step, RenderStep) or step.draft:
+        return
+    settings = job.source_scene.preview_render_settings
+    snapshot = settings_snapshot(settings)
+    changed = {name for name, value in snapshot.items() if value != job.snapshot.get(name)} - DRAFT_SETTINGS
+    if not changed:
+        return
+    job.snapshot = snapshot
+    if not changed <= FINAL_STAGE_SETTINGS:
+        job.messages.append(f"{', '.join(sorted(changed - FINAL_STAGE_SETTINGS))} changed, needs a new render")
+        tag_panel_redraw()
+        return
+
+    # the running render and the ones after it start over with the edits, each keeping its variant
+    edited = FrozenSettings(settings)
+    fingerprints = {}
+    restarted = []
+    for old in job.steps[job.index:]:
+        if not isinstance(old, RenderStep):
+            continue
+        new_settings = copy.copy(edited)
+        # batches fit the camera to every item whatever the panel says
+        for name in VARIANT_SETTINGS + ('auto_frame_camera',):
+            setattr(new_settings, name, getattr(old.settings, name))
+        new = old.restarted(final_settings(new_settings))
+        if old.item not in fingerprints:
+            fingerprints[old.item] = selection_fingerprints(old.item.objects)
+        new.job_hash = compute_job_hash(new.settings, old.item.objects, job.render_camera, fingerprints[old.item],
+                                        job.scene_state)
+        restarted.append(new)
+    job.steps[job.index + 1:] = restarted
+    # a new budget may need new samples, it's calibrated again
+    job.budget = None
+    job.restarting = True
+    job.messages.append("Settings changed, full render restarted")
+    PARALLEL_JOB.cancel()
+
+
+def discard_restarted_render(job):
+    # the cancelled full render is replaced by its restart, half of it isn't worth keeping
+    step = job.steps[job.index]
+    if step.settings.auto_save_path and step.job_hash:
+        RenderCatalog.load(get_preview_renders_dir()).remove(step.job_hash)
+
+
+def render_busy():
+    return ACTIVE_JOB is not None and ACTIVE_JOB.running
+
+
+def schedule_next_render():
+    # the finished render's handlers are still running, so whatever comes next starts from a timer
+    if not bpy.app.timers.is_registered(continue_rendering):
+        bpy.app.timers.register(continue_rendering, first_interval=0.1)
+
+
+def continue_rendering():
+    global ACTIVE_JOB
+    # timers run without a window, the render view needs one
+    windows = bpy.context.window_manager.windows
+    job = ACTIVE_JOB
+    if render_busy() and job.has_next() and windows:
+        with bpy.context.temp_override(window=windows[0]):
+            bpy.ops.preview_render.start(batch_continue=True)
+        tag_panel_redraw()
+        return None
+
+    if render_busy():
+        job.running = False
+        job.restore()
+        ACTIVE_JOB = None
+
+    # a queued render that can't start is dropped and the next one tried
+    while RENDER_QUEUE and not render_busy() and windows:
+        with bpy.context.temp_override(window=windows[0]):
+            bpy.ops.preview_render.start(queue_continue=True)
+    tag_panel_redraw()
+    return None
+
+
+class FrozenSettings:
+    # the settings a render was started or queued with, so later edits in the panel don't reach it
+    def __init__(self, settings):
+        for name in PreviewRenderSettings.__annotations__:
+            # created_ids stays the scene's own collection, cleanup finds the IDs there
+            setattr(self, name, getattr(settings, name))
+
+
+class QueuedRender:
+    def __init__(self, context, resume_directory=""):
+        self.scene_name = context.scene.name
+        self.object_names = [obj.name for obj in context.selected_objects]
+        self.settings = FrozenSettings(context.scene.preview_render_settings)
+        self.resume_directory = resume_directory
+
+    def label(self):
+        if self.resume_directory:
+            return f"Resume {os.path.basename(os.path.normpath(self.resume_directory))}"
+        batch = "" if self.settings.batch_mode == 'NONE' else f", {self.settings.batch_mode.lower()} batch"
+        return f"{len(self.object_names)} objects, {self.settings.frame_count} frames{batch}"
+
+
+class BatchItem:
+    def __init__(self, name, objects, centered=False):
+        self.name = name
+        self.objects = objects
+        # what the turntable shows, draft geometry swaps meshes for their proxies here
+        self.render_objects = objects
+        self.centered = centered
+        self.steps = []
+        self.offset = (0.0, 0.0, 0.0)
+        self.border_corners = None
+        self.frame_spheres = None
+        # height and size of the shadow catcher under it
+        self.ground = (0.0, 1.0)
+
+    def measure(self, settings):
+        # taken before anything is reparented, it's what the turntable spins
+        corners = None
+        if self.centered or settings.auto_border or settings.shadow_catcher:
+            corners = bound_box_corners(self.objects)
+        if self.centered:
+            # the instance is shifted so the item spins around its own middle
+            if corners is not None:
+                middle = (corners.min(axis=0) + corners.max(axis=0)) / 2.0
+            else:
+                middle = np.array([obj.matrix_world.translation for obj in self.objects], dtype=float).mean(axis=0)
+            self.offset = (float(middle[0]), float(middle[1]), 0.0)
+
+        shift = np.array(self.offset)
+        if settings.auto_border and corners is not None:
+            self.border_corners = corners - shift
+        if settings.shadow_catcher and corners is not None:
+            # wide enough for the shadow to stay on it at any angle
+            reach = np.linalg.norm(corners[:, :2] - shift[:2], axis=1).max()
+            self.ground = (float(corners[:, 2].min()), float(max(reach, 0.1) * 3.0))
+        if settings.auto_frame_camera:
+            spheres = selection_bounding_spheres(self.objects)
+            spheres[:, :3] -= shift
+            self.frame_spheres = spheres
+
+
+class RenderStep:
+    # one render of the job, an item with one variant of the settings
+    def __init__(self, item, variant, settings, draft=False):
+        self.item = item
+        self.variant = variant
+        self.settings = settings
+        self.job_hash = None
+        self.output_dir = None
+        self.compare = False
+        self.draft = draft
+        # a draft is no variant of the item, comparisons leave it out
+        if not draft:
+            item.steps.append(self)
+
+    def label(self):
+        return " ".join(part for part in (self.item.name, self.variant, "draft" if self.draft else "") if part)
+
+    def restarted(self, settings):
+        # the same render with edited settings, in this one's place among the item's variants
+        step = copy.copy(self)
+        step.settings = settings
+        step.output_dir = None
+        self.item.steps[self.item.steps.index(self)] = step
+        return step
+
+
+class FallbackStep:
+    # renders the pixels of a synthesized frame that a sparse render's keyframes couldn't vouch for
+    def __init__(self, step, sparse, frame, box):
+        self.step = step
+        self.item = step.item
+        self.settings = step.settings
+        self.sparse = sparse
+        self.frame = frame
+        self.box = box
+        self.output_dir = None
+
+    def label(self):
+        return " ".join(part for part in (self.step.label(), f"frame {self.frame}") if part)
+
+
+class RenderJob:
+    def __init__(self, source_scene, settings, steps, batch=False):
+        self.source_scene = source_scene
+        self.settings = settings
+        self.steps = steps
+        self.batch = batch
+        self.index = -1
+        self.running = False
+        self.cancelled = False
+        self.failed = []
+
+        self.scene = None
+        self.pivot = None
+        self.asset_collection = None
+        self.framed_camera = None
+        self.orbit_camera = None
+        self.border_camera = None
+        self.shadow_catcher = None
+        # shared by the variants, each step picks its own
+        self.light_rigs = {}
+        self.hdri_images = {}
+        self.override_layers = []
+        # picked once by the time budget's calibration, used by every step
+        self.budget = None
+        # the scene's own quality settings, put back after a draft
+        self.quality = {}
+        # a draft first, then the full render, which restarts when the panel is edited
+        self.progressive = False
+        self.snapshot = {}
+        self.render_camera = None
+        self.scene_state = None
+        self.restarting = False
+        self.draft_dir = None
+        # shown under the job's status in the panel
+        self.messages = []
+        # what failed, steps and their post render tasks, the command line reports it
+        self.errors = []
+
+        # what the setup changed in the user's scene, put back by restore()
+        self.view_layer = None
+        self.scene_backup = None
+        self.parents = {}
+        self.display_types = {}
+        self.visibility = {}
+
+    def restore(self):
+        if self.scene_backup:
+            self.scene_backup.restore()
+
+        if self.view_layer is not None:
+            for layer_col in self.view_layer.layer_collection.children:
+                if layer_col.name in self.visibility:
+                    layer_col.exclude = self.visibility[layer_col.name]
+
+        for obj_name, parent in self.parents.items():
+            if obj_name in bpy.data.objects:
+                obj = bpy.data.objects[obj_name]
+                try:
+                    obj.parent = parent
+                except ReferenceError:
+                    pass
+
+        for obj_name, display_type in self.display_types.items():
+            if obj_name in bpy.data.objects:
+                obj = bpy.data.objects[obj_name]
+                obj.display_type = display_type
+
+        remove_created_ids(self.source_scene)
+
+    def has_next(self):
+        return not self.cancelled and self.index + 1 < len(self.steps)
+
+    def next_step(self):
+        self.index += 1
+        return self.steps[self.index]
+
+    def show_item(self, item):
+        if self.asset_collection is None:
+            return
+        # instance_offset is subtracted, so the item's middle lands on the pivot
+        for obj in list(self.asset_collection.objects):
+            self.asset_collection.objects.unlink(obj)
+        for obj in item.render_objects:
+            self.asset_collection.objects.link(obj)
+        self.asset_collection.instance_offset = item.offset
+
+    def status_text(self):
+        total = len(self.steps)
+        kind = "Batch" if self.batch else "Variants" if not self.progressive else "Stage"
+        if self.cancelled:
+            return f"{kind} cancelled after {self.index + 1}/{total}"
+        return f"{kind} {self.index + 1}/{total}: {self.steps[self.index].label() or 'full render'}"
+
+
+class PREVIEWRENDER_OT_start(bpy.types.Operator):
+    bl_idname = "preview_render.start"
+    bl_label = "Start Preview Render"
+    bl_description = "Start automated preview render with current settings"
+
+    resume_directory: StringProperty(
+        name="Resume Directory",
+        default="",
+        options={'HIDDEN', 'SKIP_SAVE'},
+    )
+
+    batch_continue: BoolProperty(
+        name="Continue Batch",
+        default=False,
+        options={'HIDDEN', 'SKIP_SAVE'},
+    )
+
+    queue_continue: BoolProperty(
+        name="Start Queued Render",
+        default=False,
+        options={'HIDDEN', 'SKIP_SAVE'},
+    )
+
+    def execute(self, context):
+        if self.batch_continue:
+            return self.continue_batch()
+
+        if self.queue_continue:
+            if not RENDER_QUEUE or render_busy():
+                return {'CANCELLED'}
+            request = RENDER_QUEUE.pop(0)
+        else:
+            request = QueuedRender(context, self.resume_directory)
+            if render_busy():
+                RENDER_QUEUE.append(request)
+                self.report({'INFO'}, f"Render queued, {len(RENDER_QUEUE)} waiting")
+                tag_panel_redraw()
+                return {'FINISHED'}
+        return self.start_render(context, request)
+
+    def start_render(self, context, request):
+        global ACTIVE_JOB
+        setup_started = time.perf_counter()
+        settings = request.settings
+        scene = bpy.data.scenes.get(request.scene_name)
+        if scene is None:
+            self.report({'ERROR'}, f"Scene {request.scene_name} no longer exists.")
+            return {'CANCELLED'}
+
+        manifest = None
+        if request.resume_directory:
+            manifest = RenderManifest.load(request.resume_directory)
+            if manifest is None:
+                self.report({'ERROR'}, f"No render manifest in: {request.resume_directory}")
+                return {'CANCELLED'}
+            if settings.sparse_keyframes > 1:
+                self.report({'ERROR'}, "Sparse keyframe renders can't be resumed.")
+                return {'CANCELLED'}
+            selected_object_names = manifest.objects
+        else:
+            selected_object_names = request.object_names
+
+        if not selected_object_names:
+            self.report({'WARNING'}, "No objects selected.")
+            return {'CANCELLED'}
+
+        if settings.sparse_keyframes > 1 and settings.parallel_render:
+            self.report({'ERROR'}, "Sparse keyframes render in this Blender, turn off parallel rendering.")
+            return {'CANCELLED'}
+        if settings.transparent_background and settings.file_format != 'PNG':
+            self.report({'ERROR'}, "Transparent renders need PNG frames.")
+            return {'CANCELLED'}
+        try:
+            backdrops = parse_backdrops(settings.backdrops) if settings.transparent_background else []
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        # a preview that was never cleaned up is put back first, so its state isn't taken for the user's
+        restore_preview_backup(context)
+
+        selected_objects = []
+        for name in selected_object_names:
+            if name in bpy.data.objects:
+                selected_objects.append(bpy.data.objects[name])
+
+        if not selected_objects:
+             self.report({'ERROR'}, "Selection lost during cleanup.")
+             return {'CANCELLED'}
+
+        if settings.batch_mode != 'NONE' and not settings.auto_frame_camera:
+            # the items differ in size, each gets the camera fitted to it, resumed ones included
+            settings = copy.copy(settings)
+            settings.auto_frame_camera = True
+
+        # a resumed batch item or variant carries on as a single render
+        batch = settings.batch_mode != 'NONE' and manifest is None
+        if manifest is not None:
+            # a batch item resumes on its own, centred the way it was rendered
+            batch_item = manifest.data.get('batch_item')
+            variant = manifest.data.get('variant')
+            item = BatchItem(batch_item or "", selected_objects, centered=batch_item is not None)
+            steps = [RenderStep(item, variant or "", settings if variant is None else resumed_variant(settings, manifest))]
+        else:
+            if batch:
+                items = self.batch_items(scene, settings, selected_objects)
+            else:
+                items = [BatchItem("", selected_objects)]
+            try:
+                variants = variant_settings(settings)
+            except RuntimeError as e:
+                self.report({'ERROR'}, str(e))
+                return {'CANCELLED'}
+            steps = [RenderStep(item, name, variant) for item in items for name, variant in variants]
+            if settings.progressive:
+                # a quick draft of every item first, the full renders after them
+                for step in steps:
+                    step.settings = final_settings(step.settings)
+                drafts = [RenderStep(item, "", draft_settings(variants[0][1]), draft=True) for item in items]
+                steps = drafts + steps
+
+        render_camera = scene.camera
+        if settings.auto_frame_camera:
+            render_camera = None
+        elif not settings.use_active_camera and settings.camera_object:
+            render_camera = settings.camera_object
+        fingerprints = {}
+        scene_state = scene_fingerprint(scene)
+        for step in steps:
+            if step.item not in fingerprints:
+                fingerprints[step.item] = selection_fingerprints(step.item.objects)
+            step.job_hash = compute_job_hash(step.settings, step.item.objects, render_camera, fingerprints[step.item],
+                                             scene_state)
+
+        if manifest is not None:
+            if len(selected_objects) != len(selected_object_names):
+                self.report({'ERROR'}, "Objects from the interrupted render are missing.")
+                return {'CANCELLED'}
+            if manifest.job_hash != steps[0].job_hash:
+                self.report({'ERROR'}, "Settings or scene changed since the interrupted render, can't resume.")
+                return {'CANCELLED'}
+
+        if manifest is None and settings.auto_save_path and settings.use_render_cache:
+            catalog = RenderCatalog.load(get_preview_renders_dir())
+            cached = [step for step in steps if catalog.lookup(step.job_hash) is not None]
+            for step in cached:
+                if backdrops:
+                    # the frames are already there, only the backdrops need putting in
+                    directory = catalog.lookup(step.job_hash)['directory']
+                    composite_backdrops(rendered_frames(directory), backdrops, os.path.join(directory, "backdrops"))
+            if cached and len(steps) == 1:
+                self.report({'INFO'}, f"Identical render already exists: {catalog.lookup(steps[0].job_hash)['directory']}")
+                return {'FINISHED'}
+            if cached:
+                for step in cached:
+                    # still a source for the comparison video
+                    step.output_dir = catalog.lookup(step.job_hash)['directory']
+                steps = [step for step in steps if step not in cached]
+                # a draft is only worth it while its item still has a full render to come
+                steps = [step for step in steps
+                         if not step.draft or any(other.item is step.item and not other.draft for other in steps)]
+                self.report({'INFO'}, f"Skipping {len(cached)} already rendered: {', '.join(s.label() for s in cached)}")
+                if not steps:
+                    return {'FINISHED'}
+
+        # the last variant of each item to render encodes its comparison video
+        if settings.variant_comparison:
+            for step in {step.item: step for step in steps}.values():
+                step.compare = len(step.item.steps) > 1
+        items = list(dict.fromkeys(step.item for step in steps))
+        multi = len(steps) > 1
+        # setup decisions that don't depend on the variant are taken from the first one, drafts
+        # can do without the world and lights, the full render can't
+        setup_settings = next((step.settings for step in steps if not step.draft), steps[0].settings)
+
+        # batches always go through the preview scene, each item is swapped into its instance,
+        # and so do draft proxies, the objects they stand in for are left where they are,
+        # and sparse keyframes, which switch on the depth pass
+        use_preview_scene = (settings.use_preview_scene or settings.batch_mode != 'NONE' or settings.draft_geometry
+                             or settings.sparse_keyframes > 1)
+        scene_backup = None if use_preview_scene else SceneStateBackup(scene)
+
+        orig_parents = {}
+        orig_display_types = {}
+
+        for obj in selected_objects:
+            orig_parents[obj.name] = obj.parent
+            orig_display_types[obj.name] = obj.display_type
+
+        for item in items:
+            item.measure(settings)
+
+        original_visibility = {}
+        # queued renders may start while another scene is shown
+        view_layer = context.view_layer if context.scene == scene else scene.view_layers[0]
+
+        try:
+            if manifest is None and settings.auto_save_path and not bpy.data.is_saved:
+                self.report({'WARNING'}, "File not saved. Saving to temporary directory.")
+
+            orbit_camera = settings.turntable_mode == 'CAMERA'
+
+            if use_preview_scene:
+                render_scene = self.build_preview_scene(scene, setup_settings)
+            else:
+                render_scene = scene
+
+            empty = track_created_id(settings, bpy.data.objects.new("Preview_Empty", None))
+            empty.location = (0, 0, 0)
+
+            collection_name = "Preview_Collection"
+            preview_collection = track_created_id(settings, bpy.data.collections.new(collection_name))
+            render_scene.collection.children.link(preview_collection)
+
+            preview_collection.objects.link(empty)
+
+            if settings.draft_geometry:
+                self.setup_draft_geometry(settings, items)
+
+            job = RenderJob(scene, settings, steps, batch=batch)
+            job.scene = render_scene
+            job.pivot = empty
+            job.progressive = settings.progressive and manifest is None and not bpy.app.background
+            # what the panel said, edits are spotted against it
+            job.snapshot = settings_snapshot(request.settings)
+            job.render_camera = render_camera
+            job.scene_state = scene_state
+            if not use_preview_scene:
+                # the preview scene leaves the user's alone, so there is only something to put back here
+                job.view_layer = view_layer
+                job.scene_backup = scene_backup
+                job.parents = orig_parents
+                job.display_types = orig_display_types
+                job.visibility = original_visibility
+
+            if use_preview_scene:
+                # the turntable shows an instance of the selection, the objects themselves are left as they are
+                job.asset_collection = track_created_id(settings, bpy.data.collections.new("Preview_Assets"))
+                instancer = empty
+                if orbit_camera:
+                    # the empty carries the orbiting camera, the instance needs one that stays put
+                    instancer = track_created_id(settings, bpy.data.objects.new("Preview_Instance", None))
+                    preview_collection.objects.link(instancer)
+                instancer.instance_type = 'COLLECTION'
+                instancer.instance_collection = job.asset_collection
+            else:
+                for obj in selected_objects:
+                    if not orbit_camera:
+                        obj.parent = empty
+                    # the collection is new, so no name lookup (a list walk per object) is needed
+                    preview_collection.objects.link(obj)
+
+                for layer_col in view_layer.layer_collection.children:
+                    original_visibility[layer_col.name] = layer_col.exclude
+                    if layer_col.collection == preview_collection:
+                        layer_col.exclude = False
+                    else:
+                        layer_col.exclude = True
+
+            # orbiting the camera the other way gives the same shot as spinning the objects
+            turntable_degrees = -settings.rotation_degrees if orbit_camera else settings.rotation_degrees
+
+            empty.rotation_euler = (0, 0, 0)
+            empty.keyframe_insert(data_path="rotation_euler", frame=1)
+            empty.rotation_euler = (0, 0, math.radians(turntable_degrees))
+            empty.keyframe_insert(data_path="rotation_euler", frame=rotation_end_frame(settings))
+
+            if empty.animation_data and empty.animation_data.action:
+                track_created_id(settings, empty.animation_data.action)
+                self.set_linear_interpolation(empty.animation_data.action)
+
+            render = render_scene.render
+            render.engine = settings.render_engine
+            render.resolution_percentage = int(settings.resolution_percentage)
+            if settings.custom_resolution:
+                render.resolution_x = settings.resolution_x
+                render.resolution_y = settings.resolution_y
+            render_scene.frame_start = 1
+            if settings.transparent_background:
+                render.film_transparent = True
+                if settings.shadow_catcher and settings.render_engine == 'CYCLES':
+                    job.shadow_catcher = self.setup_shadow_catcher(settings, preview_collection)
+
+            if settings.auto_frame_camera:
+                job.framed_camera = self.setup_auto_frame_camera(render_scene, settings, preview_collection)
+            elif not settings.use_active_camera and settings.camera_object:
+                render_scene.camera = settings.camera_object
+            # with the camera still unrotated, an orbit shows the same sweep as spinning objects
+            job.border_camera = render_scene.camera
+
+            if orbit_camera:
+                job.orbit_camera = self.setup_orbit_camera(render_scene, settings, empty, preview_collection)
+            elif use_preview_scene and render_scene.camera and render_scene.camera.name not in render_scene.objects:
+                preview_collection.objects.link(render_scene.camera)
+
+            if settings.override_material and any(step.settings.material_override for step in steps):
+                # the view layer override leaves every material slot alone, SceneStateBackup puts it back,
+                # each step sets it or puts the layer's own back
+                job.override_layers = [(layer, layer.material_override) for layer in render_scene.view_layers]
+
+            if settings.wireframe_toggle:
+                if use_preview_scene:
+                    render_scene.display.shading.type = 'WIREFRAME'
+                else:
+                    for obj in selected_objects:
+                        obj.display_type = 'WIRE'
+
+            eevee_ids = {'BLENDER_EEVEE', 'BLENDER_EEVEE_NEXT'}
+            if settings.render_engine in eevee_ids or settings.render_engine == 'CYCLES':
+                self.setup_hdri_world(render_scene, setup_settings)
+                self.animate_hdri_rotation(render_scene, settings)
+                hdri_files = {step.settings.hdri_file for step in steps}
+                if len(hdri_files) > 1:
+                    # every HDRI is loaded up front, a step only swaps the image
+                    for hdri_file in hdri_files:
+                        job.hdri_images[hdri_file] = self.load_hdri_image(setup_settings, hdri_file)
+
+                if settings.render_engine in eevee_ids and hasattr(render_scene, 'eevee'):
+                     if hasattr(render_scene.eevee, 'use_gtao'):
+                        render_scene.eevee.use_gtao = True
+
+            if settings.render_engine != 'BLENDER_WORKBENCH':
+                # every rig is built once, each step hides the ones it doesn't use
+                presets = list(dict.fromkeys(step.settings.lighting_preset for step in steps))
+                job.light_rigs = self.apply_lighting_preset(settings, presets, preview_collection, selected_objects)
+
+            if orbit_camera:
+                # lights stay put relative to the objects when they spin, so they orbit with the camera here
+                for obj in preview_collection.objects:
+                    if obj.type == 'LIGHT' and obj not in selected_objects:
+                        obj.parent = empty
+                if settings.render_engine == 'CYCLES':
+                    # nothing but the camera moves, so Cycles can keep its BVH between frames
+                    render.use_persistent_data = True
+
+            job.quality = {path: resolve_path(render_scene, path) for path in BUDGET_SETTINGS}
+            ACTIVE_JOB = job
+            # renders started from the UI return straight away, the job stays busy until they finish
+            job.running = not bpy.app.background
+            if not multi:
+                self.start_item(job, manifest, setup_started)
+                started = True
+            else:
+                started = self.start_next_step(job, setup_started)
+            if bpy.app.background and not settings.parallel_render:
+                # renders block in the background, so the rest of the job, fallbacks of sparse renders
+                # included, just runs through here
+                while job.has_next():
+                    self.start_next_step(job)
+            elif not started:
+                schedule_next_render()
+
+        except Exception as e:
+            self.report({'ERROR'}, f"Render setup failed: {e}")
+            import traceback
+            traceback.print_exc()
+            ACTIVE_JOB = None
+            self.cleanup_and_restore(context, scene_backup, orig_parents,
+                                   orig_display_types, selected_objects, original_visibility)
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+    def continue_batch(self):
+        if not render_busy() or not ACTIVE_JOB.has_next():
+            return {'CANCELLED'}
+        if not self.start_next_step(ACTIVE_JOB):
+            # nothing is rendering, so nothing will finish and pick up the next one
+            schedule_next_render()
+        return {'FINISHED'}
+
+    def start_next_step(self, job, setup_started=None):
+        try:
+            self.start_item(job, setup_started=setup_started)
+        except Exception as e:
+            # one broken asset or variant shouldn't stop the rest of the job
+            step = job.steps[job.index]
+            step.output_dir = None
+            job.failed.append(step.label())
+            job.errors.append(f"{step.label()}: {e}" if step.label() else str(e))
+            self.report({'ERROR'}, f"{step.label()} failed: {e}")
+            traceback.print_exc()
+            return False
+        return True
+
+    def batch_items(self, scene, settings, selected_objects):
+        groups = {}
+        if settings.batch_mode == 'COLLECTION':
+            # one pass over the top level collections instead of users_collection per object
+            owners = {}
+            for collection in scene.collection.children:
+                for obj in collection.all_objects:
+                    owners.setdefault(obj, collection)
+            for obj in selected_objects:
+                groups.setdefault(owners.get(obj, obj), []).append(obj)
+        else:
+            # selected children go with their topmost selected parent
+            selected = set(selected_objects)
+            for obj in selected_objects:
+                root = obj
+                parent = obj.parent
+                while parent is not None:
+                    if parent in selected:
+                        root = parent
+                    parent = parent.parent
+                groups.setdefault(root, []).append(obj)
+        return [BatchItem(owner.name, objects, centered=True) for owner, objects in groups.items()]
+
+    def start_item(self, job, manifest=None, setup_started=None):
+        global ACTIVE_MANIFEST, ACTIVE_STATS, ACTIVE_STREAM
+        setup_started = setup_started or time.perf_counter()
+        step = job.next_step()
+        if isinstance(step, FallbackStep):
+            return self.start_fallback(job, step)
+        item = step.item
+        settings = step.settings
+        render_scene = job.scene
+        render = render_scene.render
+        job.restarting = False
+
+        if manifest is not None:
+            output_dir = manifest.directory
+            render_filepath = manifest.data['render_filepath']
+        elif settings.auto_save_path:
+            preview_dir = get_preview_renders_dir()
+            if not os.path.exists(preview_dir):
+                os.makedirs(preview_dir)
+
+            catalog = RenderCatalog.load(preview_dir)
+            new_version = catalog.next_version()
+            new_folder_name = f"render_{new_version:03d}"
+            output_dir = os.path.join(preview_dir, new_folder_name)
+            os.makedirs(output_dir, exist_ok=True)
+            catalog.add(step.job_hash, output_dir, new_version, settings, item.objects)
+
+            if settings.file_format == 'FFMPEG':
+                render_filepath = os.path.join(output_dir, "preview.mp4")
+            else:
+                render_filepath = os.path.join(output_dir, "frame_")
+        else:
+            output_dir = bpy.path.abspath(settings.output_path)
+            if job.batch:
+                output_dir = os.path.join(output_dir, bpy.path.clean_name(item.name))
+            if step.variant:
+                output_dir = os.path.join(output_dir, bpy.path.clean_name(step.variant))
+            if step.draft:
+                output_dir = os.path.join(output_dir, "draft")
+            if not os.path.isdir(output_dir):
+                os.makedirs(output_dir)
+            render_filepath = os.path.join(output_dir, "")
+        render.filepath = render_filepath
+        step.output_dir = output_dir
+
+        job.show_item(item)
+        self.apply_variant(job, settings)
+        pivot = np.array(job.pivot.location, dtype=float)
+        # drafts and restarted full renders switch engine and resolution on the prepared scene
+        render.engine = settings.render_engine
+        render.resolution_percentage = int(settings.resolution_percentage)
+        if settings.custom_resolution:
+            render.resolution_x = settings.resolution_x
+            render.resolution_y = settings.resolution_y
+        render_scene.frame_step = settings.progressive_frame_step if step.draft else 1
+
+        if settings.auto_frame_camera:
+            if item.frame_spheres is None or not len(item.frame_spheres):
+                raise RuntimeError("Nothing in the selection to frame")
+            matrix = fit_turntable_camera(render_scene, settings, job.framed_camera.data, item.frame_spheres, pivot)
+            job.framed_camera.matrix_world = matrix
+            if job.orbit_camera is not None:
+                job.orbit_camera.matrix_world = matrix
+
+        if job.shadow_catcher is not None:
+            floor, size = item.ground
+            job.shadow_catcher.location = (float(pivot[0]), float(pivot[1]), floor)
+            job.shadow_catcher.scale = (size, size, 1.0)
+
+        if settings.auto_border:
+            if not apply_turntable_border(render_scene, settings, job.border_camera, item.border_corners, pivot):
+                render.use_border = False
+                self.report({'WARNING'}, "Couldn't bound the turntable on screen, rendering the full frame.")
+
+        quality = job.quality
+        if step.draft:
+            quality = budget_rungs(settings.render_engine)[0][1]
+        elif settings.time_budget > 0:
+            if job.budget is None:
+                job.budget = self.plan_time_budget(job, render_scene, settings, item, setup_started)
+            render.resolution_percentage = job.budget['resolution_percentage']
+            quality = job.budget['values']
+        for path, value in quality.items():
+            if value is not None:
+                set_path(render_scene, path, value)
+
+        # the last item may have shortened the range to its repeat period or switched to PNG for encoding
+        render_scene.frame_end = settings.frame_count
+        if settings.file_format == 'FFMPEG':
+            if hasattr(render.image_settings, 'media_type'):
+                render.image_settings.media_type = 'VIDEO'
+            try:
+                render.image_settings.file_format = 'FFMPEG'
+            except (TypeError, ValueError):
+                pass
+            render.ffmpeg.format = 'MPEG4'
+        else:
+            if hasattr(render.image_settings, 'media_type'):
+                render.image_settings.media_type = 'IMAGE'
+            render.image_settings.file_format = settings.file_format
+            if settings.transparent_background:
+                render.image_settings.color_mode = 'RGBA'
+
+        post_render_tasks = self.plan_frame_output(render_scene, settings, item.objects, output_dir)
+        extra = {}
+        if item.centered:
+            extra['batch_item'] = item.name
+        if step.variant:
+            extra['variant'] = step.variant
+        manifest = self.track_frames(render_scene, settings, item.objects, manifest, step.job_hash,
+                                     output_dir, render_filepath, extra=extra)
+        stream = self.start_frame_stream(render_scene, settings, output_dir, manifest)
+        if stream is not None:
+            post_render_tasks.append(self.stream_task(stream))
+        if settings.transparent_background and settings.backdrops.strip():
+            frame_start = render_scene.frame_start
+            frame_paths = [render.frame_path(frame=f) for f in range(frame_start, frame_start + settings.frame_count)]
+            post_render_tasks.append(self.backdrop_task(settings, frame_paths, output_dir))
+        if step.draft:
+            post_render_tasks.append(self.draft_task(job, render_scene, settings, output_dir))
+        post_render_tasks.append(self.finish_manifest_task(manifest))
+        if settings.auto_save_path:
+            post_render_tasks.append(self.catalog_task(settings, step.job_hash))
+        if step.compare:
+            # the item's own folder, auto saved variants each have a folder of their own so it goes with the last
+            compare_dir = output_dir if settings.auto_save_path else os.path.dirname(output_dir)
+            fps = render.fps / render.fps_base
+            post_render_tasks.append(self.comparison_task(item, os.path.join(compare_dir, "comparison.mp4"), fps))
+
+        sparse = None
+        if settings.sparse_keyframes > 1:
+            # the frames above were planned for the output, from here on it's the keyframes
+            sparse = SparseRender(render_scene, settings, job.border_camera, job.pivot.location,
+                                  os.path.join(output_dir, "keys"))
+            sparse.stream = stream
+            sparse.use_keyframes()
+
+        stats = RenderStats(
+            output_dir, len(sparse.keys) if sparse else len(manifest.missing_frames()[::render_scene.frame_step]),
+            setup_seconds=time.perf_counter() - setup_started,
+            info=self.render_info(render_scene, settings, item.objects),
+        )
+        if job.budget is not None:
+            stats.info['time_budget'] = job.budget['info']
+        post_render_tasks.append(self.stats_task(stats))
+        ACTIVE_STATS = stats
+        if sparse is not None:
+            # the rest waits for the frames between the keyframes, the stream is fed once they're all in
+            sparse.tasks = post_render_tasks
+            post_render_tasks = [self.sparse_task(job, step, sparse, stats)]
+            stream = None
+
+        if settings.parallel_render:
+            self.start_parallel_render(render_scene, settings, output_dir, post_render_tasks, manifest, stats, stream)
+        else:
+            ACTIVE_MANIFEST = manifest
+            ACTIVE_STREAM = stream
+            POST_RENDER_TASKS[:] = post_render_tasks
+            if not bpy.app.background and not bpy.app.timers.is_registered(poll_render_stats):
+                bpy.app.timers.register(poll_render_stats, first_interval=1.0)
+            self.report({'INFO'}, f"Starting render to: {render_filepath}")
+            self.render_animation(render_scene)
+
+    def render_animation(self, render_scene):
+        if bpy.app.background:
+            bpy.ops.render.render(animation=True, scene=render_scene.name)
+        elif 'CANCELLED' in bpy.ops.render.render('INVOKE_DEFAULT', animation=True, scene=render_scene.name):
+            # no handler would ever report back and let the queue move on
+            POST_RENDER_TASKS.clear()
+            raise RuntimeError("Blender didn't start the render")
+
+    def start_fallback(self, job, step):
+        try:
+            path = step.sparse.use_fallback(step)
+            POST_RENDER_TASKS[:] = [self.fallback_task(step, path)]
+            self.report({'INFO'}, f"Rendering what frame {step.frame} couldn't be made from keyframes")
+            self.render_animation(job.scene)
+        except Exception:
+            # the frame keeps its guesses, and the last fallback still finishes the render
+            step.sparse.fallback_done(step)
+            raise
+
+    def apply_variant(self, job, settings):
+        for preset, lights in job.light_rigs.items():
+            for light in lights:
+                light.hide_render = preset != settings.lighting_preset
+
+        if settings.hdri_file in job.hdri_images:
+            image = job.hdri_images[settings.hdri_file]
+            env_tex = job.scene.world.node_tree.nodes.get(HDRI_ENVIRONMENT_NODE) if job.scene.world else None
+            if image is None or env_tex is None:
+                raise RuntimeError(f"Couldn't load HDRI {settings.hdri_file}")
+            env_tex.image = image
+
+        for layer, original in job.override_layers:
+            layer.material_override = settings.override_material if settings.material_override else original
+
+    def plan_time_budget(self, job, scene, settings, item, setup_started):
+        # times a few small frames with the scene as it will render, fits the cost of a frame and picks
+        # the best rung and resolution for what's left of the budget once they're done
+        global ACTIVE_STATS
+        render = scene.render
+        rungs = budget_rungs(settings.render_engine)
+        target = int(settings.resolution_percentage)
+        percentages = sorted({int(p) for p in ('100', '75', '50', '40', '30') if int(p) <= target} | {target},
+                             reverse=True)
+        area = 1.0
+        if render.use_border and not render.use_crop_to_border:
+            area = (render.border_max_x - render.border_min_x) * (render.border_max_y - render.border_min_y)
+
+        def pixels_at(percentage):
+            return render.resolution_x * render.resolution_y * (percentage / 100.0) ** 2 * area
+
+        small, large = max(5, target // 4), max(10, target // 2)
+        points = [(small, 0), (small, 2), (large, 0), (large, 2)]
+        frame_current = scene.frame_current
+        scene.frame_current = scene.frame_start + settings.frame_count // 2
+        # still renders fire the handlers too, nothing may take them for the job's frames
+        running = job.running
+        job.running = False
+        ACTIVE_STATS = None
+        calibration = []
+        try:
+            for index, (percentage, rung) in enumerate([(small, 0)] + points):
+                render.resolution_percentage = percentage
+                for path, value in rungs[rung][1].items():
+                    set_path(scene, path, value)
+                started = time.perf_counter()
+                bpy.ops.render.render(scene=scene.name)
+                # the first one compiles shaders and builds the BVH, it isn't timed
+                if index:
+                    calibration.append((pixels_at(percentage), rungs[rung][0], time.perf_counter() - started))
+        finally:
+            job.running = running
+            scene.frame_current = frame_current
+        coefficients = fit_render_cost(calibration)
+
+        frames = settings.frame_count
+        if settings.skip_repeated_frames:
+            frames = self.find_repeat_period(scene, settings, item.objects) or frames
+        if settings.sparse_keyframes > 1:
+            frames = -(-frames // settings.sparse_keyframes)
+        # every step left gets the same share
+        frames *= len(job.steps) - job.index
+        seconds = (settings.time_budget * 60.0 - (time.perf_counter() - setup_started)) * BUDGET_MARGIN
+        percentage, rung = choose_budget_rung(coefficients, rungs, pixels_at, percentages, frames, seconds)
+        samples, values = rungs[rung]
+        predicted = predict_render_cost(coefficients, pixels_at(percentage), samples)
+
+        info = {
+            'budget_seconds': settings.time_budget * 60.0,
+            'calibration': [{'pixels': int(p), 'samples': s, 'seconds': t} for p, s, t in calibration],
+            'model': {'seconds': coefficients[0], 'per_pixel': coefficients[1], 'per_pixel_sample': coefficients[2]},
+            'resolution_percentage': percentage,
+            'settings': values,
+            'predicted_frame_seconds': predicted,
+            'predicted_seconds': predicted * frames,
         }
-        
-        return {'FINISHED'}
+        if predicted * frames > seconds:
+            self.report({'WARNING'}, f"Even the lowest quality needs about {predicted * frames / 60:.0f} min, "
+                                     f"over the {settings.time_budget:g} min budget")
+        self.report({'INFO'}, f"Time budget: {samples} samples at {percentage}%, "
+                              f"about {predicted:.1f}s a frame, {predicted * frames / 60:.1f} min in all")
+        return {'resolution_percentage': percentage, 'values': values, 'info': info}
 
-    def cleanup_existing_preview_objects(self, context):
-        for obj in bpy.data.objects:
-            if obj.name.startswith("Preview_Empty"):
-                for child in obj.children:
-                    child.parent = None
-        
-        # TODO: maybe add confirmation dialog here?
-        for obj in list(bpy.data.objects):
-            if obj.name.startswith("Preview_Empty") or (obj.type == 'LIGHT' and obj.name.startswith("Preview_")):
-                 bpy.data.objects.remove(obj, do_unlink=True)
-
-        col = bpy.data.collections.get("Preview_Collection")
-        if col:
-            for obj in list(col.objects):
-                col.objects.unlink(obj)
-                if len(obj.users_collection) == 0:
-                    context.scene.collection.objects.link(obj)
-            
-            bpy.data.collections.remove(col)
+    def find_repeat_period(self, scene, settings, selected_objects):
+        if settings.frame_count < 2:
+            return None
+
+        # anything else animated would make otherwise identical frames differ
+        animated = list(selected_objects)
+        if scene.camera:
+            animated.append(scene.camera)
+        for obj in animated:
+            if obj.animation_data and obj.animation_data.action:
+                return None
+        if settings.render_engine == 'CYCLES' and getattr(scene.cycles, 'use_animated_seed', False):
+            return None
+
+        rotations = [settings.rotation_degrees]
+        if settings.render_engine != 'BLENDER_WORKBENCH':
+            rotations.append(settings.hdri_rotation_degrees)
+
+        period = turntable_period(rotation_end_frame(settings) - 1, rotations)
+        if period >= settings.frame_count:
+            return None
+        return period
+
+    def plan_frame_output(self, scene, settings, selected_objects, output_dir):
+        render = scene.render
+
+        period = None
+        if settings.skip_repeated_frames:
+            period = self.find_repeat_period(scene, settings, selected_objects)
+
+        # a comparison video needs each variant's as preview.mp4, sparse renders make their frames themselves
+        sparse = settings.sparse_keyframes > 1
+        encode_video = settings.file_format == 'FFMPEG' and (
+            settings.parallel_render or period or settings.variant_comparison or sparse)
+        if encode_video and not find_ffmpeg():
+            if settings.parallel_render or sparse:
+                raise RuntimeError("Parallel and sparse video output need ffmpeg on the PATH")
+            self.report({'WARNING'}, "ffmpeg not found, rendering every frame")
+            period = None
+            encode_video = False
+
+        frame_start = scene.frame_start
+        frame_sequence = list(range(frame_start, frame_start + settings.frame_count))
+        if period:
+            frame_sequence = [frame_start + (f - frame_start) % period for f in frame_sequence]
+            scene.frame_end = frame_start + period - 1
+            self.report({'INFO'}, f"Rotation repeats every {period} frames, rendering {period} of {settings.frame_count}")
+
+        if encode_video:
+            # frames are rendered as PNG and encoded once they are all on disk
+            frames_dir = os.path.join(output_dir, "frames")
+            os.makedirs(frames_dir, exist_ok=True)
+            if hasattr(render.image_settings, 'media_type'):
+                render.image_settings.media_type = 'IMAGE'
+            render.image_settings.file_format = 'PNG'
+            render.filepath = os.path.join(frames_dir, "frame_")
+
+            frame_paths = [render.frame_path(frame=f) for f in frame_sequence]
+            video_path = os.path.join(output_dir, "preview.mp4")
+            fps = render.fps / render.fps_base
+
+            def encode(cancelled):
+                if cancelled:
+                    return
+                encode_image_sequence(frame_paths, video_path, fps)
+                shutil.rmtree(frames_dir, ignore_errors=True)
+
+            return [encode]
+
+        if period:
+            frame_map = [
+                (render.frame_path(frame=src), render.frame_path(frame=dst))
+                for dst, src in enumerate(frame_sequence, frame_start)
+                if dst != src
+            ]
+
+            def fill_repeated(cancelled):
+                if not cancelled:
+                    link_repeated_frames(frame_map)
+
+            return [fill_repeated]
+
+        return []
+
+    def start_frame_stream(self, scene, settings, output_dir, manifest):
+        render = scene.render
+        if not settings.video_targets or settings.file_format == 'FFMPEG':
+            return None
+        ffmpeg = find_ffmpeg()
+        if not ffmpeg:
+            self.report({'WARNING'}, "ffmpeg not found, rendering frames without the streamed videos")
+            return None
+
+        # a repeat period shortened the range, the video loops over it for the full length
+        frame_start = scene.frame_start
+        span = scene.frame_end - frame_start + 1
+        sequence = [frame_start + index % span for index in range(settings.frame_count)]
+        frame_paths = [(frame, render.frame_path(frame=frame)) for frame in sequence]
+        outputs = [
+            (os.path.join(output_dir, VIDEO_TARGETS[target][0]), VIDEO_TARGETS[target][1])
+            for target in sorted(settings.video_targets)
+        ]
+        stream = FrameStream(frame_paths, outputs, render.fps / render.fps_base)
+        stream.start(ffmpeg)
+        # a resumed render skips the frames it already has, they go in first
+        for frame in manifest.data['completed']:
+            stream.frame_saved(frame)
+        return stream
+
+    def track_frames(self, scene, settings, selected_objects, manifest, job_hash, output_dir, render_filepath,
+                     extra=None):
+        render = scene.render
+
+        video = render.image_settings.file_format == 'FFMPEG'
+        if manifest is None:
+            return RenderManifest.create(
+                output_dir, job_hash, settings, selected_objects, render_filepath,
+                scene.frame_start, scene.frame_end, video=video, extra=extra,
+            )
+
+        if video:
+            raise RuntimeError("Video renders can't be resumed, render image frames instead")
+
+        frame_paths = {f: render.frame_path(frame=f) for f in range(scene.frame_start, scene.frame_end + 1)}
+        manifest.prune(frame_paths)
+        missing = manifest.missing_frames()
+        self.report({'INFO'}, f"Resuming: {len(missing)} of {len(frame_paths)} frames left")
+
+        # Blender skips frames whose files already exist
+        render.use_overwrite = False
+        return manifest
+
+    def stream_task(self, stream):
+        def finish_stream(cancelled):
+            global ACTIVE_STREAM
+            if ACTIVE_STREAM is stream:
+                ACTIVE_STREAM = None
+            if cancelled:
+                stream.abort()
+            else:
+                stream.finish()
+
+        return finish_stream
+
+    def sparse_task(self, job, step, sparse, stats):
+        def fill_frames(cancelled):
+            if cancelled:
+                sparse.cancel()
+                return
+            try:
+                fallbacks = sparse.fill()
+            except Exception:
+                sparse.cancel()
+                raise
+            # the report is written once the last of them is in
+            stats.info['sparse_fallback_frames'] = len(fallbacks)
+            if not fallbacks:
+                sparse.finish()
+                return
+            # rendered next, before any other step of the job
+            job.steps[job.index + 1:job.index + 1] = [FallbackStep(step, sparse, f, box) for f, box in fallbacks]
+
+        return fill_frames
+
+    def fallback_task(self, step, path):
+        def apply_fallback(cancelled):
+            if cancelled:
+                step.sparse.cancel()
+            else:
+                step.sparse.fallback_done(step, path)
+
+        return apply_fallback
+
+    def backdrop_task(self, settings, frame_paths, output_dir):
+        backdrops = parse_backdrops(settings.backdrops)
+
+        def composite(cancelled):
+            if not cancelled:
+                composite_backdrops(frame_paths, backdrops, os.path.join(output_dir, "backdrops"))
+
+        return composite
+
+    def draft_task(self, job, scene, settings, output_dir):
+        render = scene.render
+        frame_start = scene.frame_start
+        # every frame shows the drafted one before it, so the video runs the full length
+        frame_paths = [render.frame_path(frame=frame_start + (f - frame_start) // scene.frame_step * scene.frame_step)
+                       for f in range(frame_start, frame_start + settings.frame_count)]
+        video_path = os.path.join(output_dir, "draft.mp4")
+        fps = render.fps / render.fps_base
+
+        def draft_ready(cancelled):
+            if cancelled:
+                return
+            if find_ffmpeg():
+                encode_image_sequence(frame_paths, video_path, fps)
+            job.draft_dir = output_dir
+            tag_panel_redraw()
+
+        return draft_ready
+
+    def finish_manifest_task(self, manifest):
+        def finish_manifest(cancelled):
+            global ACTIVE_MANIFEST
+            if ACTIVE_MANIFEST is manifest:
+                ACTIVE_MANIFEST = None
+            if not cancelled:
+                manifest.finish()
+
+        return finish_manifest
+
+    def catalog_task(self, settings, job_hash):
+        preview_dir = get_preview_renders_dir()
+
+        def update_catalog(cancelled):
+            if cancelled:
+                return
+            RenderCatalog.load(preview_dir).mark_finished(job_hash)
+            evict_catalog(settings, keep={job_hash})
+
+        return update_catalog
+
+    def comparison_task(self, item, video_path, fps):
+        def encode_comparison(cancelled):
+            if cancelled:
+                return
+            directories = [step.output_dir for step in item.steps]
+            if None in directories:
+                raise RuntimeError(f"Not every variant of {item.name or 'the render'} finished, no comparison video")
+            encode_comparison_video([variant_source(d) for d in directories], video_path, fps)
+
+        return encode_comparison
+
+    def render_info(self, scene, settings, selected_objects):
+        render = scene.render
+        return {
+            'blender_version': bpy.app.version_string,
+            'engine': render.engine,
+            'resolution': [render.resolution_x, render.resolution_y],
+            'resolution_percentage': render.resolution_percentage,
+            'objects': len(selected_objects),
+            'turntable_mode': settings.turntable_mode,
+            'workers': settings.parallel_workers if settings.parallel_render else 1,
+        }
+
+    def stats_task(self, stats):
+        def write_report(cancelled):
+            stats.write(cancelled)
+
+        return write_report
+
+    def start_parallel_render(self, scene, settings, output_dir, post_render_tasks, manifest=None, stats=None,
+                              stream=None):
+        global PARALLEL_JOB
+
+        if PARALLEL_JOB is not None and PARALLEL_JOB.is_running():
+            raise RuntimeError("A parallel render is already running")
+
+        job_dir = tempfile.mkdtemp(prefix="turntable_job_")
+        blend_path = os.path.join(job_dir, "preview_scene.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True, check_existing=False)
+
+        workers = min(settings.parallel_workers, scene.frame_end - scene.frame_start + 1)
+        threads = settings.parallel_threads
+        if threads == 0:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+
+        def frame_saved(path):
+            if manifest is not None:
+                manifest.mark_saved_path(path)
+            if stream is not None:
+                stream.path_saved(path)
+
+        PARALLEL_JOB = ParallelRenderJob(
+            blend_path,
+            split_frame_range(scene.frame_start, scene.frame_end, workers),
+            threads,
+            post_render_tasks,
+            on_frame_saved=frame_saved,
+            scene_name=scene.name,
+            stats=stats,
+        )
+        PARALLEL_JOB.start()
+        bpy.app.timers.register(poll_parallel_render, first_interval=0.5)
+
+        self.report({'INFO'}, f"Rendering with {workers} workers to: {output_dir}")
+
+    def build_preview_scene(self, source_scene, settings):
+        preview_scene = track_created_id(settings, bpy.data.scenes.new(PREVIEW_SCENE_NAME))
+        for path in PREVIEW_SCENE_SETTINGS:
+            source = resolve_path(source_scene, path)
+            target = resolve_path(preview_scene, path)
+            if source is not None and target is not None:
+                copy_rna_properties(source, target)
+
+        preview_scene.camera = source_scene.camera
+        if settings.render_engine != 'BLENDER_WORKBENCH' and settings.hdri_file not in ("", 'NONE'):
+            # the HDRI setup rebuilds the world nodes, so it gets a world of its own
+            preview_scene.world = track_created_id(settings, bpy.data.worlds.new("Preview_World"))
+        elif settings.render_engine != 'BLENDER_WORKBENCH' and source_scene.world is not None:
+            # the HDRI rotation gets keyed into the world's mapping node, so the user's world is left alone
+            world = track_created_id(settings, source_scene.world.copy())
+            anim_data = world.node_tree.animation_data if world.node_tree else None
+            if anim_data is not None and anim_data.action is not None:
+                # the copy still shares the action, the keys would land in the user's
+                anim_data.action = track_created_id(settings, anim_data.action.copy())
+            preview_scene.world = world
+        else:
+            preview_scene.world = source_scene.world
+        return preview_scene
+
+    def setup_draft_geometry(self, settings, items):
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        meshes = list(dict.fromkeys(obj for item in items for obj in item.objects if obj.type == 'MESH'))
+        triangles = {}
+        for obj in meshes:
+            mesh = obj.evaluated_get(depsgraph).data
+            triangles[obj] = len(mesh.loops) - 2 * len(mesh.polygons)
+        total = sum(triangles.values())
+        if settings.draft_mode == 'BUDGET':
+            ratio = min(1.0, settings.draft_triangle_budget / max(1, total))
+        else:
+            ratio = settings.draft_ratio
+        if ratio >= 1.0:
+            return
+
+        proxies = {}
+        for obj in meshes:
+            if triangles[obj] < DRAFT_MIN_TRIANGLES:
+                continue
+            mesh = track_created_id(settings, draft_mesh(obj, depsgraph, ratio))
+            for slot in obj.material_slots:
+                mesh.materials.append(slot.material)
+            proxy = track_created_id(settings, bpy.data.objects.new(f"Preview_Draft_{obj.name}", mesh))
+            proxy.matrix_world = obj.matrix_world.copy()
+            proxies[obj] = proxy
+
+        for item in items:
+            item.render_objects = [proxies.get(obj, obj) for obj in item.objects]
+        self.report({'INFO'}, f"Draft geometry: {len(proxies)} meshes at {ratio:.1%} of {total} triangles")
+
+    def setup_auto_frame_camera(self, scene, settings, preview_collection):
+        # placed for every item by fit_turntable_camera
+        camera_data = track_created_id(settings, bpy.data.cameras.new("Preview_Framed_Camera"))
+        camera = track_created_id(settings, bpy.data.objects.new("Preview_Framed_Camera", camera_data))
+        preview_collection.objects.link(camera)
+        camera_data.lens = settings.auto_frame_lens
+
+        scene.camera = camera
+        return camera
+
+    def setup_shadow_catcher(self, settings, preview_collection):
+        # a unit plane, start_item puts it under each item
+        mesh = track_created_id(settings, bpy.data.meshes.new("Preview_Shadow_Catcher"))
+        mesh.from_pydata([(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0)], [], [(0, 1, 2, 3)])
+        ground = track_created_id(settings, bpy.data.objects.new("Preview_Shadow_Catcher", mesh))
+        ground.is_shadow_catcher = True
+        preview_collection.objects.link(ground)
+        return ground
+
+    def setup_orbit_camera(self, scene, settings, pivot, preview_collection):
+        if scene.camera is None:
+            raise RuntimeError("Orbit camera mode needs a scene camera")
+
+        # a copy keeps the user's camera and its animation untouched
+        orbit_camera = scene.camera.copy()
+        orbit_camera.name = "Preview_Camera"
+        track_created_id(settings, orbit_camera)
+        orbit_camera.animation_data_clear()
+        preview_collection.objects.link(orbit_camera)
+
+        orbit_camera.parent = None
+        orbit_camera.matrix_world = scene.camera.matrix_world.copy()
+        orbit_camera.parent = pivot
+        orbit_camera.matrix_parent_inverse = pivot.matrix_world.inverted()
+
+        scene.camera = orbit_camera
+        return orbit_camera
 
     def set_linear_interpolation(self, action):
         if not action:
@@ -526,7 +4498,7 @@ class PREVIEWRENDER_OT_start(bpy.types.Operator):
                         if hasattr(strip, "fcurves"):
                             process_fcurves(strip.fcurves)
 
-    def setup_hdri_world(self, context, settings):
+    def setup_hdri_world(self, scene, settings):
         hdri_path = settings.hdri_file
 
         if not hdri_path or hdri_path == 'NONE':
@@ -536,29 +4508,36 @@ class PREVIEWRENDER_OT_start(bpy.types.Operator):
             self.report({'ERROR'}, f"HDRI file not found: {hdri_path}")
             return
 
-        world = context.scene.world
+        world = scene.world
         if not world:
-            world = bpy.data.worlds.new("World")
-            context.scene.world = world
+            world = track_created_id(settings, bpy.data.worlds.new("World"))
+            scene.world = world
 
         if not world.use_nodes:
             world.use_nodes = True
 
+        image = self.load_hdri_image(settings, hdri_path)
+        if image is None:
+            return
+
         nodes = world.node_tree.nodes
+        env_tex = nodes.get(HDRI_ENVIRONMENT_NODE)
+        if env_tex is not None and nodes.get(HDRI_MAPPING_NODE) is not None:
+            # set up by an earlier run, only the image needs swapping
+            env_tex.image = image
+            return
+
         links = world.node_tree.links
         nodes.clear()
 
         tex_coord = nodes.new('ShaderNodeTexCoord')
         mapping = nodes.new('ShaderNodeMapping')
+        mapping.name = HDRI_MAPPING_NODE
         env_tex = nodes.new('ShaderNodeTexEnvironment')
+        env_tex.name = HDRI_ENVIRONMENT_NODE
         background = nodes.new('ShaderNodeBackground')
         output = nodes.new('ShaderNodeOutputWorld')
-
-        try:
-            env_tex.image = bpy.data.images.load(hdri_path, check_existing=True)
-        except Exception as e:
-            self.report({'ERROR'}, f"Failed to load HDRI: {e}")
-            return
+        env_tex.image = image
 
         # connect everything up
         links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
@@ -566,40 +4545,72 @@ class PREVIEWRENDER_OT_start(bpy.types.Operator):
         links.new(env_tex.outputs['Color'], background.inputs['Color'])
         links.new(background.outputs['Background'], output.inputs['Surface'])
 
-    def animate_hdri_rotation(self, context, settings):
-        world = context.scene.world
+    def load_hdri_image(self, settings, hdri_path):
+        if settings.hdri_proxy_resolution != 'FULL':
+            try:
+                hdri_path = get_hdri_proxy(hdri_path, int(settings.hdri_proxy_resolution))
+            except Exception as e:
+                self.report({'WARNING'}, f"Couldn't make a smaller copy of the HDRI, using the original: {e}")
+
+        try:
+            return bpy.data.images.load(hdri_path, check_existing=True)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to load HDRI: {e}")
+            return None
+
+    def animate_hdri_rotation(self, scene, settings):
+        world = scene.world
         if not world or not world.node_tree:
             return
 
         nodes = world.node_tree.nodes
-        mapping_node = None
-        for node in nodes:
-            if node.type == 'MAPPING':
-                mapping_node = node
-                break
+        mapping_node = nodes.get(HDRI_MAPPING_NODE)
+        if mapping_node is None:
+            for node in nodes:
+                if node.type == 'MAPPING':
+                    mapping_node = node
+                    break
 
         if mapping_node:
+            anim_data = world.node_tree.animation_data
+            had_action = anim_data is not None and anim_data.action is not None
+
             rotation_input = mapping_node.inputs['Rotation']
             rotation_input.default_value[2] = 0
             rotation_input.keyframe_insert(data_path="default_value", index=2, frame=1)
-            rotation_input.default_value[2] = math.radians(settings.hdri_rotation_degrees)
-            rotation_input.keyframe_insert(data_path="default_value", index=2, frame=settings.frame_count)
+            hdri_degrees = settings.hdri_rotation_degrees
+            if settings.turntable_mode == 'CAMERA':
+                # keep the HDRI where it would be relative to the camera if the objects were spinning,
+                # the mapping turns what's seen the other way, so it follows the camera's turn with its own
+                hdri_degrees += settings.rotation_degrees
+            rotation_input.default_value[2] = math.radians(hdri_degrees)
+            rotation_input.keyframe_insert(data_path="default_value", index=2, frame=rotation_end_frame(settings))
             
             # linear interp looks better
             if world.node_tree.animation_data and world.node_tree.animation_data.action:
+                 if not had_action:
+                     track_created_id(settings, world.node_tree.animation_data.action)
                  self.set_linear_interpolation(world.node_tree.animation_data.action)
 
-    def apply_lighting_preset(self, context, preset, preview_collection, selected_objects):
-        if preset == 'NONE':
-            return
+    def apply_lighting_preset(self, settings, presets, preview_collection, selected_objects):
+        rigs = {}
+        if all(preset == 'NONE' for preset in presets):
+            return rigs
             
         for obj in list(preview_collection.objects):
             if obj.type == 'LIGHT' and obj not in selected_objects:
                 bpy.data.objects.remove(obj, do_unlink=True)
 
+        for preset in presets:
+            rigs[preset] = self.add_light_rig(settings, preset, preview_collection)
+        return rigs
+
+    def add_light_rig(self, settings, preset, preview_collection):
         if preset == 'STUDIO':
             key_light_data = bpy.data.lights.new(name="Preview_Key_Light", type='AREA')
             key_light = bpy.data.objects.new(name="Preview_Key_Light", object_data=key_light_data)
+            track_created_id(settings, key_light_data)
+            track_created_id(settings, key_light)
             preview_collection.objects.link(key_light)
             key_light.location = (5, -5, 5)
             key_light.rotation_euler = (math.radians(45), 0, math.radians(45))
@@ -607,21 +4618,29 @@ class PREVIEWRENDER_OT_start(bpy.types.Operator):
 
             fill_light_data = bpy.data.lights.new(name='Preview_Fill_Light', type='AREA')
             fill_light = bpy.data.objects.new(name='Preview_Fill_Light', object_data=fill_light_data)
+            track_created_id(settings, fill_light_data)
+            track_created_id(settings, fill_light)
             preview_collection.objects.link(fill_light)
             fill_light.location = (-5, -5, 5)
             fill_light.rotation_euler = (math.radians(45), 0, math.radians(-45))
             fill_light_data.energy = 500
+            return [key_light, fill_light]
 
         elif preset == 'SUNSET':
             sun_light_data = bpy.data.lights.new(name="Preview_Sun_Light", type='SUN')
             sun_light = bpy.data.objects.new(name="Preview_Sun_Light", object_data=sun_light_data)
+            track_created_id(settings, sun_light_data)
+            track_created_id(settings, sun_light)
             preview_collection.objects.link(sun_light)
             sun_light.rotation_euler = (math.radians(120), 0, math.radians(45))
             sun_light_data.energy = 5
             sun_light_data.color = (1.0, 0.5, 0.0)
+            return [sun_light]
+
+        return []
 
     def cleanup_and_restore(self, context, scene_backup, orig_parents, 
-                           orig_materials, orig_display_types, selected_objects, original_visibility):
+                           orig_display_types, selected_objects, original_visibility):
         if scene_backup:
             scene_backup.restore()
         
@@ -639,15 +4658,26 @@ class PREVIEWRENDER_OT_start(bpy.types.Operator):
                 except ReferenceError:
                     pass
                 
-        for obj in valid_objects:
-            if obj.type == 'MESH' and obj.name in orig_materials:
-                for slot, mat in zip(obj.material_slots, orig_materials[obj.name]):
-                    slot.material = mat
-                    
         for obj in valid_objects:
             if obj.name in orig_display_types:
                 obj.display_type = orig_display_types[obj.name]
 
+        remove_created_ids(context.scene)
+
+
+def restore_preview_backup(context):
+    global ACTIVE_JOB
+
+    if ACTIVE_JOB is not None:
+        # the rest of a batch can't run once its preview scene is gone
+        ACTIVE_JOB.cancelled = True
+        ACTIVE_JOB.running = False
+        ACTIVE_JOB.restore()
+        ACTIVE_JOB = None
+
+    # IDs tracked in the file outlive the session that made them
+    remove_created_ids(context.scene)
+
 
 class PREVIEWRENDER_OT_cleanup(bpy.types.Operator):
     bl_idname = "preview_render.cleanup"
@@ -655,65 +4685,168 @@ class PREVIEWRENDER_OT_cleanup(bpy.types.Operator):
     bl_description = "Remove preview objects and restore original scene state"
 
     def execute(self, context):
-        global PREVIEW_BACKUP
-        
-        orig_parents = PREVIEW_BACKUP.get('parents', {})
-        orig_materials = PREVIEW_BACKUP.get('materials', {})
-        orig_display_types = PREVIEW_BACKUP.get('display_types', {})
-        original_visibility = PREVIEW_BACKUP.get('visibility', {})
-        scene_backup = PREVIEW_BACKUP.get('scene_backup', None)
-        
-        if scene_backup:
-            scene_backup.restore()
+        restore_preview_backup(context)
+        self.report({'INFO'}, "Preview objects cleaned up successfully")
+        return {'FINISHED'}
 
-        view_layer = context.view_layer
-        for layer_col in view_layer.layer_collection.children:
-            if layer_col.name in original_visibility:
-                layer_col.exclude = original_visibility[layer_col.name]
 
-        for obj_name, parent in orig_parents.items():
-            if obj_name in bpy.data.objects:
-                obj = bpy.data.objects[obj_name]
-                try:
-                    obj.parent = parent
-                except ReferenceError:
-                    pass
-        
-        for obj_name, materials in orig_materials.items():
-            if obj_name in bpy.data.objects:
-                obj = bpy.data.objects[obj_name]
-                if obj.type == 'MESH':
-                    for slot, mat in zip(obj.material_slots, materials):
-                        slot.material = mat
-        
-        for obj_name, display_type in orig_display_types.items():
-            if obj_name in bpy.data.objects:
-                obj = bpy.data.objects[obj_name]
-                obj.display_type = display_type
-        
-        col = bpy.data.collections.get("Preview_Collection")
-        
-        for obj in list(bpy.data.objects):
-            if obj.name.startswith("Preview_Empty") or (obj.type == 'LIGHT' and obj.name.startswith("Preview_")):
-                 bpy.data.objects.remove(obj, do_unlink=True)
-        
-        if col:
-            for obj in list(col.objects):
-                col.objects.unlink(obj)
-                if len(obj.users_collection) == 0:
-                    context.scene.collection.objects.link(obj)
-            bpy.data.collections.remove(col)
-            
-        PREVIEW_BACKUP = {}
-        self.report({'INFO'}, "Preview objects cleaned up successfully")
+class PREVIEWRENDER_OT_resume(bpy.types.Operator):
+    bl_idname = "preview_render.resume"
+    bl_label = "Resume Preview Render"
+    bl_description = "Render the missing or damaged frames of the last interrupted preview render"
+
+    directory: StringProperty(
+        name="Directory",
+        default="",
+        subtype='DIR_PATH',
+        options={'SKIP_SAVE'},
+    )
+
+    def execute(self, context):
+        settings = context.scene.preview_render_settings
+
+        if self.directory:
+            directory = bpy.path.abspath(self.directory)
+        else:
+            directory = find_resumable_render(settings)
+
+        if not directory:
+            self.report({'WARNING'}, "No interrupted render found.")
+            return {'CANCELLED'}
+
+        return bpy.ops.preview_render.start(resume_directory=directory)
+
+
+class PREVIEWRENDER_OT_open_render(bpy.types.Operator):
+    bl_idname = "preview_render.open_render"
+    bl_label = "Open Render"
+    bl_description = "Open a catalogued render folder"
+
+    directory: StringProperty(
+        name="Directory",
+        default="",
+        subtype='DIR_PATH',
+        options={'SKIP_SAVE'},
+    )
+
+    def execute(self, context):
+        if not os.path.isdir(self.directory):
+            self.report({'WARNING'}, f"Render folder not found: {self.directory}")
+            return {'CANCELLED'}
+
+        bpy.ops.wm.path_open(filepath=self.directory)
+        return {'FINISHED'}
+
+
+class PREVIEWRENDER_OT_composite_backdrops(bpy.types.Operator):
+    bl_idname = "preview_render.composite_backdrops"
+    bl_label = "Composite Backdrops"
+    bl_description = "Put the backdrops behind the frames of a transparent render that already finished"
+
+    directory: StringProperty(subtype='DIR_PATH')
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        settings = context.scene.preview_render_settings
+        try:
+            backdrops = parse_backdrops(settings.backdrops)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if not backdrops:
+            self.report({'WARNING'}, "No backdrops set.")
+            return {'CANCELLED'}
+
+        directory = bpy.path.abspath(self.directory)
+        frame_paths = rendered_frames(directory)
+        if not frame_paths:
+            self.report({'ERROR'}, f"No PNG frames in: {directory}")
+            return {'CANCELLED'}
+        started = time.perf_counter()
+        composite_backdrops(frame_paths, backdrops, os.path.join(directory, "backdrops"))
+        self.report({'INFO'}, f"{len(backdrops)} backdrops on {len(frame_paths)} frames "
+                              f"in {time.perf_counter() - started:.1f}s")
+        return {'FINISHED'}
+
+
+class PREVIEWRENDER_OT_evict_renders(bpy.types.Operator):
+    bl_idname = "preview_render.evict_renders"
+    bl_label = "Free Disk Space"
+    bl_description = "Delete catalogued renders over the disk budget or age limit"
+
+    def execute(self, context):
+        settings = context.scene.preview_render_settings
+        evicted = evict_catalog(settings)
+        self.report({'INFO'}, f"Removed {len(evicted)} catalogued renders")
+        return {'FINISHED'}
+
+
+class PREVIEWRENDER_OT_cancel_parallel(bpy.types.Operator):
+    bl_idname = "preview_render.cancel_parallel"
+    bl_label = "Cancel Parallel Render"
+    bl_description = "Stop all background render workers"
+
+    def execute(self, context):
+        if PARALLEL_JOB is None or not PARALLEL_JOB.is_running():
+            self.report({'WARNING'}, "No parallel render running")
+            return {'CANCELLED'}
+
+        PARALLEL_JOB.cancel()
+        if ACTIVE_JOB is not None:
+            ACTIVE_JOB.cancelled = True
+        self.report({'INFO'}, "Parallel render cancelled")
+        return {'FINISHED'}
+
+
+class PREVIEWRENDER_OT_clear_queue(bpy.types.Operator):
+    bl_idname = "preview_render.clear_queue"
+    bl_label = "Clear Render Queue"
+    bl_description = "Drop the renders waiting for the current one to finish"
+
+    def execute(self, context):
+        count = len(RENDER_QUEUE)
+        RENDER_QUEUE.clear()
+        self.report({'INFO'}, f"Removed {count} queued renders")
+        return {'FINISHED'}
+
+
+class PREVIEWRENDER_OT_rescan_hdris(bpy.types.Operator):
+    bl_idname = "preview_render.rescan_hdris"
+    bl_label = "Rescan HDRIs"
+    bl_description = "Rescan the HDRI directory for new or removed files"
+
+    def execute(self, context):
+        settings = context.scene.preview_render_settings
+        hdri_dir = bpy.path.abspath(settings.hdri_directory)
+
+        for key in [k for k in HDRI_INDEX if k[0] == hdri_dir]:
+            del HDRI_INDEX[key]
+
+        index = get_hdri_index(hdri_dir, settings.hdri_recursive, force=True)
+        if index is None:
+            self.report({'WARNING'}, f"HDRI directory not found: {hdri_dir}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Found {len(index['paths'])} HDRIs")
         return {'FINISHED'}
 
 
 classes = (
+    PreviewRenderCreatedID,
     PreviewRenderSettings,
     PREVIEWRENDER_PT_panel,
     PREVIEWRENDER_OT_start,
     PREVIEWRENDER_OT_cleanup,
+    PREVIEWRENDER_OT_rescan_hdris,
+    PREVIEWRENDER_OT_cancel_parallel,
+    PREVIEWRENDER_OT_clear_queue,
+    PREVIEWRENDER_OT_resume,
+    PREVIEWRENDER_OT_open_render,
+    PREVIEWRENDER_OT_evict_renders,
+    PREVIEWRENDER_OT_composite_backdrops,
 )
 
 
@@ -721,13 +4854,319 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.preview_render_settings = PointerProperty(type=PreviewRenderSettings)
+    bpy.app.handlers.render_complete.append(on_render_complete)
+    bpy.app.handlers.render_cancel.append(on_render_cancel)
+    bpy.app.handlers.render_write.append(on_render_write)
+    bpy.app.handlers.render_pre.append(on_render_pre)
+    bpy.app.handlers.render_post.append(on_render_post)
+    bpy.app.handlers.render_stats.append(on_render_stats)
+    bpy.app.handlers.load_post.append(on_load_post)
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update_post)
+    bpy.app.handlers.undo_post.append(on_undo_redo)
+    bpy.app.handlers.redo_post.append(on_undo_redo)
 
 
 def unregister():
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.preview_render_settings
+    bpy.app.handlers.render_complete.remove(on_render_complete)
+    bpy.app.handlers.render_cancel.remove(on_render_cancel)
+    bpy.app.handlers.render_write.remove(on_render_write)
+    bpy.app.handlers.render_pre.remove(on_render_pre)
+    bpy.app.handlers.render_post.remove(on_render_post)
+    bpy.app.handlers.render_stats.remove(on_render_stats)
+    bpy.app.handlers.load_post.remove(on_load_post)
+    bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update_post)
+    bpy.app.handlers.undo_post.remove(on_undo_redo)
+    bpy.app.handlers.redo_post.remove(on_undo_redo)
+    POST_RENDER_TASKS.clear()
+    RENDER_QUEUE.clear()
+    HDRI_INDEX.clear()
+    CATALOG_CACHE.clear()
+    MESH_BOUNDS.clear()
+    if PARALLEL_JOB is not None:
+        PARALLEL_JOB.cancel()
+    if ACTIVE_STREAM is not None:
+        ACTIVE_STREAM.abort()
+    if bpy.app.timers.is_registered(poll_parallel_render):
+        bpy.app.timers.unregister(poll_parallel_render)
+    if bpy.app.timers.is_registered(poll_render_stats):
+        bpy.app.timers.unregister(poll_render_stats)
+    if bpy.app.timers.is_registered(continue_rendering):
+        bpy.app.timers.unregister(continue_rendering)
+
+
+# command line: blender -b --python main.py -- [files or globs] [options]
+# runs one background Blender per file, each of those re-runs this script with --worker
+
+CLI_ID_SETTINGS = {
+    'camera_object': 'objects',
+    'override_material': 'materials',
+}
+
+# setting that lists its items from another one, so it's applied after the rest
+CLI_LATE_SETTINGS = ('hdri_file',)
+
+
+def parse_cli_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="blender -b --python main.py --",
+        description="Render turntables of many .blend files, one background Blender per file.",
+    )
+    parser.add_argument("files", nargs="*", help=".blend files or glob patterns, ** recurses")
+    parser.add_argument("--select", default="meshes",
+                        help="what to render in each file: meshes, collection:NAME or tag:NAME "
+                             "(asset tag or custom property)")
+    parser.add_argument("--preset", help="JSON file of Preview Render settings, e.g. {\"frame_count\": 48}")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override one setting, the value is read as JSON when it parses")
+    parser.add_argument("--output", help="render into this folder, one subfolder per file")
+    parser.add_argument("--workers", type=int, default=2, help="Blenders running at once")
+    parser.add_argument("--threads", type=int, default=0, help="render threads per Blender, 0 splits the cores")
+    parser.add_argument("--timeout", type=float, default=0, help="seconds before a file's Blender is killed, 0 for none")
+    parser.add_argument("--retries", type=int, default=1, help="extra attempts for a file that failed or timed out")
+    parser.add_argument("--report", help="write the summary as JSON here")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def load_cli_settings(args):
+    values = {}
+    if args.preset:
+        with open(args.preset) as fh:
+            values.update(json.load(fh))
+    for item in args.set:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"--set needs NAME=VALUE, got: {item}")
+        try:
+            values[name] = json.loads(value)
+        except ValueError:
+            values[name] = value
+
+    unknown = [name for name in values if name not in PreviewRenderSettings.__annotations__ or name == 'created_ids']
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(unknown)}")
+    return values
+
+
+def apply_cli_settings(settings, values):
+    for name in sorted(values, key=lambda name: name in CLI_LATE_SETTINGS):
+        value = values[name]
+        if name in CLI_ID_SETTINGS and value is not None:
+            datablock = getattr(bpy.data, CLI_ID_SETTINGS[name]).get(value)
+            if datablock is None:
+                raise ValueError(f"{name}: nothing named {value} in this file")
+            value = datablock
+        elif isinstance(value, list):
+            value = set(value) if isinstance(getattr(settings, name), set) else tuple(value)
+        setattr(settings, name, value)
+
+
+def select_cli_objects(rule):
+    scene = bpy.context.scene
+    kind, _, name = rule.partition(":")
+    if kind == 'meshes':
+        objects = [obj for obj in scene.objects if obj.type == 'MESH']
+    elif kind == 'collection':
+        collection = bpy.data.collections.get(name)
+        if collection is None:
+            raise ValueError(f"No collection named {name}")
+        in_scene = set(scene.objects)
+        objects = [obj for obj in collection.all_objects if obj in in_scene]
+    elif kind == 'tag':
+        objects = [
+            obj for obj in scene.objects
+            if name in obj or (obj.asset_data and any(tag.name == name for tag in obj.asset_data.tags))
+        ]
+    else:
+        raise ValueError(f"Unknown selection rule: {rule}")
+
+    for obj in scene.objects:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    return objects
+
+
+def run_cli_worker(args):
+    result = {'file': bpy.data.filepath, 'status': 'FAILED', 'objects': 0, 'error': None}
+    try:
+        settings = bpy.context.scene.preview_render_settings
+        apply_cli_settings(settings, load_cli_settings(args))
+        # timers don't run in the background, the pool already renders files side by side
+        settings.parallel_render = False
+        if args.output:
+            settings.auto_save_path = False
+            settings.output_path = args.output
+
+        objects = select_cli_objects(args.select)
+        result['objects'] = len(objects)
+        if not objects:
+            result['status'] = 'SKIPPED'
+            result['error'] = f"Nothing matches {args.select}"
+        elif 'FINISHED' in bpy.ops.preview_render.start():
+            # the job carries on past a broken item or encode, the file still didn't render
+            job = ACTIVE_JOB
+            if job is not None and job.errors:
+                result['error'] = "; ".join(job.errors)
+            else:
+                result['status'] = 'FINISHED'
+        else:
+            result['error'] = "Render setup failed, see the log"
+    except Exception as e:
+        traceback.print_exc()
+        result['error'] = str(e)
+
+    if args.result:
+        with open(args.result, 'w') as fh:
+            json.dump(result, fh)
+    return 0 if result['status'] in {'FINISHED', 'SKIPPED'} else 1
+
+
+def expand_blend_files(patterns):
+    files = []
+    seen = set()
+    for pattern in patterns:
+        # plain paths are kept even when missing, so they show up as failed in the summary
+        matches = sorted(glob.glob(pattern, recursive=True)) if any(c in pattern for c in "*?[") else [pattern]
+        for path in matches:
+            path = os.path.abspath(path)
+            if path not in seen:
+                seen.add(path)
+                files.append(path)
+    return files
+
+
+def run_cli_file(blend_path, worker_argv, name, log_dir, args):
+    log_path = os.path.join(log_dir, f"{name}.log")
+    result_path = os.path.join(log_dir, f"{name}.json")
+    threads = args.threads
+    if threads == 0:
+        threads = max(1, (os.cpu_count() or 1) // max(1, args.workers))
+    cmd = [bpy.app.binary_path, "-b", blend_path, "-t", str(threads)]
+    cmd += ["--python-exit-code", "1", "--python", os.path.abspath(__file__), "--"]
+    cmd += worker_argv + ["--worker", "--result", result_path]
+
+    entry = {'file': blend_path, 'status': 'FAILED', 'attempts': 0, 'seconds': 0.0,
+             'exit_code': None, 'objects': 0, 'error': None, 'log': None}
+    if not os.path.isfile(blend_path):
+        entry['error'] = "File not found"
+        return entry
+    entry['log'] = log_path
+
+    started = time.perf_counter()
+    with open(log_path, 'w') as log:
+        for attempt in range(1, args.retries + 2):
+            entry['attempts'] = attempt
+            log.write(f"--- attempt {attempt}: {subprocess.list2cmdline(cmd)}\n")
+            log.flush()
+            if os.path.exists(result_path):
+                os.remove(result_path)
+            try:
+                # run() kills the Blender when it times out
+                process = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, timeout=args.timeout or None)
+            except subprocess.TimeoutExpired:
+                entry.update(status='TIMEOUT', exit_code=None, error=f"Timed out after {args.timeout:g}s")
+                continue
+            except OSError as e:
+                entry['error'] = f"Blender could not start: {e}"
+                break
+
+            entry['exit_code'] = process.returncode
+            try:
+                with open(result_path) as fh:
+                    result = json.load(fh)
+            except (OSError, ValueError):
+                result = {'status': 'FAILED', 'error': f"Blender exited with {process.returncode}"}
+            entry.update(status=result['status'], objects=result.get('objects', 0), error=result.get('error'))
+            if entry['status'] in {'FINISHED', 'SKIPPED'}:
+                break
+
+    entry['seconds'] = time.perf_counter() - started
+    if os.path.exists(result_path):
+        os.remove(result_path)
+    return entry
+
+
+def run_cli(args):
+    files = expand_blend_files(args.files)
+    if not files:
+        print("No .blend files given")
+        return 2
+    try:
+        values = load_cli_settings(args)
+    except (OSError, ValueError) as e:
+        print(f"Bad settings: {e}")
+        return 2
+
+    if args.report:
+        log_dir = os.path.join(os.path.dirname(os.path.abspath(args.report)), "logs")
+        os.makedirs(log_dir, exist_ok=True)
+    else:
+        log_dir = tempfile.mkdtemp(prefix="turntable_cli_")
+
+    # every file gets its own name for logs and output, files with the same name in different folders get a number
+    names = []
+    for path in files:
+        name = bpy.path.clean_name(os.path.splitext(os.path.basename(path))[0])
+        if name in names:
+            name = f"{name}_{len(names):03d}"
+        names.append(name)
+
+    jobs = []
+    for path, name in zip(files, names):
+        worker_argv = ["--select", args.select]
+        if args.preset:
+            worker_argv += ["--preset", os.path.abspath(args.preset)]
+        for item in args.set:
+            worker_argv += ["--set", item]
+        if args.output:
+            worker_argv += ["--output", os.path.join(os.path.abspath(args.output), name)]
+        jobs.append((path, worker_argv, name))
+
+    started = time.perf_counter()
+    print(f"Rendering {len(files)} files with {args.workers} workers, logs in {log_dir}")
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(run_cli_file, path, worker_argv, name, log_dir, args) for path, worker_argv, name in jobs]
+        results = []
+        for future in futures:
+            entry = future.result()
+            results.append(entry)
+            print(f"{entry['status']:<8} {entry['seconds']:8.1f}s  {entry['file']}"
+                  + (f"  ({entry['error']})" if entry['error'] else ""))
+
+    counts = {status: sum(1 for entry in results if entry['status'] == status)
+              for status in ('FINISHED', 'SKIPPED', 'FAILED', 'TIMEOUT')}
+    elapsed = time.perf_counter() - started
+    print(f"{counts['FINISHED']} rendered, {counts['SKIPPED']} skipped, "
+          f"{counts['FAILED']} failed, {counts['TIMEOUT']} timed out in {elapsed:.1f}s")
+
+    if args.report:
+        with open(args.report, 'w') as fh:
+            json.dump({
+                'blender_version': bpy.app.version_string,
+                'select': args.select,
+                'settings': values,
+                'workers': args.workers,
+                'seconds': elapsed,
+                'counts': counts,
+                'files': results,
+            }, fh, indent=2)
+
+    return 0 if counts['FAILED'] == counts['TIMEOUT'] == 0 else 1
+
+
+def cli_main(argv):
+    args = parse_cli_args(argv)
+    if args.worker:
+        return run_cli_worker(args)
+    return run_cli(args)
 
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
+    if "--" in sys.argv:
+        sys.exit(cli_main(sys.argv[sys.argv.index("--") + 1:]))
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""read_exr against files written by the OpenEXR library.
+
+Runs without Blender on the bpy stand-in in benchmarks/fake_bpy:
+    pip install -r tests/requirements.txt
+    python -m unittest discover tests
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import OpenEXR
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, os.pardir, "benchmarks", "fake_bpy"))
+
+
+def load_addon():
+    spec = importlib.util.spec_from_file_location("turntabler", os.path.join(TESTS_DIR, os.pardir, "main.py"))
+    addon = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(addon)
+    return addon
+
+
+def window(x_min, y_min, x_max, y_max):
+    return np.array([x_min, y_min], dtype=np.int32), np.array([x_max, y_max], dtype=np.int32)
+
+
+class ReadExrTest(unittest.TestCase):
+    WIDTH = 37
+    # more than one 16 line ZIP chunk, and a last one that's short
+    HEIGHT = 41
+
+    @classmethod
+    def setUpClass(cls):
+        cls.addon = load_addon()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        rng = np.random.default_rng(7)
+        shape = (self.HEIGHT, self.WIDTH)
+        # smooth values compress, so ZIP chunks really are zipped, noise checks every byte comes back
+        ramp = np.linspace(0.0, 1.0, self.WIDTH * self.HEIGHT, dtype=np.float32).reshape(shape)
+        self.channels = {
+            'ViewLayer.Combined.R': ramp,
+            'ViewLayer.Combined.G': rng.random(shape, dtype=np.float32),
+            'ViewLayer.Combined.B': rng.random(shape).astype(np.float16),
+            'ViewLayer.Combined.A': np.ones(shape, dtype=np.float32),
+            'ViewLayer.Depth.Z': (ramp * 100.0 + 1.0).astype(np.float32),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, compression, channels=None, **header):
+        path = os.path.join(self.directory, f"{int(compression)}.exr")
+        header.update({'compression': compression, 'type': OpenEXR.scanlineimage})
+        # the library swaps the arrays in the dict for its own channel objects
+        OpenEXR.File(header, dict(channels or self.channels)).write(path)
+        return path
+
+    def check(self, path, expected):
+        names = ('Combined.R', 'Combined.G', 'Combined.B', 'Combined.A', 'Depth.Z')
+        result = self.addon.read_exr(path, names)
+        for name in names:
+            self.assertEqual(result[name].dtype, np.float32)
+            # Blender's pixels start at the bottom row
+            np.testing.assert_array_equal(result[name], expected['ViewLayer.' + name].astype(np.float32)[::-1],
+                                          err_msg=name)
+
+    def test_uncompressed(self):
+        self.check(self.write(OpenEXR.NO_COMPRESSION), self.channels)
+
+    def test_zip(self):
+        self.check(self.write(OpenEXR.ZIP_COMPRESSION), self.channels)
+
+    def test_zips(self):
+        self.check(self.write(OpenEXR.ZIPS_COMPRESSION), self.channels)
+
+    def test_known_values(self):
+        pixel = np.zeros((2, 3), dtype=np.float32)
+        pixel[0, 2] = 0.25
+        channels = {'Layer.Combined.R': pixel, 'Layer.Depth.Z': np.full((2, 3), 7.5, dtype=np.float32)}
+        for compression in (OpenEXR.NO_COMPRESSION, OpenEXR.ZIP_COMPRESSION):
+            result = self.addon.read_exr(self.write(compression, channels), ('Combined.R', 'Depth.Z'))
+            self.assertEqual(result['Combined.R'][1, 2], 0.25)
+            self.assertEqual(result['Combined.R'].sum(), 0.25)
+            self.assertTrue(np.all(result['Depth.Z'] == 7.5))
+
+    def test_cropped_data_window(self):
+        # a cropped border render only stores its window, the rest of the frame reads as zeros
+        x_min, y_min = 5, 9
+        # the library reads the arrays' buffers as they are, so they have to be contiguous
+        cropped = {name: np.ascontiguousarray(values[y_min:, x_min:x_min + 20])
+                   for name, values in self.channels.items()}
+        path = self.write(OpenEXR.ZIP_COMPRESSION, cropped,
+                          dataWindow=window(x_min, y_min, x_min + 19, self.HEIGHT - 1),
+                          displayWindow=window(0, 0, self.WIDTH - 1, self.HEIGHT - 1))
+        expected = {}
+        for name, values in cropped.items():
+            full = np.zeros((self.HEIGHT, self.WIDTH), dtype=values.dtype)
+            full[y_min:, x_min:x_min + 20] = values
+            expected[name] = full
+        self.check(path, expected)
+
+    def test_rejects_unsupported_compression(self):
+        path = self.write(OpenEXR.PIZ_COMPRESSION)
+        with self.assertRaisesRegex(RuntimeError, "compression 4 isn't supported"):
+            self.addon.read_exr(path, ('Combined.R',))
+
+    def test_missing_channel(self):
+        with self.assertRaisesRegex(RuntimeError, "No Normal.X"):
+            self.addon.read_exr(self.write(OpenEXR.ZIP_COMPRESSION), ('Combined.R', 'Normal.X'))
+
+    def test_not_an_exr(self):
+        path = os.path.join(self.directory, "frame.png")
+        with open(path, 'wb') as fh:
+            fh.write(b"\x89PNG\r\n\x1a\n")
+        with self.assertRaisesRegex(RuntimeError, "Not an EXR"):
+            self.addon.read_exr(path, ('Combined.R',))
+
+
+if __name__ == "__main__":
+    unittest.main()